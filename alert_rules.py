@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+
+"""
+Incremental alert rule engine.
+
+Rules compare a series (or every series matching a glob such as
+'disk.*.free_percent') against a threshold. Each matching series keeps its
+own small state machine (ok -> pending -> firing -> ok) and, when the rule
+has a window, a rolling aggregate. Every observed sample is evaluated in
+amortized O(1): window sums and min/max deques are updated incrementally,
+and the rules matching a series name are resolved once and cached.
+Only transitions to firing and back to ok produce events.
+
+Rules are loaded from a JSON file shaped like:
+
+    {"rules": [{"name": "cpu_load_high", "series": "cpu.usage", "op": ">",
+                "threshold": 75, "clear_threshold": 65, "for": 30,
+                "window": 60, "aggregate": "avg", "severity": "warning",
+                "message": "CPU load is too high."}]}
+"""
+
+import fnmatch
+import json
+import operator
+import threading
+import time
+from collections import deque
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+AGGREGATES = ('last', 'avg', 'min', 'max')
+
+# The thresholds the reports have always used, with hysteresis so a value
+# hovering at the limit does not flap between states
+DEFAULT_RULES = (
+    {'name': 'cpu_load_high', 'series': 'cpu.usage', 'op': '>=', 'threshold': 75, 'clear_threshold': 65,
+     'for': 30, 'window': 60, 'aggregate': 'avg', 'severity': 'warning',
+     'message': 'CPU load is too high.'},
+    {'name': 'memory_available_low', 'series': 'memory.available', 'op': '<=', 'threshold': 100 * 1024 ** 2,
+     'clear_threshold': 150 * 1024 ** 2, 'for': 0, 'severity': 'critical',
+     'message': 'Available memory is below the threshold of 100MB.'},
+    {'name': 'disk_free_percent_low', 'series': 'disk.*.free_percent', 'op': '<', 'threshold': 10,
+     'clear_threshold': 12, 'for': 0, 'severity': 'warning',
+     'message': "Storage isn't sufficient."},
+    {'name': 'disk_free_bytes_low', 'series': 'disk.*.free', 'op': '<', 'threshold': 2 * 1024 ** 3,
+     'clear_threshold': 2.5 * 1024 ** 3, 'for': 0, 'severity': 'warning',
+     'message': "Storage isn't sufficient."},
+)
+
+OK, PENDING, FIRING = 'ok', 'pending', 'firing'
+
+
+class AlertRule:
+    """
+    One threshold rule.
+
+    Args:
+    - name (str): Unique rule name.
+    - series (str): Series name or glob pattern, e.g. 'disk.*.free'.
+    - op (str): One of '>', '>=', '<', '<='.
+    - threshold (float): Value that starts the rule pending/firing.
+    - clear_threshold (float): Value the series must get back past to resolve; defaults to threshold.
+    - for_seconds (float): How long the condition must hold before firing.
+    - clear_for (float): How long the clear condition must hold before resolving.
+    - window (float): Rolling window in seconds that `aggregate` is taken over; 0 uses each sample.
+    - aggregate (str): 'last', 'avg', 'min' or 'max'.
+    """
+
+    __slots__ = ('name', 'series', 'op', 'compare', 'threshold', 'clear_threshold', 'for_seconds',
+                 'clear_for', 'window', 'aggregate', 'severity', 'message', 'is_pattern')
+
+    def __init__(self, name, series, op, threshold, clear_threshold=None, for_seconds=0.0, clear_for=0.0,
+                 window=0.0, aggregate='last', severity='warning', message=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Rule '{name}': unknown operator '{op}'. Choose one of: {', '.join(OPERATORS)}.")
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Rule '{name}': unknown aggregate '{aggregate}'. Choose one of: {', '.join(AGGREGATES)}.")
+        if for_seconds < 0 or clear_for < 0 or window < 0:
+            raise ValueError(f"Rule '{name}': durations must not be negative.")
+        self.name = name
+        self.series = series
+        self.op = op
+        self.compare = OPERATORS[op]
+        self.threshold = threshold
+        self.clear_threshold = threshold if clear_threshold is None else clear_threshold
+        self.for_seconds = for_seconds
+        self.clear_for = clear_for
+        self.window = window
+        self.aggregate = aggregate if window else 'last'
+        self.severity = severity
+        self.message = message or f'{series} {op} {threshold}'
+        self.is_pattern = any(character in series for character in '*?[')
+
+    @classmethod
+    def from_dict(cls, config):
+        known = {'name', 'series', 'op', 'threshold', 'clear_threshold', 'for', 'clear_for',
+                 'window', 'aggregate', 'severity', 'message'}
+        unknown = set(config) - known
+        if unknown:
+            raise ValueError(f"Rule '{config.get('name')}': unknown keys {', '.join(sorted(unknown))}.")
+        missing = {'name', 'series', 'op', 'threshold'} - set(config)
+        if missing:
+            raise ValueError(f"Rule '{config.get('name')}': missing keys {', '.join(sorted(missing))}.")
+        return cls(
+            name=config['name'],
+            series=config['series'],
+            op=config['op'],
+            threshold=config['threshold'],
+            clear_threshold=config.get('clear_threshold'),
+            for_seconds=config.get('for', 0.0),
+            clear_for=config.get('clear_for', 0.0),
+            window=config.get('window', 0.0),
+            aggregate=config.get('aggregate', 'last'),
+            severity=config.get('severity', 'warning'),
+            message=config.get('message'),
+        )
+
+    def matches(self, series):
+        return fnmatch.fnmatchcase(series, self.series) if self.is_pattern else series == self.series
+
+
+class RollingWindow:
+    """Time-based rolling aggregate; each push and expiry is amortized O(1)."""
+
+    __slots__ = ('seconds', 'aggregate', '_samples', '_sum', '_extremes')
+
+    def __init__(self, seconds, aggregate):
+        self.seconds = seconds
+        self.aggregate = aggregate
+        self._samples = deque()   # (timestamp, value)
+        self._sum = 0.0
+        self._extremes = deque()  # Monotonic deque of (timestamp, value) for min or max
+
+    def push(self, timestamp, value):
+        """Adds a sample, drops the ones older than the window and returns the aggregate."""
+        self._samples.append((timestamp, value))
+        self._sum += value
+        if self.aggregate in ('min', 'max'):
+            dominated = operator.ge if self.aggregate == 'min' else operator.le
+            while self._extremes and dominated(self._extremes[-1][1], value):
+                self._extremes.pop()
+            self._extremes.append((timestamp, value))
+
+        cutoff = timestamp - self.seconds
+        while self._samples[0][0] < cutoff:
+            _, expired = self._samples.popleft()
+            self._sum -= expired
+        while self._extremes and self._extremes[0][0] < cutoff:
+            self._extremes.popleft()
+
+        if self.aggregate == 'avg':
+            return self._sum / len(self._samples)
+        if self.aggregate in ('min', 'max'):
+            return self._extremes[0][1]
+        return value
+
+
+class SeriesState:
+    """Evaluation state of one rule for one series."""
+
+    __slots__ = ('state', 'since', 'clear_since', 'value', 'window')
+
+    def __init__(self, rule):
+        self.state = OK
+        self.since = None        # When the condition started holding
+        self.clear_since = None  # When the clear condition started holding while firing
+        self.value = None        # Latest evaluated (aggregated) value
+        self.window = RollingWindow(rule.window, rule.aggregate) if rule.window else None
+
+
+class AlertEngine:
+    """
+    Evaluates rules against samples as they stream in and emits state-change events.
+
+    Events are dicts with the rule, series, new state ('firing' or 'resolved'),
+    value, threshold, severity, message and timestamp. They are passed to every
+    listener and kept in a bounded queue for drain_events().
+    """
+
+    def __init__(self, rules=None, max_events=1000):
+        self._lock = threading.Lock()
+        self.rules = []
+        self.listeners = []
+        self._events = deque(maxlen=max_events)
+        self.load(DEFAULT_RULES if rules is None else rules)
+
+    def load(self, rules):
+        """Replaces the rule set; rules may be AlertRule objects or config dicts."""
+        parsed = [rule if isinstance(rule, AlertRule) else AlertRule.from_dict(rule) for rule in rules]
+        names = [rule.name for rule in parsed]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate rule names: {', '.join(duplicates)}.")
+        with self._lock:
+            self.rules = parsed
+            self._rules_by_series = {}  # Series name -> matching rules, resolved on first sight
+            self._states = {}           # (rule name, series) -> SeriesState
+        logger.info("Loaded %s alert rule(s).", len(parsed))
+
+    def load_file(self, path):
+        """Loads rules from a JSON file with a top-level "rules" list."""
+        with open(path, encoding='utf-8') as handle:
+            config = json.load(handle)
+        rules = config.get('rules') if isinstance(config, dict) else None
+        if not isinstance(rules, list):
+            raise ValueError(f"{path} must contain a top-level \"rules\" list.")
+        self.load(rules)
+
+    def _matching_rules(self, series):
+        rules = self._rules_by_series.get(series)
+        if rules is None:
+            rules = self._rules_by_series[series] = [rule for rule in self.rules if rule.matches(series)]
+        return rules
+
+    def _event(self, rule, series, state, value, timestamp):
+        return {
+            'rule': rule.name,
+            'series': series,
+            'state': state,
+            'value': value,
+            'threshold': rule.threshold if state == FIRING else rule.clear_threshold,
+            'severity': rule.severity,
+            'message': rule.message,
+            'timestamp': timestamp,
+        }
+
+    def _evaluate(self, rule, series, value, timestamp):
+        key = (rule.name, series)
+        entry = self._states.get(key)
+        if entry is None:
+            entry = self._states[key] = SeriesState(rule)
+        if entry.window is not None:
+            value = entry.window.push(timestamp, value)
+        entry.value = value
+
+        if entry.state == FIRING:
+            # Hysteresis: stay firing until the value is back past the clear threshold
+            if rule.compare(value, rule.clear_threshold):
+                entry.clear_since = None
+                return None
+            if entry.clear_since is None:
+                entry.clear_since = timestamp
+            if timestamp - entry.clear_since < rule.clear_for:
+                return None
+            entry.state, entry.since, entry.clear_since = OK, None, None
+            return self._event(rule, series, 'resolved', value, timestamp)
+
+        if not rule.compare(value, rule.threshold):
+            entry.state, entry.since = OK, None
+            return None
+        if entry.since is None:
+            entry.since = timestamp
+        if timestamp - entry.since < rule.for_seconds:
+            entry.state = PENDING
+            return None
+        entry.state, entry.clear_since = FIRING, None
+        return self._event(rule, series, FIRING, value, timestamp)
+
+    def observe(self, series, value, timestamp=None):
+        """
+        Evaluates one sample against every rule matching its series.
+
+        Returns:
+        - list: The state-change events this sample caused (usually empty).
+        """
+        if value is None:
+            return []
+        timestamp = time.time() if timestamp is None else timestamp
+        events = []
+        with self._lock:
+            for rule in self._matching_rules(series):
+                event = self._evaluate(rule, series, value, timestamp)
+                if event is not None:
+                    events.append(event)
+                    self._events.append(event)
+        for event in events:
+            log = logger.warning if event['state'] == FIRING else logger.info
+            log("Alert %s %s for %s (value %s).", event['rule'], event['state'], event['series'], event['value'])
+            for listener in self.listeners:
+                listener(event)
+        return events
+
+    def observe_many(self, samples, timestamp=None):
+        """Evaluates a {series: value} mapping that shares one timestamp."""
+        timestamp = time.time() if timestamp is None else timestamp
+        events = []
+        for series, value in samples.items():
+            events.extend(self.observe(series, value, timestamp))
+        return events
+
+    def get_rule(self, name):
+        """Returns the loaded rule with this name, or None."""
+        return next((rule for rule in self.rules if rule.name == name), None)
+
+    def state(self, rule_name, series):
+        """Returns 'ok', 'pending' or 'firing' for one rule and series ('ok' if never evaluated)."""
+        with self._lock:
+            entry = self._states.get((rule_name, series))
+            return entry.state if entry is not None else OK
+
+    def active(self):
+        """Returns every pending or firing (rule, series) with its state and latest value."""
+        with self._lock:
+            return [{'rule': rule_name, 'series': series, 'state': entry.state, 'value': entry.value}
+                    for (rule_name, series), entry in self._states.items() if entry.state != OK]
+
+    def drain_events(self):
+        """Returns and clears the events queued since the last call."""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_alert_engine():
+    """Returns the process-wide alert engine, created with DEFAULT_RULES on first use."""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = AlertEngine()
+        return _shared_engine
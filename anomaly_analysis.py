@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+"""
+Anomaly analysis over MetricsHistory.
+
+Every series in the analysed window is copied into one padded matrix (one
+row per series, newest sample in the last column), and the statistics are
+computed with whole-matrix NumPy operations:
+
+- cumulative counters (context switches, interrupts, NIC drops, ...) become
+  per-second rates;
+- an EWMA gives the smoothed current level of every series;
+- a rolling z-score flags a latest sample far from its recent mean;
+- a least-squares slope projects when a resource runs out (memory, disk,
+  swap) and catches error and drop rates that keep rising.
+
+NumPy is optional for the rest of the analyzer, so it is only imported here.
+"""
+
+import fnmatch
+import time
+from report_renderer import render_analysis
+import logging  # Import logging module
+
+try:
+    import numpy as np
+except ImportError:  # Checked when an analyzer is created
+    np = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Series that hold cumulative counters and are analysed as per-second rates
+COUNTER_SERIES = (
+    'cpu.ctx_switches', 'cpu.interrupts', 'cpu.soft_interrupts',
+    'net.*.bytes_sent', 'net.*.bytes_recv',
+    'net.*.errin', 'net.*.errout', 'net.*.dropin', 'net.*.dropout',
+)
+
+# Rates that are worth reporting as soon as they trend upwards
+RISING_SERIES = ('net.*.errin', 'net.*.errout', 'net.*.dropin', 'net.*.dropout')
+
+# (series pattern, value at which the resource is exhausted, description)
+EXHAUSTION_TARGETS = (
+    ('memory.available', 0.0, 'memory exhausted'),
+    ('disk.*.free', 0.0, 'disk {name} full'),
+    ('swap.percent', 100.0, 'swap full'),
+)
+
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def _middle(name):
+    """'disk./home.free' -> '/home'."""
+    return name.split('.', 1)[1].rsplit('.', 1)[0]
+
+
+class AnomalyAnalyzer:
+    """
+    Runs the batched analysis over a MetricsHistory and renders the "Analysis" section.
+
+    Args:
+    - history (MetricsHistory): Source of the samples.
+    - window (float): Seconds of history analysed per run.
+    - alpha (float): EWMA smoothing factor, 0 < alpha <= 1.
+    - zscore_window (int): Samples before the latest one that form the rolling baseline.
+    - z_threshold (float): Absolute z-score at which the latest sample is reported.
+    - min_samples (int): Samples a series needs before it is analysed.
+    - min_r2 (float): Fit quality (R squared) a trend needs before it is reported.
+    - horizon (float): Seconds ahead within which exhaustion is reported.
+    """
+
+    def __init__(self, history, window=3600.0, alpha=0.1, zscore_window=60, z_threshold=4.0,
+                 min_samples=10, min_r2=0.6, horizon=30 * 86400):
+        if np is None:
+            raise ImportError("The Analysis section needs NumPy; install it with 'pip install numpy'.")
+        if not 0 < alpha <= 1:
+            raise ValueError("EWMA alpha must be in (0, 1].")
+        if window <= 0 or zscore_window < 2 or min_samples < 3:
+            raise ValueError("Window must be positive, with at least 2 baseline and 3 minimum samples.")
+        self.history = history
+        self.window = window
+        self.alpha = alpha
+        self.zscore_window = zscore_window
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.min_r2 = min_r2
+        self.horizon = horizon
+
+    def _matrices(self):
+        """
+        Copies the window of every series into (names, timestamps, values).
+
+        Rows are right-aligned and left-padded with NaN, so column -1 holds
+        each series' newest sample.
+        """
+        windows = {}
+        for name in self.history.names():
+            timestamps, values = self.history.window(name, self.window)
+            if len(values) >= self.min_samples:
+                windows[name] = (timestamps, values)
+        names = list(windows)
+        width = max((len(values) for _, values in windows.values()), default=0)
+        timestamps = np.full((len(names), width), np.nan)
+        values = np.full((len(names), width), np.nan)
+        for row, name in enumerate(names):
+            series_timestamps, series_values = windows[name]
+            size = len(series_values)
+            # frombuffer reads the history's typed arrays without a per-item copy
+            timestamps[row, width - size:] = np.frombuffer(series_timestamps, dtype=np.float64)
+            values[row, width - size:] = np.frombuffer(series_values, dtype=np.float64)
+        return names, timestamps, values
+
+    def _rates(self, names, timestamps, values):
+        """Turns counter rows into per-second rates; gauge rows drop their first sample to match."""
+        counters = np.array([_matches(name, COUNTER_SERIES) for name in names], dtype=bool)
+        elapsed = np.diff(timestamps, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.diff(values, axis=1) / elapsed
+        # Counter resets and duplicate timestamps give no usable rate
+        rates[(rates < 0) | ~np.isfinite(rates)] = np.nan
+        series = np.where(counters[:, None], rates, values[:, 1:])
+        return counters, timestamps[:, 1:], series
+
+    def analyze(self):
+        """
+        Runs the analysis once over the last `window` seconds of history.
+
+        Returns:
+        - tuple: (findings, number of series analysed, number of samples in the widest series).
+        """
+        names, timestamps, values = self._matrices()
+        samples = values.shape[1]
+        if not names:
+            return [], 0, 0
+
+        counters, timestamps, series = self._rates(names, timestamps, values)
+        valid = ~np.isnan(series)
+        filled = np.where(valid, series, 0.0)
+        counts = valid.sum(axis=1)
+        width = series.shape[1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # EWMA of every row at once: weight (1 - alpha)^age over the present samples
+            weights = (1 - self.alpha) ** np.arange(width - 1, -1, -1, dtype=np.float64)
+            ewma = (filled * weights).sum(axis=1) / (valid * weights).sum(axis=1)
+
+            # Rolling z-score of the newest sample against the samples before it
+            baseline_valid = valid[:, -self.zscore_window - 1:-1]
+            baseline = filled[:, -self.zscore_window - 1:-1]
+            baseline_count = baseline_valid.sum(axis=1)
+            mean = baseline.sum(axis=1) / baseline_count
+            deviation = np.where(baseline_valid, baseline - mean[:, None], 0.0)
+            std = np.sqrt((deviation ** 2).sum(axis=1) / baseline_count)
+            latest = series[:, -1]
+            zscore = (latest - mean) / std
+
+            # Least-squares slope (units per second) and R squared of every row
+            times = np.where(valid, timestamps, 0.0)
+            time_mean = times.sum(axis=1) / counts
+            time_centered = np.where(valid, timestamps - time_mean[:, None], 0.0)
+            value_centered = np.where(valid, series - (filled.sum(axis=1) / counts)[:, None], 0.0)
+            time_spread = (time_centered ** 2).sum(axis=1)
+            value_spread = (value_centered ** 2).sum(axis=1)
+            slope = (time_centered * value_centered).sum(axis=1) / time_spread
+            r2 = slope ** 2 * time_spread / value_spread
+
+            limits = np.array([next((limit for pattern, limit, _ in EXHAUSTION_TARGETS
+                                     if fnmatch.fnmatchcase(name, pattern)), np.nan) for name in names])
+            # Project from the smoothed level so one noisy sample does not move the estimate
+            exhaustion = (limits - ewma) / slope
+
+        enough = counts >= self.min_samples
+        good_fit = enough & (r2 >= self.min_r2)
+        spikes = enough & (baseline_count >= 2) & (std > 0) & (np.abs(zscore) >= self.z_threshold)
+        exhausting = good_fit & np.isfinite(exhaustion) & (exhaustion > 0) & (exhaustion <= self.horizon)
+        rising_series = np.array([_matches(name, RISING_SERIES) for name in names], dtype=bool)
+        rising = good_fit & rising_series & (slope > 0) & (latest > 0)
+
+        findings = []
+        for row in np.flatnonzero(exhausting):
+            description = next(text for pattern, _, text in EXHAUSTION_TARGETS
+                               if fnmatch.fnmatchcase(names[row], pattern))
+            findings.append({
+                'kind': 'exhaustion',
+                'series': names[row],
+                'description': description.format(name=_middle(names[row])),
+                'seconds': float(exhaustion[row]),
+                'slope': float(slope[row]),
+                'r2': float(r2[row]),
+            })
+        for row in np.flatnonzero(spikes):
+            findings.append({
+                'kind': 'spike',
+                'series': names[row],
+                'rate': bool(counters[row]),
+                'value': float(latest[row]),
+                'mean': float(mean[row]),
+                'ewma': float(ewma[row]),
+                'zscore': float(zscore[row]),
+            })
+        for row in np.flatnonzero(rising):
+            findings.append({
+                'kind': 'rising',
+                'series': names[row],
+                'value': float(latest[row]),
+                'slope': float(slope[row]),
+                'r2': float(r2[row]),
+            })
+        logger.debug("Analysed %s series over %s samples: %s finding(s).", len(names), width, len(findings))
+        return findings, len(names), samples
+
+    def report(self):
+        """Runs the analysis and renders it as the "Analysis" report section."""
+        timestamp = time.time()
+        try:
+            findings, series_count, samples = self.analyze()
+        except Exception as e:
+            logger.error("Error analysing metrics history: %s", e)
+            findings, series_count, samples = [], 0, 0
+        return render_analysis(findings, series_count, samples, self.window, timestamp)
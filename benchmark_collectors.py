@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark harness for the report collectors.
+
+Times every collector entry point against the real system or against the
+synthetic psutil backends in fake_psutil, records latency percentiles and
+the tracemalloc peak of one extra run, and saves the results as JSON.
+Passing --compare with an earlier results file adds the p50 change per
+collector to the results, so regressions show up between versions.
+
+    python3 benchmark_collectors.py --backend synthetic --output bench.json
+    python3 benchmark_collectors.py --backend synthetic --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime, timezone
+import psutil
+from collection_engine import load_manager
+from metrics_history import RingBuffer
+from fake_psutil import FakePsutil, DEFAULT_SCALE
+from log_pipeline import configure_logging, LOG_LEVELS
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Benchmark name -> (manager reference, entry point), in report order
+ENTRY_POINTS = {
+    'monitor_cpu': ('cpu_management:CPUManager', 'monitor_cpu'),
+    'manage_processes': ('process_management:ProcessManager', 'manage_processes'),
+    'memory_statistics': ('memory_management:MemoryManager', 'memory_statistics'),
+    'manage_disk': ('disk_management:DiskManager', 'manage_disk'),
+    'network_report': ('network_management:NetworkManager', 'network_report'),
+    'system_info': ('system_infoAnalyzer:SystemInformation', 'system_info'),
+    'batteryManagement': ('battery_management:BatteryManager', 'batteryManagement'),
+    'all_in_one': ('main:systemAnalyzer', 'all_in_one'),
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def entry_point(name):
+    """Returns a zero-argument callable for a benchmark, bound to one reused manager."""
+    reference, method_name = ENTRY_POINTS[name]
+    return getattr(load_manager(reference)(), method_name)
+
+
+def measure(function, iterations=10, warmup=1):
+    """
+    Runs a collector and measures it.
+
+    Warm-up runs absorb one-off costs such as priming the CPU sampler and
+    the rate monitors. Latencies are timed without tracemalloc; the
+    allocation peak comes from one separate traced run.
+
+    Returns:
+    - dict: Latency statistics in milliseconds, peak allocation in bytes and any error.
+    """
+    try:
+        for _ in range(warmup):
+            function()
+
+        durations = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            function()
+            durations.append((time.perf_counter() - started) * 1000)
+
+        tracemalloc.start()
+        try:
+            function()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except (Exception, SystemExit) as e:
+        # Managers exit on failure; record it and keep benchmarking the rest
+        logger.error("Benchmark run failed: %r", e)
+        return {'error': repr(e)}
+
+    ordered = sorted(durations)
+    result = {
+        'iterations': iterations,
+        'min_ms': round(ordered[0], 3),
+        'mean_ms': round(sum(ordered) / len(ordered), 3),
+        'max_ms': round(ordered[-1], 3),
+        'peak_alloc_bytes': peak_bytes,
+    }
+    for percentile in PERCENTILES:
+        result[f'p{percentile}_ms'] = round(RingBuffer.percentile(ordered, percentile), 3)
+    return result
+
+
+def run_benchmarks(names=None, backend='real', iterations=10, warmup=1, scale=None):
+    """
+    Benchmarks the selected entry points and returns a JSON-ready results document.
+
+    Args:
+    - names (list): Entry points to run; all of ENTRY_POINTS when omitted.
+    - backend (str): 'real' for the live system, 'synthetic' for FakePsutil.
+    - iterations (int): Timed runs per entry point.
+    - warmup (int): Untimed runs before timing starts.
+    - scale (dict): processes/sockets/mounts for the synthetic backend.
+    """
+    names = list(ENTRY_POINTS) if names is None else list(names)
+    unknown = [name for name in names if name not in ENTRY_POINTS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}. Choose from: {', '.join(ENTRY_POINTS)}.")
+
+    scale = dict(DEFAULT_SCALE, **(scale or {}))
+    document = {
+        'metadata': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'backend': backend,
+            'scale': scale if backend == 'synthetic' else None,
+            'iterations': iterations,
+            'warmup': warmup,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'psutil': psutil.__version__,
+            'cpu_count': psutil.cpu_count(),
+        },
+        'results': {},
+    }
+
+    with FakePsutil(**scale) if backend == 'synthetic' else nullcontext():
+        for name in names:
+            logger.info("Benchmarking %s.", name)
+            print(f'Benchmarking {name}...', file=sys.stderr)
+            document['results'][name] = measure(entry_point(name), iterations=iterations, warmup=warmup)
+    return document
+
+
+def compare_results(baseline, current):
+    """
+    Compares two results documents.
+
+    Returns:
+    - dict: Benchmark name -> baseline p50, current p50 and their ratio.
+    """
+    comparison = {}
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name, {})
+        if 'p50_ms' not in result or 'p50_ms' not in before:
+            continue
+        comparison[name] = {
+            'baseline_p50_ms': before['p50_ms'],
+            'current_p50_ms': result['p50_ms'],
+            'ratio': round(result['p50_ms'] / before['p50_ms'], 3) if before['p50_ms'] else None,
+        }
+    return comparison
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the report collectors.')
+    parser.add_argument('--backend', choices=('real', 'synthetic'), default='real',
+                        help='Measure the live system or synthetic psutil data (default: real).')
+    parser.add_argument('--only', default=None,
+                        help=f"Comma-separated entry points to run (default: all of {', '.join(ENTRY_POINTS)}).")
+    parser.add_argument('--iterations', type=int, default=10, help='Timed runs per entry point (default: 10).')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before timing (default: 1).')
+    parser.add_argument('--processes', type=int, default=DEFAULT_SCALE['processes'],
+                        help='Synthetic process count (default: %(default)s).')
+    parser.add_argument('--sockets', type=int, default=DEFAULT_SCALE['sockets'],
+                        help='Synthetic socket count (default: %(default)s).')
+    parser.add_argument('--mounts', type=int, default=DEFAULT_SCALE['mounts'],
+                        help='Synthetic mount count (default: %(default)s).')
+    parser.add_argument('--output', default=None, help='File to save the results JSON to (default: stdout).')
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help='Earlier results file to compare p50 latencies against.')
+    parser.add_argument('--log-level', default='WARNING', choices=LOG_LEVELS,
+                        help='Minimum level written to system_analysis.log (default: WARNING).')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    configure_logging(arguments.log_level)
+    try:
+        if arguments.iterations < 1:
+            raise ValueError("Iterations must be at least 1.")
+        results = run_benchmarks(
+            names=arguments.only.split(',') if arguments.only else None,
+            backend=arguments.backend,
+            iterations=arguments.iterations,
+            warmup=arguments.warmup,
+            scale={'processes': arguments.processes, 'sockets': arguments.sockets, 'mounts': arguments.mounts},
+        )
+        if arguments.compare:
+            with open(arguments.compare, encoding='utf-8') as handle:
+                results['comparison'] = compare_results(json.load(handle), results)
+
+        if arguments.output:
+            with open(arguments.output, 'w', encoding='utf-8') as handle:
+                json.dump(results, handle, indent=4)
+            print(f'Benchmark results saved to {arguments.output}', file=sys.stderr)
+        else:
+            print(json.dumps(results, indent=4))
+    except (ValueError, OSError) as e:
+        logger.error("Benchmark failed: %s", e)
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+import math
+import mmap
+import os
+import sys
+import struct
+from array import array
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# File layout:
+#   header  '<4sHHII'  magic, schema version, field count, record size, schema length
+#   schema  field names, each one length byte followed by UTF-8 text
+#   records timestamp followed by one value per field, all little-endian float64
+MAGIC = b'SHCS'
+SCHEMA_VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+
+# Numeric fields written for each snapshot unless another schema is given
+DEFAULT_FIELDS = (
+    'cpu.usage',
+    'memory.available',
+    'memory.percent',
+    'swap.used',
+    'swap.percent',
+    'net.bytes_sent',
+    'net.bytes_recv',
+)
+
+
+def snapshot_values(cpu=None, memory=None, traffic=None):
+    """Flattens typed snapshots into a {field: value} mapping for DEFAULT_FIELDS."""
+    values = {}
+    if cpu is not None:
+        values['cpu.usage'] = cpu.usage
+    if memory is not None:
+        values['memory.available'] = memory.available
+        values['memory.percent'] = memory.percent
+        values['swap.used'] = memory.swap_used
+        values['swap.percent'] = memory.swap_percent
+    if traffic is not None:
+        values['net.bytes_sent'] = traffic.bytes_sent
+        values['net.bytes_recv'] = traffic.bytes_recv
+    return values
+
+
+def _encode_schema(fields):
+    schema = bytearray()
+    for name in fields:
+        encoded = name.encode('utf-8')
+        if len(encoded) > 255:
+            raise ValueError(f"Field name too long: {name}")
+        schema.append(len(encoded))
+        schema += encoded
+    return bytes(schema)
+
+
+def _decode_schema(schema, field_count):
+    fields, offset = [], 0
+    for _ in range(field_count):
+        length = schema[offset]
+        fields.append(bytes(schema[offset + 1:offset + 1 + length]).decode('utf-8'))
+        offset += 1 + length
+    return tuple(fields)
+
+
+def read_header(handle):
+    """Reads and validates the header; returns (fields, data offset, record size)."""
+    raw = handle.read(HEADER.size)
+    if len(raw) < HEADER.size:
+        raise ValueError("File is too short to hold a snapshot header.")
+    magic, version, field_count, record_size, schema_length = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError("Not a binary snapshot file.")
+    if version != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported snapshot schema version {version}.")
+    if record_size != 8 * (field_count + 1):
+        raise ValueError(f"Record size {record_size} does not match {field_count} fields plus a timestamp.")
+    schema = handle.read(schema_length)
+    if len(schema) < schema_length:
+        raise ValueError("File is too short to hold its snapshot schema.")
+    fields = _decode_schema(schema, field_count)
+    return fields, HEADER.size + schema_length, record_size
+
+
+class SnapshotWriter:
+    """
+    Appends fixed-width numeric snapshot records to a binary file.
+
+    A new file gets a header with the field schema; an existing file is
+    appended to after checking that its schema matches.
+    """
+
+    def __init__(self, path, fields=DEFAULT_FIELDS):
+        self.path = path
+        self.fields = tuple(fields)
+        self.record_size = 8 * (len(self.fields) + 1)
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as handle:
+                existing_fields = read_header(handle)[0]
+            if existing_fields != self.fields:
+                raise ValueError(f"{path} was written with a different schema: {existing_fields}")
+        else:
+            schema = _encode_schema(self.fields)
+            with open(path, 'wb') as handle:
+                handle.write(HEADER.pack(MAGIC, SCHEMA_VERSION, len(self.fields), self.record_size, len(schema)))
+                handle.write(schema)
+
+    def append_many(self, records):
+        """
+        Appends records in one write.
+
+        Args:
+        - records (iterable): (timestamp, values) pairs, where values is a
+          {field: number} mapping (missing fields are stored as NaN) or a
+          sequence in schema order.
+
+        Returns:
+        - int: Number of records written.
+        """
+        buffer = array('d')
+        count = 0
+        for timestamp, values in records:
+            buffer.append(timestamp)
+            if isinstance(values, dict):
+                buffer.extend(float(values.get(name, math.nan)) for name in self.fields)
+            else:
+                if len(values) != len(self.fields):
+                    raise ValueError(f"Expected {len(self.fields)} values, got {len(values)}.")
+                buffer.extend(float(value) for value in values)
+            count += 1
+
+        if sys.byteorder != 'little':
+            buffer.byteswap()
+        with open(self.path, 'ab') as handle:
+            buffer.tofile(handle)
+        logger.debug("Appended %s snapshot records to %s.", count, self.path)
+        return count
+
+    def append(self, timestamp, values):
+        return self.append_many([(timestamp, values)])
+
+    def close(self):
+        # Every append opens and closes the file itself; nothing is held open
+        pass
+
+
+class SnapshotReader:
+    """
+    Memory-maps a binary snapshot file and reads records without copying them.
+
+    `values` is a flat float64 memoryview over the record area; columns and
+    timestamps are sliced out of it as further views. Records (iteration and
+    record()) are small copies, so they stay valid after close(). A column
+    view still alive at close() keeps the mapping open until it is released.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as handle:
+            self.fields, self._data_offset, self.record_size = read_header(handle)
+        self.width = len(self.fields) + 1
+        if sys.byteorder != 'little':
+            raise ValueError("Memory-mapped reading requires a little-endian host.")
+        self._handle = open(path, 'rb')
+        size = os.path.getsize(path)
+        usable = (size - self._data_offset) // self.record_size * self.record_size
+        if usable:
+            self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._base = memoryview(self._mmap)
+            self.values = self._base[self._data_offset:self._data_offset + usable].cast('d')
+        else:
+            self._mmap = None
+            self._base = None
+            self.values = memoryview(array('d'))
+
+    def __len__(self):
+        return len(self.values) // self.width
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.values.release()
+        if self._base is not None:
+            self._base.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a column or timestamps view; the mapping is
+                # unmapped once the last view is garbage collected
+                logger.debug("Snapshot views of %s still in use; leaving the mapping open.", self.path)
+            self._mmap = None
+        self._handle.close()
+
+    def record(self, index):
+        """Returns (timestamp, values tuple) for one record."""
+        if not 0 <= index < len(self):
+            raise IndexError("Snapshot record index out of range.")
+        start = index * self.width
+        row = self.values[start:start + self.width].tolist()
+        return row[0], tuple(row[1:])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def timestamps(self):
+        """Strided view over every record's timestamp."""
+        return self.values[0::self.width]
+
+    def column(self, name):
+        """Strided view over one field across all records."""
+        return self.values[self.fields.index(name) + 1::self.width]
+
+    def time_range(self, start=None, end=None):
+        """Returns (first, last) record indexes with start <= timestamp < end, by bisection."""
+        timestamps = self.timestamps()
+
+        def bisect(value):
+            low, high = 0, len(timestamps)
+            while low < high:
+                middle = (low + high) // 2
+                if timestamps[middle] < value:
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+
+        first = 0 if start is None else bisect(start)
+        last = len(timestamps) if end is None else bisect(end)
+        return first, last
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+import time
+import threading
+import importlib
+from self_metrics import get_self_metrics
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Collector name -> (manager, report method name, timeout in seconds), in report order.
+# Managers are 'module:Class' references, imported only when their collector is first used.
+DEFAULT_COLLECTORS = {
+    'cpu': ('cpu_management:CPUManager', 'monitor_cpu', 5.0),
+    'process': ('process_management:ProcessManager', 'manage_processes', 10.0),
+    'process_changes': ('process_management:ProcessManager', 'track_processes', 10.0),
+    'top_processes': ('process_management:ProcessManager', 'top_processes', 10.0),
+    'memory': ('memory_management:MemoryManager', 'memory_statistics', 5.0),
+    'disk': ('disk_management:DiskManager', 'manage_disk', 10.0),
+    'network': ('network_management:NetworkManager', 'network_report', 15.0),
+    'system': ('system_infoAnalyzer:SystemInformation', 'system_info', 5.0),
+    'battery': ('battery_management:BatteryManager', 'batteryManagement', 5.0),
+}
+
+# Collectors that make up the all-in-one report when no selection is given
+DEFAULT_REPORT = ('cpu', 'process', 'memory', 'disk', 'network', 'system', 'battery')
+
+# Short names accepted wherever collectors are selected by name
+COLLECTOR_ALIASES = {
+    'mem': 'memory',
+    'proc': 'process',
+    'top': 'top_processes',
+    'net': 'network',
+    'sys': 'system',
+    'bat': 'battery',
+}
+
+
+def load_manager(reference):
+    """
+    Returns the manager class for a registry entry.
+
+    Args:
+    - reference (str | type): A 'module:Class' string, imported on demand, or the class itself.
+    """
+    if not isinstance(reference, str):
+        return reference
+    module_name, _, class_name = reference.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class CollectionEngine:
+    """
+    Runs report collectors concurrently, one daemon thread each.
+
+    Every collector has its own deadline. A collector that fails, exits or
+    misses its deadline is replaced in the report by an error marker so the
+    remaining sections are still returned. A collector that hangs keeps its
+    daemon thread, which neither blocks interpreter exit nor gets a second
+    thread: until it returns, later collections report it as still running.
+    """
+
+    def __init__(self, collectors=None, self_metrics=False):
+        self.self_metrics = self_metrics  # Append the "Collector Self-Metrics" section to every collection
+        self.collectors = dict(DEFAULT_COLLECTORS if collectors is None else collectors)
+        self.default_names = [name for name in DEFAULT_REPORT if name in self.collectors] or list(self.collectors)
+        self._instances = {}
+        self._running = {}  # Collector name -> thread of a run that missed its deadline
+
+    def prepare(self, names):
+        """
+        Starts what the selected collectors need before their first run.
+
+        With the cpu collector selected, this seeds the CPU sampler's first
+        cpu_times snapshot, so the first CPU report does not wait for a window.
+        Schedulers call it when they are built; collect() calls it as well.
+        """
+        if 'cpu' in names:
+            # Imported here so that importing the engine does not load psutil
+            from cpu_sampler import get_cpu_sampler
+            get_cpu_sampler().start()
+
+    def get_instance(self, name):
+        """Returns the manager object for a collector, created once and reused afterwards."""
+        if name not in self._instances:
+            manager_class = load_manager(self.collectors[name][0])
+            self._instances[name] = manager_class()
+        return self._instances[name]
+
+    def resolve(self, names):
+        """
+        Maps collector names and aliases to registered collector names.
+
+        Args:
+        - names (str | list): Collector names, or one comma-separated string of them.
+
+        Returns:
+        - list: Registered collector names, in the order given.
+        """
+        if isinstance(names, str):
+            names = names.split(',')
+        resolved = [COLLECTOR_ALIASES.get(name.strip().lower(), name.strip().lower()) for name in names if name.strip()]
+        unknown = [name for name in resolved if name not in self.collectors]
+        if unknown:
+            raise ValueError(f"Unknown collectors: {', '.join(unknown)}. "
+                             f"Choose from: {', '.join(self.collectors)}.")
+        if not resolved:
+            raise ValueError("No collectors selected.")
+        return resolved
+
+    @staticmethod
+    def error_marker(name, message):
+        """Builds the report section that stands in for a failed collector."""
+        return {
+            'Collector Error': {
+                'Collector': name,
+                'Error': message,
+            }
+        }
+
+    def _run_collector(self, name, method_name=None):
+        method = getattr(self.get_instance(name), method_name or self.collectors[name][1])
+        started = time.perf_counter()
+        report = get_self_metrics().run_profiled(method)
+        return report, time.perf_counter() - started
+
+    def _start_collector(self, name, method_name=None):
+        # Daemon thread: a collector stuck in a system call must not keep the process alive at exit
+        outcome = {}
+
+        def worker():
+            try:
+                outcome['result'] = self._run_collector(name, method_name)
+            except SystemExit:
+                # Managers call sys.exit(1) on failure; keep that from ending the whole run
+                outcome['error'] = 'Collector exited with an error.'
+            except Exception as e:
+                outcome['error'] = f'{e}'
+
+        thread = threading.Thread(target=worker, name=f'collector-{name}', daemon=True)
+        thread.start()
+        return thread, outcome
+
+    def _gather(self, names, timeouts=None, methods=None):
+        """
+        Runs collectors concurrently, each under its own deadline.
+
+        Args:
+        - names (list): Collector names to run.
+        - timeouts (dict): Per-collector timeout overrides in seconds.
+        - methods (dict): Per-collector method overrides, e.g. {'network': 'collect_traffic'}.
+
+        Returns:
+        - dict: Collector name -> (result, error message); result is None when the collector failed.
+        """
+        timeouts = timeouts or {}
+        methods = methods or {}
+        results = {}
+        metrics = get_self_metrics()
+        self.prepare(names)
+
+        started = time.monotonic()
+        runs = {}
+        for name in names:
+            late = self._running.get(name)
+            if late is not None and late.is_alive():
+                results[name] = (None, 'Still running from an earlier collection.')
+                logger.error("Collector '%s' is still running from an earlier collection; skipped.", name)
+                continue
+            self._running.pop(name, None)
+            runs[name] = self._start_collector(name, methods.get(name))
+
+        for name, (thread, outcome) in runs.items():
+            timeout = timeouts.get(name, self.collectors[name][2])
+            thread.join(max(started + timeout - time.monotonic(), 0))
+            failed, duration = True, None
+            if thread.is_alive():
+                # Left running on its own; it is not started again until it returns
+                self._running[name] = thread
+                results[name] = (None, f'Timed out after {timeout} seconds.')
+                logger.error("Collector '%s' timed out after %s seconds.", name, timeout)
+            elif 'error' in outcome:
+                results[name] = (None, outcome['error'])
+                logger.error("Collector '%s' failed: %s", name, outcome['error'])
+            else:
+                report, duration = outcome['result']
+                failed = report is None
+                results[name] = (report, 'Collector returned no data.' if report is None else None)
+                if report is None:
+                    logger.warning("Collector '%s' returned no data.", name)
+            if metrics.enabled:
+                # Late or failed collectors are counted up to the moment the engine gave up on them
+                metrics.record(f'collector.{name}', duration if duration is not None else time.monotonic() - started,
+                               error=failed)
+        return results
+
+    def collect(self, names=None, timeouts=None, methods=None):
+        """
+        Runs the selected collectors at once and returns their reports in registry order.
+
+        Args:
+        - names (list): Collector names to run; the all-in-one selection when omitted.
+        - timeouts (dict): Per-collector timeout overrides in seconds.
+        - methods (dict): Per-collector report method overrides, e.g. {'process': 'stream_processes'}.
+
+        Returns:
+        - list: One report (or error marker) per collector, followed by the
+          "Collector Self-Metrics" section when self_metrics is set.
+        """
+        names = list(self.default_names) if names is None else list(names)
+        results = self._gather(names, timeouts, methods)
+        reports = []
+        for name in names:
+            report, error = results[name]
+            reports.append(report if report is not None else self.error_marker(name, error))
+        if self.self_metrics:
+            reports.append(get_self_metrics().report())
+        return reports
+
+    def collect_snapshots(self, methods, timeouts=None):
+        """
+        Runs typed-snapshot methods of the collectors under the same deadlines as reports.
+
+        Args:
+        - methods (dict): Collector name -> method returning a snapshot, e.g. {'cpu': 'collect'}.
+        - timeouts (dict): Per-collector timeout overrides in seconds.
+
+        Returns:
+        - dict: Collector name -> snapshot, or None when the collector failed or timed out.
+        """
+        results = self._gather(list(methods), timeouts, methods)
+        return {name: snapshot for name, (snapshot, _) in results.items()}
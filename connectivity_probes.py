@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+import asyncio
+import socket
+import threading
+import time
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Probed by check_network_connectivity unless other targets are configured
+DEFAULT_TARGETS = ('dns:www.google.com',)
+
+
+class ConnectivityProber:
+    """
+    Runs connectivity probes concurrently with asyncio and caches their results.
+
+    Targets are either 'host:port' (a TCP connect) or 'dns:name' (a resolver
+    lookup). Every probe has a hard timeout, and a result is reused until its
+    TTL expires, so repeated reports do not re-probe each time.
+    """
+
+    def __init__(self, targets=DEFAULT_TARGETS, timeout=2.0, ttl=30.0):
+        self.targets = list(targets)
+        self.timeout = timeout
+        self.ttl = ttl
+        self._cache = {}  # target -> (expires_at, result)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_target(target):
+        """Splits a target into ('dns', name, None) or ('tcp', host, port)."""
+        if target.startswith('dns:'):
+            return 'dns', target[4:], None
+        host, separator, port = target.rpartition(':')
+        if not separator or not port.isdigit():
+            raise ValueError(f"Invalid probe target '{target}'. Use 'host:port' or 'dns:name'.")
+        return 'tcp', host.strip('[]'), int(port)
+
+    @staticmethod
+    async def _resolve(name):
+        # getaddrinfo cannot be cancelled, so run it on a daemon thread that a timed-out
+        # probe can simply abandon instead of the loop's executor, which is joined on close
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def deliver(setter, value):
+            if not future.done():
+                setter(value)
+
+        def worker():
+            try:
+                setter, value = future.set_result, socket.getaddrinfo(name, None)
+            except Exception as e:
+                setter, value = future.set_exception, e
+            try:
+                loop.call_soon_threadsafe(deliver, setter, value)
+            except RuntimeError:
+                pass  # The loop has already closed after a timeout
+
+        threading.Thread(target=worker, name=f'probe-dns-{name}', daemon=True).start()
+        return await future
+
+    async def _probe(self, target):
+        started = time.monotonic()
+        try:
+            kind, host, port = self.parse_target(target)
+            if kind == 'dns':
+                await asyncio.wait_for(self._resolve(host), self.timeout)
+            else:
+                _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout)
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+            reachable, error = True, None
+        except asyncio.TimeoutError:
+            reachable, error = False, f'Timed out after {self.timeout} seconds.'
+        except Exception as e:
+            reachable, error = False, f'{e}'
+
+        return {
+            'target': target,
+            'reachable': reachable,
+            'latency': round(time.monotonic() - started, 6),
+            'error': error,
+        }
+
+    async def _probe_all(self, targets):
+        return await asyncio.gather(*(self._probe(target) for target in targets))
+
+    def probe(self, targets=None, use_cache=True):
+        """
+        Probes the targets concurrently and returns one result dict per target.
+
+        Args:
+        - targets (list): Targets to probe; the configured targets when omitted.
+        - use_cache (bool): Reuse results younger than the TTL.
+        """
+        targets = self.targets if targets is None else list(targets)
+        now = time.monotonic()
+        results = {}
+        with self._lock:
+            if use_cache:
+                for target in targets:
+                    cached = self._cache.get(target)
+                    if cached is not None and cached[0] > now:
+                        results[target] = cached[1]
+
+        pending = [target for target in targets if target not in results]
+        if pending:
+            logger.info("Probing connectivity targets: %s", pending)
+            loop = asyncio.new_event_loop()
+            try:
+                fresh = loop.run_until_complete(self._probe_all(pending))
+            finally:
+                loop.close()
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                for result in fresh:
+                    self._cache[result['target']] = (expires_at, result)
+                    results[result['target']] = result
+
+        return [results[target] for target in targets]
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_shared_prober = None
+_shared_prober_lock = threading.Lock()
+
+
+def get_connectivity_prober():
+    """Returns the process-wide connectivity prober, creating it on first use."""
+    global _shared_prober
+    with _shared_prober_lock:
+        if _shared_prober is None:
+            _shared_prober = ConnectivityProber()
+        return _shared_prober
+
+
+def configure_connectivity_prober(targets, timeout=2.0, ttl=30.0):
+    """
+    Replaces the process-wide prober with one for the given targets.
+
+    Args:
+    - targets (str | list): Targets, or one comma-separated string of them, e.g. 'dns:example.com,10.0.0.1:443'.
+    - timeout (float): Hard timeout per probe in seconds.
+    - ttl (float): Seconds a probe result is reused.
+    """
+    global _shared_prober
+    if isinstance(targets, str):
+        targets = targets.split(',')
+    targets = [target.strip() for target in targets if target.strip()]
+    if not targets:
+        raise ValueError("No connectivity probe targets given.")
+    for target in targets:
+        ConnectivityProber.parse_target(target)  # Reject malformed targets before any report runs
+    prober = ConnectivityProber(targets, timeout=timeout, ttl=ttl)
+    with _shared_prober_lock:
+        _shared_prober = prober
+    logger.info("Connectivity probe targets: %s", targets)
+    return prober
@@ -1,28 +1,18 @@
 #!/usr/bin/env python3
 
-import json
+import time
 import psutil
 import sys
-from report_signatures import TimeStampGenerator
+from cpu_sampler import get_cpu_sampler
+from snapshots import CPUSnapshot
+from report_renderer import render_cpu
+from self_metrics import instrumented
+from sample_bus import publish
 import logging  # Import the logging module
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
-
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-# Add the file handler to the logger
-logger.addHandler(file_handler)
-
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
-
 class CPUManager:
     def __init__(self):
         self.cpu_usage = None
@@ -32,78 +22,72 @@ class CPUManager:
         self.cpu_frequents = None
         self.cpu_stats = None
 
-    # Function to monitor CPU usage and related statistics
-    def monitor_cpu(self):
-        try:
-            logger.info("Started CPU monitoring process.")
-            
-            # Retrieve total CPU usage
-            self.cpu_usage = psutil.cpu_percent(interval=1, percpu=False)
-            logger.debug(f"Total CPU Usage: {self.cpu_usage}%")
-            
-            # Retrieve total processor cores count (Logical)
-            self.logical_cpu_count = psutil.cpu_count(logical=True)
-            # Retrieve total processor cores count (Physical)
-            self.physical_cpu_count = psutil.cpu_count(logical=False)
-            logger.debug(f"Logical CPU cores: {self.logical_cpu_count}, Physical CPU cores: {self.physical_cpu_count}")
+    # Function to collect CPU usage and related statistics as raw numbers
+    @instrumented()
+    def collect(self, fresh=False, window=1.0):
+        logger.info("Started CPU monitoring process.")
+        timestamp = time.time()
 
-            # Retrieve system CPU times statistics as time durations
-            self.cpu_time = psutil.cpu_times(percpu=False)
-            logger.debug(f"CPU Times: {self.cpu_time}")
+        # Retrieve total CPU usage and time percentages from the background sampler
+        # (fresh mode measures over a dedicated window of the given length instead)
+        self.cpu_usage, self.cpu_time_percentages = get_cpu_sampler().latest(fresh=fresh, window=window)
+        logger.debug("Total CPU Usage: %s%%", self.cpu_usage)
 
-            # Retrieve system CPU times statistics as percentages
-            self.cpu_time_percentages = psutil.cpu_times_percent(interval=1, percpu=False)
-            logger.debug(f"CPU Times Percentages: {self.cpu_time_percentages}")
+        # Retrieve total processor cores count (Logical)
+        self.logical_cpu_count = psutil.cpu_count(logical=True)
+        # Retrieve total processor cores count (Physical)
+        self.physical_cpu_count = psutil.cpu_count(logical=False)
+        logger.debug("Logical CPU cores: %s, Physical CPU cores: %s", self.logical_cpu_count, self.physical_cpu_count)
 
-            # Retrieve current, min, and max CPU frequencies
-            self.cpu_frequents = psutil.cpu_freq(percpu=False)
-            logger.debug(f"CPU Frequencies: Current = {self.cpu_frequents.current} MHz, Min = {self.cpu_frequents.min} MHz, Max = {self.cpu_frequents.max} MHz")
+        # Retrieve system CPU times statistics as time durations
+        self.cpu_time = psutil.cpu_times(percpu=False)
+        logger.debug("CPU Times: %s", self.cpu_time)
 
-            # Retrieve CPU stats
-            self.cpu_stats = psutil.cpu_stats()
-            logger.debug(f"CPU Stats: {self.cpu_stats}")
+        # System CPU times statistics as percentages were taken with the usage above
+        logger.debug("CPU Times Percentages: %s", self.cpu_time_percentages)
 
-            statistics = {
-                'CPU Usage Statistics': {
-                    'Total CPU Usage': f'{self.cpu_usage} %',
-                    'Total Processor Cores Count (Logical)': f'{self.logical_cpu_count}',
-                    'Total Processor Cores Count (Physical)': f'{self.physical_cpu_count}',
-                    'CPU Load Status': f'{"CPU load is normal." if self.cpu_usage < 75 else "CPU load is too high."}',
-                    'System CPU Time Statistics (Time)': {
-                        'User': f'{TimeStampGenerator().convertTime(self.cpu_time[0])}',
-                        'System': f'{TimeStampGenerator().convertTime(self.cpu_time[1])}',
-                        'IDLE': f'{TimeStampGenerator().convertTime(self.cpu_time[2])}',
-                        'Interrupt': f'{TimeStampGenerator().convertTime(self.cpu_time[3])}',
-                        'DPC': f'{TimeStampGenerator().convertTime(self.cpu_time[4])}'
-                    },
-                    'System CPU Time Statistics (Percentages)': {
-                        'User': f'{self.cpu_time_percentages[0]} %',
-                        'System': f'{self.cpu_time_percentages[1]} %',
-                        'IDLE': f'{self.cpu_time_percentages[2]} %',
-                        'Interrupt': f'{self.cpu_time_percentages[3]} %',
-                        'DPC': f'{self.cpu_time_percentages[4]} %'
-                    },
-                    'CPU Frequency Statistics': {
-                        'Current': f'{self.cpu_frequents.current} Mhz',
-                        'Min': f'{self.cpu_frequents.min} Mhz',
-                        'Max': f'{self.cpu_frequents.max} Mhz',
-                    },
-                    'CPU Stats Statistics': {
-                        'Context Switches': f'{self.cpu_stats.ctx_switches}',
-                        'Interrupts': f'{self.cpu_stats.interrupts}',
-                        'Software Interrupts': f'{self.cpu_stats.soft_interrupts}',
-                        'System Calls': f'{self.cpu_stats.syscalls}'
-                    },
-                    'Generated Time & Date': f'{TimeStampGenerator().generate_report()}'
-                }
-            }
+        # Retrieve current, min, and max CPU frequencies
+        self.cpu_frequents = psutil.cpu_freq(percpu=False)
+        logger.debug("CPU Frequencies: Current = %s MHz, Min = %s MHz, Max = %s MHz", self.cpu_frequents.current, self.cpu_frequents.min, self.cpu_frequents.max)
 
-            result = json.dumps(statistics, indent=4)
-            json_output = json.loads(result)
-            logger.info("CPU statistics successfully converted to JSON format.")
-            
-            return json_output  # Return the JSON output as a string
+        # Retrieve CPU stats
+        self.cpu_stats = psutil.cpu_stats()
+        logger.debug("CPU Stats: %s", self.cpu_stats)
+
+        # Feed the alert rules and the metrics history before the report reads their state;
+        # the counters are cumulative and are turned into rates by the analysis stage
+        publish({
+            'cpu.usage': self.cpu_usage,
+            'cpu.ctx_switches': self.cpu_stats.ctx_switches,
+            'cpu.interrupts': self.cpu_stats.interrupts,
+            'cpu.soft_interrupts': self.cpu_stats.soft_interrupts,
+        }, timestamp)
+
+        return CPUSnapshot(
+            timestamp=timestamp,
+            usage=self.cpu_usage,
+            logical_count=self.logical_cpu_count,
+            physical_count=self.physical_cpu_count,
+            times=tuple(self.cpu_time),
+            times_percent=tuple(self.cpu_time_percentages),
+            time_fields=self.cpu_time._fields,
+            freq_current=self.cpu_frequents.current,
+            freq_min=self.cpu_frequents.min,
+            freq_max=self.cpu_frequents.max,
+            ctx_switches=self.cpu_stats.ctx_switches,
+            interrupts=self.cpu_stats.interrupts,
+            soft_interrupts=self.cpu_stats.soft_interrupts,
+            syscalls=self.cpu_stats.syscalls,
+        )
+
+    # Function to monitor CPU usage and related statistics
+    @instrumented()
+    def monitor_cpu(self, fresh=False, window=1.0):
+        try:
+            statistics = render_cpu(self.collect(fresh=fresh, window=window))
+            logger.info("CPU statistics report generated.")
+            return statistics
 
         except Exception as e:
-            logger.error(f"Error during CPU monitoring: {e}")
+            logger.error("Error during CPU monitoring: %s", e)
             sys.exit(1)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+import psutil
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class CPUSampler:
+    """
+    Samples psutil.cpu_times() on a background thread and keeps the latest
+    utilization figures computed from the delta between two snapshots.
+
+    Reading the latest values never sleeps; only fresh mode waits for a
+    sampling window. The first snapshot is taken when the sampler is
+    created, so the first read before any background sample is the delta
+    since then (waiting at most MIN_WINDOW if the sampler was just created).
+    """
+
+    MIN_WINDOW = 0.1  # Shortest delta the first read computes usage over, in seconds
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._previous = psutil.cpu_times(percpu=False)
+        self._previous_time = time.monotonic()
+        self._latest_usage = None
+        self._latest_times_percent = None
+
+    @staticmethod
+    def total_time(times):
+        """Sum of a cpu_times snapshot, without guest time (already counted in user and nice on Linux)."""
+        return sum(times) - getattr(times, 'guest', 0.0) - getattr(times, 'guest_nice', 0.0)
+
+    @staticmethod
+    def compute_usage(t1, t2):
+        """Computes the busy percentage between two cpu_times snapshots."""
+        # Same accounting as psutil.cpu_percent(): idle and iowait are not busy time
+        idle_1 = t1.idle + getattr(t1, 'iowait', 0.0)
+        idle_2 = t2.idle + getattr(t2, 'iowait', 0.0)
+        total_delta = CPUSampler.total_time(t2) - CPUSampler.total_time(t1)
+        if total_delta <= 0:
+            return 0.0
+        busy_delta = total_delta - (idle_2 - idle_1)
+        return round(min(max(busy_delta / total_delta * 100, 0.0), 100.0), 1)
+
+    @staticmethod
+    def compute_times_percent(t1, t2):
+        """Computes per-field time percentages between two cpu_times snapshots."""
+        total_delta = CPUSampler.total_time(t2) - CPUSampler.total_time(t1)
+        values = []
+        for field in t2._fields:
+            field_delta = getattr(t2, field) - getattr(t1, field)
+            if total_delta <= 0:
+                values.append(0.0)
+            else:
+                values.append(round(min(max(field_delta / total_delta * 100, 0.0), 100.0), 1))
+        return type(t2)(*values)
+
+    def _update(self, current):
+        with self._lock:
+            self._latest_usage = self.compute_usage(self._previous, current)
+            self._latest_times_percent = self.compute_times_percent(self._previous, current)
+            self._previous = current
+            self._previous_time = time.monotonic()
+
+    def sample_now(self):
+        """Takes one snapshot immediately and updates the latest values."""
+        self._update(psutil.cpu_times(percpu=False))
+
+    def _run(self):
+        logger.info("CPU sampler started with interval %ss.", self.interval)
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample_now()
+            except Exception as e:
+                logger.error("Error sampling CPU times: %s", e)
+        logger.info("CPU sampler stopped.")
+
+    def start(self):
+        """Starts the background sampling thread if it is not running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background sampling thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    @staticmethod
+    def fresh(window=1.0):
+        """Measures utilization over a dedicated window, independent of the background thread."""
+        t1 = psutil.cpu_times(percpu=False)
+        time.sleep(window)
+        t2 = psutil.cpu_times(percpu=False)
+        return CPUSampler.compute_usage(t1, t2), CPUSampler.compute_times_percent(t1, t2)
+
+    def latest(self, fresh=False, window=1.0):
+        """
+        Returns (usage, times_percent).
+
+        Args:
+        - fresh (bool): Measure over a new window instead of returning the last background sample.
+        - window (float): Length of the fresh measurement window in seconds.
+        """
+        if fresh:
+            return self.fresh(window)
+
+        self.start()
+        with self._lock:
+            usage, times_percent = self._latest_usage, self._latest_times_percent
+        if usage is None:
+            # No background sample yet; use the delta since the snapshot taken at creation
+            with self._lock:
+                age = time.monotonic() - self._previous_time
+            if age < self.MIN_WINDOW:
+                time.sleep(self.MIN_WINDOW - age)
+            self.sample_now()
+            with self._lock:
+                usage, times_percent = self._latest_usage, self._latest_times_percent
+        return usage, times_percent
+
+
+_shared_sampler = None
+_shared_sampler_lock = threading.Lock()
+
+
+def get_cpu_sampler(interval=1.0):
+    """Returns the process-wide CPU sampler, creating it on first use."""
+    global _shared_sampler
+    with _shared_sampler_lock:
+        if _shared_sampler is None:
+            _shared_sampler = CPUSampler(interval=interval)
+        return _shared_sampler
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import threading
+import time
+import psutil
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def device_io_name(device):
+    """
+    Maps a partition device path to its psutil.disk_io_counters(perdisk=True) key.
+
+    Symlinks such as /dev/mapper/vg-root resolve to the kernel name (dm-0).
+    """
+    if not device:
+        return device
+    return os.path.basename(os.path.realpath(device))
+
+
+class DiskIOMonitor:
+    """
+    Computes per-device I/O rates from psutil.disk_io_counters(perdisk=True) deltas.
+
+    Like the network traffic monitor, it keeps the previous counters with
+    their timestamp, so only the very first call waits for a window.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous = None
+        self._previous_time = None
+
+    @staticmethod
+    def _delta(before, after, field):
+        previous = getattr(before, field, None)
+        current = getattr(after, field, None)
+        if previous is None or current is None:
+            return None  # Not provided on this platform
+        # Counters restart from zero when a device is re-attached
+        return current - previous if current >= previous else current
+
+    def _read(self):
+        return psutil.disk_io_counters(perdisk=True, nowrap=True) or {}, time.monotonic()
+
+    def rates(self, window=1.0):
+        """
+        Returns {device: statistics} since the previous call.
+
+        Statistics are read/write IOPS, read/write bytes per second, average
+        service time per operation in milliseconds and utilization percent
+        (None where the platform does not report busy time).
+        """
+        with self._lock:
+            if self._previous is None:
+                self._previous, self._previous_time = self._read()
+                time.sleep(window)
+            current, now = self._read()
+            previous, previous_time = self._previous, self._previous_time
+            self._previous, self._previous_time = current, now
+
+        elapsed = now - previous_time
+        rates = {}
+        if elapsed <= 0:
+            return rates
+        for device, counters in current.items():
+            before = previous.get(device)
+            if before is None:
+                continue  # New device; its rates start on the next sample
+            reads = self._delta(before, counters, 'read_count')
+            writes = self._delta(before, counters, 'write_count')
+            io_time = (self._delta(before, counters, 'read_time') or 0) + (self._delta(before, counters, 'write_time') or 0)
+            busy_time = self._delta(before, counters, 'busy_time')
+            operations = reads + writes
+            rates[device] = {
+                'read_iops': reads / elapsed,
+                'write_iops': writes / elapsed,
+                'read_bytes_per_sec': self._delta(before, counters, 'read_bytes') / elapsed,
+                'write_bytes_per_sec': self._delta(before, counters, 'write_bytes') / elapsed,
+                'avg_service_time_ms': io_time / operations if operations else 0.0,
+                'utilization': min(busy_time / (elapsed * 1000) * 100, 100.0) if busy_time is not None else None,
+            }
+        return rates
+
+
+_shared_monitor = None
+_shared_monitor_lock = threading.Lock()
+
+
+def get_disk_io_monitor():
+    """Returns the process-wide disk I/O monitor, creating it on first use."""
+    global _shared_monitor
+    with _shared_monitor_lock:
+        if _shared_monitor is None:
+            _shared_monitor = DiskIOMonitor()
+        return _shared_monitor
@@ -1,42 +1,82 @@
 #!/usr/bin/env python3
 
-import json
 import sys
+import time
+import threading
 import psutil
 from report_signatures import TimeStampGenerator
+from disk_io import get_disk_io_monitor, device_io_name
+from snapshots import PartitionUsage
+from report_renderer import render_partition_usage, render_storage_level
+from self_metrics import instrumented
+from sample_bus import publish
 import logging  # Import logging module
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
+# File system types commonly skipped on container hosts (--skip-fstypes virtual)
+VIRTUAL_FSTYPES = frozenset({'tmpfs', 'devtmpfs', 'overlay', 'squashfs', 'proc', 'sysfs', 'cgroup', 'cgroup2'})
 
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
 
-# Add the file handler to the logger
-logger.addHandler(file_handler)
+def parse_fstypes(text):
+    """'tmpfs,overlay' -> frozenset; the word 'virtual' expands to VIRTUAL_FSTYPES."""
+    fstypes = set()
+    for name in text.split(','):
+        name = name.strip().lower()
+        if name == 'virtual':
+            fstypes |= VIRTUAL_FSTYPES
+        elif name:
+            fstypes.add(name)
+    return frozenset(fstypes)
+
+
+def configure_skip_fstypes(fstypes):
+    """
+    Sets the file system types every DiskManager skips unless given its own list.
+
+    This reaches the managers built by the collector registry, MetricsHistory,
+    the metrics endpoint and the wizard alike.
+    """
+    DiskManager.default_skip_fstypes = frozenset(fstypes)
+    logger.info("Skipping file system types: %s", ', '.join(sorted(fstypes)) or 'none')
 
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
 
 class DiskManager:
-    def __init__(self):
+    # Mount point -> (retry_at, consecutive timeouts), shared by every manager in the process
+    _unresponsive = {}
+    _unresponsive_lock = threading.Lock()
+    BACKOFF_BASE = 30.0  # Seconds to skip a mount after its first timeout
+    BACKOFF_MAX = 900.0
+    # File system types skipped by managers created without skip_fstypes (set by configure_skip_fstypes)
+    default_skip_fstypes = frozenset()
+
+    def __init__(self, skip_fstypes=None, usage_timeout=2.0):
         self.partitions = []  # Initialize as an empty list
+        self.mountpoints = {}  # Device name -> mount points, filled by the overall report
+        self.partition_mounts = []  # (device, mount point) pairs, filled by the overall report
+        self.skip_fstypes = self.default_skip_fstypes if skip_fstypes is None else frozenset(skip_fstypes)
+        self.usage_timeout = usage_timeout
+        self.usage = None  # Mount point -> disk usage, or None when unresponsive
 
     # Function to generate storage overall report
+    @instrumented(items=len)
     def generate_overall_report(self):
         try:
             logger.info("Started generating overall storage report.")
             partition_info = []
+            self.partitions = []  # Reset so a reused manager does not accumulate devices
+            self.mountpoints = {}
+            self.partition_mounts = []
+            self.usage = None
             # Storage Overall Report
             local_partitions = psutil.disk_partitions()
-            logger.debug(f"Local partitions retrieved: {local_partitions}")
+            logger.debug("Local partitions retrieved: %s", local_partitions)
             
             for partition in local_partitions:
+                if partition.fstype in self.skip_fstypes:
+                    continue
+
                 partition_dict = {
                     "Device": partition.device,
                     "MountPoint": partition.mountpoint,
@@ -52,92 +92,189 @@ class DiskManager:
                     pass  # Ignore the error if the attribute is not available
 
                 self.partitions.append(partition.device)  # Store device name only
+                self.mountpoints.setdefault(partition.device, []).append(partition.mountpoint)
+                self.partition_mounts.append((partition.device, partition.mountpoint))
                 partition_info.append(partition_dict)
             
             logger.info("Overall storage report generated successfully.")
             return partition_info
         except Exception as e:
-            logger.error(f"Error generating overall report: {e}")
+            logger.error("Error generating overall report: %s", e)
             return []  # Return empty list if error occurs
 
+    @staticmethod
+    def _start_usage_query(mountpoint):
+        # Daemon thread: a statvfs stuck on a dead network mount must not keep the process alive
+        outcome = {}
+
+        def worker():
+            try:
+                outcome['usage'] = psutil.disk_usage(mountpoint)
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=worker, name=f'statvfs-{mountpoint}', daemon=True)
+        thread.start()
+        return thread, outcome
+
+    @classmethod
+    def _skip_unresponsive(cls, mountpoint, now):
+        with cls._unresponsive_lock:
+            entry = cls._unresponsive.get(mountpoint)
+            return entry is not None and entry[0] > now
+
+    @classmethod
+    def _mark_unresponsive(cls, mountpoint, now):
+        with cls._unresponsive_lock:
+            failures = cls._unresponsive.get(mountpoint, (0, 0))[1] + 1
+            backoff = min(cls.BACKOFF_BASE * 2 ** (failures - 1), cls.BACKOFF_MAX)
+            cls._unresponsive[mountpoint] = (now + backoff, failures)
+        logger.warning("Mount %s did not answer statvfs in time; skipping it for %.0fs.", mountpoint, backoff)
+
+    @classmethod
+    def _mark_responsive(cls, mountpoint):
+        with cls._unresponsive_lock:
+            cls._unresponsive.pop(mountpoint, None)
+
+    # Function to query every partition's usage once per report
+    @instrumented(items=len)
+    def collect_usage(self):
+        """
+        Issues one statvfs per mount point, all in parallel under a shared deadline.
+
+        Mounts that miss the deadline are marked unresponsive and skipped in
+        later reports with exponential backoff.
+        """
+        logger.info("Collecting disk usage snapshot.")
+        self.usage = {}
+        timestamp = time.time()
+        now = time.monotonic()
+        queries = {}
+        for _, mountpoint in self.partition_mounts:
+            if mountpoint in queries or mountpoint in self.usage:
+                continue
+            if self._skip_unresponsive(mountpoint, now):
+                self.usage[mountpoint] = None
+                continue
+            queries[mountpoint] = self._start_usage_query(mountpoint)
+
+        deadline = now + self.usage_timeout
+        for mountpoint, (thread, outcome) in queries.items():
+            thread.join(max(deadline - time.monotonic(), 0))
+            if thread.is_alive():
+                self._mark_unresponsive(mountpoint, time.monotonic())
+                self.usage[mountpoint] = None
+            elif 'error' in outcome:
+                logger.debug("Disk usage for %s unavailable: %s", mountpoint, outcome['error'])
+            else:
+                self._mark_responsive(mountpoint)
+                self.usage[mountpoint] = outcome['usage']
+
+        # Feed the alert rules and the metrics history before the storage level report reads their state
+        samples = {}
+        for mountpoint, usage in self.usage.items():
+            if usage is not None:
+                samples[f'disk.{mountpoint}.free'] = usage.free
+                samples[f'disk.{mountpoint}.free_percent'] = usage.free / usage.total * 100 if usage.total else 0.0
+        publish(samples, timestamp)
+        return self.usage
+
+    def partition_usages(self):
+        """Returns a PartitionUsage for every partition the usage snapshot has an entry for."""
+        if self.usage is None:
+            self.collect_usage()
+        usages = []
+        for device, mountpoint in self.partition_mounts:
+            if mountpoint not in self.usage:
+                continue
+            usage = self.usage[mountpoint]
+            if usage is None:
+                usages.append(PartitionUsage(device=device, mountpoint=mountpoint, responsive=False))
+            else:
+                usages.append(PartitionUsage(device=device, mountpoint=mountpoint, total=usage.total,
+                                             used=usage.used, free=usage.free, percent=usage.percent))
+        return usages
+
     # Function to generate storage statistics report
+    @instrumented(items=len)
     def generate_statistics_report(self):
         try:
             logger.info("Started generating storage statistics report.")
-            disk_info = []
             # Storage Statistics Report
-            for partition in self.partitions:
-                usage = psutil.disk_usage(partition)
-                logger.debug(f"Disk usage for partition {partition}: {usage}")
-                disk_dict = {
-                    "Local Disk": partition,
-                    "Total": f"{usage.total / (1024 ** 3):.2f} GB",
-                    "Used": f"{usage.used / (1024 ** 3):.2f} GB",
-                    "Free": f"{usage.free / (1024 ** 3):.2f} GB",
-                    "Percentage Used": f"{usage.percent} %",
-                    "Percentage Free": f"{(usage.free / usage.total * 100):.1f} %"
-                }
-                disk_info.append(disk_dict)
+            disk_info = [render_partition_usage(usage) for usage in self.partition_usages()]
 
             logger.info("Storage statistics report generated successfully.")
             return disk_info
         except Exception as e:
-            logger.error(f"Error generating statistics report: {e}")
+            logger.error("Error generating statistics report: %s", e)
             return []  # Return empty list if error occurs
 
     # Function to check storage level
+    @instrumented(items=len)
     def check_storage_level(self):
         try:
             logger.info("Started checking storage level.")
-            partition_info = []
             # Storage Level Checker
-            for partition in self.partitions:
-                disk = psutil.disk_usage(partition)
-                free_percentage = disk.free / disk.total * 100
-                free_gigabytes = disk.free / 2 ** 30
-                minimum_gigabytes = 2
-                minimum_percentage = 10
-
-                if free_percentage < minimum_percentage or free_gigabytes < minimum_gigabytes:
-                    status = "Storage isn't sufficient."
-                else:
-                    status = "Storage is sufficient."
-
-                partition_dict = {
-                    "Partition": partition,
-                    "Status": status
-                }
-
-                partition_info.append(partition_dict)
+            partition_info = [render_storage_level(usage) for usage in self.partition_usages()]
 
             logger.info("Storage level check completed.")
             return partition_info
         except Exception as e:
-            logger.error(f"Error checking storage level: {e}")
+            logger.error("Error checking storage level: %s", e)
+            return []  # Return empty list if error occurs
+
+    # Function to generate disk I/O throughput and latency report
+    @instrumented(items=len)
+    def generate_io_report(self):
+        try:
+            logger.info("Started generating disk I/O report.")
+            # Mount points discovered by the overall report, keyed by kernel device name
+            mountpoints_by_io_name = {}
+            for device, mountpoints in self.mountpoints.items():
+                mountpoints_by_io_name.setdefault(device_io_name(device), []).extend(mountpoints)
+
+            io_info = []
+            for device, rate in sorted(get_disk_io_monitor().rates().items()):
+                io_info.append({
+                    "Device": device,
+                    "MountPoints": mountpoints_by_io_name.get(device, []),
+                    "Read IOPS": f"{rate['read_iops']:.2f}",
+                    "Write IOPS": f"{rate['write_iops']:.2f}",
+                    "Read Throughput": f"{rate['read_bytes_per_sec'] / (1024 ** 2):.2f} MB/s",
+                    "Write Throughput": f"{rate['write_bytes_per_sec'] / (1024 ** 2):.2f} MB/s",
+                    "Average Service Time": f"{rate['avg_service_time_ms']:.2f} ms",
+                    "Utilization": f"{rate['utilization']:.1f} %" if rate['utilization'] is not None else "None"
+                })
+
+            logger.info("Disk I/O report generated successfully.")
+            return io_info
+        except Exception as e:
+            logger.error("Error generating disk I/O report: %s", e)
             return []  # Return empty list if error occurs
 
     # Function to manage disk statistics and save reports
+    @instrumented()
     def manage_disk(self):
         try:
             logger.info("Started managing disk statistics.")
             overall_report = self.generate_overall_report()
+            self.collect_usage()  # One statvfs per mount, shared by both reports below
             storage_report = self.generate_statistics_report()
             storage_level = self.check_storage_level()
+            io_report = self.generate_io_report()
 
             statistics = {
                 'Disk Statistics': {
                     'Storage Overall Report': overall_report,
                     'Storage Statistics Report': storage_report,
                     'Storage Level Report': storage_level,
+                    'Disk I/O Report': io_report,
                     'Generated Time & Date': f'{TimeStampGenerator().generate_report()}'
                 }
             }
 
-            result = json.dumps(statistics, indent=4)
-            json_output = json.loads(result)
-            logger.info("Disk statistics successfully converted to JSON format.")
-            
-            return json_output  # Return the JSON output as a string
+            logger.info("Disk statistics report generated successfully.")
+            return statistics
         except Exception as e:
-            logger.error(f"Error during disk management: {e}")
+            logger.error("Error during disk management: %s", e)
             sys.exit(1)
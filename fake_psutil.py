@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic psutil backends for benchmarking.
+
+FakePsutil patches the psutil functions the collectors call with
+deterministic in-memory data sized like a large production host, so the
+analyzer's own cost can be measured at scale on any machine. Everything
+the collectors do not read (CPU times, memory, users, ...) stays real.
+"""
+
+import random
+import socket
+import time
+import zlib
+from collections import namedtuple
+from contextlib import contextmanager
+from unittest import mock
+import psutil
+
+Address = namedtuple('Address', ['ip', 'port'])
+Connection = namedtuple('Connection', ['fd', 'family', 'type', 'laddr', 'raddr', 'status', 'pid'])
+Partition = namedtuple('Partition', ['device', 'mountpoint', 'fstype', 'opts', 'maxfile', 'maxpath'])
+DiskUsage = namedtuple('DiskUsage', ['total', 'used', 'free', 'percent'])
+DiskIO = namedtuple('DiskIO', ['read_count', 'write_count', 'read_bytes', 'write_bytes',
+                               'read_time', 'write_time', 'busy_time'])
+NetIO = namedtuple('NetIO', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                             'errin', 'errout', 'dropin', 'dropout'])
+CPUTimes = namedtuple('CPUTimes', ['user', 'system'])
+IOCounters = namedtuple('IOCounters', ['read_bytes', 'write_bytes'])
+MemoryInfo = namedtuple('MemoryInfo', ['rss', 'vms'])
+Battery = namedtuple('Battery', ['percent', 'secsleft', 'power_plugged'])
+
+# Shape of the synthetic host when no other scale is given
+DEFAULT_SCALE = {'processes': 10000, 'sockets': 200000, 'mounts': 500}
+
+TCP_STATES = ('ESTABLISHED', 'LISTEN', 'TIME_WAIT', 'CLOSE_WAIT', 'SYN_SENT')
+PROCESS_STATES = ('running', 'sleeping', 'sleeping', 'sleeping', 'idle')
+
+
+class FakeProcess:
+    """Stands in for psutil.Process with fixed counters that advance on every read."""
+
+    __slots__ = ('pid', '_name', '_create_time', '_rss', '_threads', '_status', '_cpu', '_io')
+
+    def __init__(self, pid, rng):
+        self.pid = pid
+        self._name = f'worker-{pid % 97}'
+        self._create_time = 1.7e9 + pid
+        self._rss = rng.randrange(4 * 1024 ** 2, 2 * 1024 ** 3)
+        self._threads = rng.randrange(1, 64)
+        self._status = PROCESS_STATES[pid % len(PROCESS_STATES)]
+        self._cpu = rng.random() * 1000
+        self._io = rng.randrange(0, 10 * 1024 ** 3)
+
+    @contextmanager
+    def oneshot(self):
+        yield
+
+    def name(self):
+        return self._name
+
+    def create_time(self):
+        return self._create_time
+
+    def status(self):
+        return self._status
+
+    def num_threads(self):
+        return self._threads
+
+    def memory_info(self):
+        return MemoryInfo(self._rss, self._rss * 2)
+
+    def cpu_times(self):
+        self._cpu += 0.01
+        return CPUTimes(self._cpu * 0.7, self._cpu * 0.3)
+
+    def io_counters(self):
+        self._io += 4096
+        return IOCounters(self._io // 2, self._io // 2)
+
+    def is_running(self):
+        return True
+
+    def as_dict(self, attrs=None, ad_value=None):
+        values = {'pid': self.pid, 'name': self._name, 'status': self._status,
+                  'num_threads': self._threads, 'create_time': self._create_time}
+        return {attr: values.get(attr, ad_value) for attr in (attrs or values)}
+
+
+class FakePsutil:
+    """
+    Context manager that swaps psutil's process, socket and disk functions for synthetic ones.
+
+    Args:
+    - processes (int): Number of processes in the process table.
+    - sockets (int): Number of inet sockets returned by net_connections.
+    - mounts (int): Number of mounted partitions, each with its own block device.
+    - seed (int): Seed for the generated values, so runs are comparable.
+    """
+
+    def __init__(self, processes=DEFAULT_SCALE['processes'], sockets=DEFAULT_SCALE['sockets'],
+                 mounts=DEFAULT_SCALE['mounts'], seed=0):
+        self.scale = {'processes': processes, 'sockets': sockets, 'mounts': mounts}
+        rng = random.Random(seed)
+        self.processes = {pid: FakeProcess(pid, rng) for pid in range(1, processes + 1)}
+        self.connections = [self._make_connection(index, rng, processes) for index in range(sockets)]
+        self.partitions = [
+            Partition(f'/dev/fake{index}', '/' if index == 0 else f'/mnt/volume{index}',
+                      'ext4', 'rw,relatime', 255, 4096)
+            for index in range(mounts)
+        ]
+        self._io_started = time.monotonic()
+        self._patches = []
+
+    @staticmethod
+    def _make_connection(index, rng, processes):
+        family = socket.AF_INET if index % 4 else socket.AF_INET6
+        kind = socket.SOCK_STREAM if index % 5 else socket.SOCK_DGRAM
+        local_ip = '10.0.0.1' if family == socket.AF_INET else 'fd00::1'
+        remote_ip = f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}' if family == socket.AF_INET else f'fd00::{index:x}'
+        listening = kind == socket.SOCK_STREAM and index % 50 == 1
+        return Connection(
+            fd=index + 3,
+            family=family,
+            type=kind,
+            laddr=Address(local_ip, 1024 + index % 60000),
+            raddr=() if listening or kind == socket.SOCK_DGRAM else Address(remote_ip, rng.randrange(1024, 65535)),
+            status='LISTEN' if listening else (TCP_STATES[index % len(TCP_STATES)] if kind == socket.SOCK_STREAM else 'NONE'),
+            pid=index % processes + 1 if processes else None,
+        )
+
+    # psutil API replacements
+
+    def process_iter(self, attrs=None, ad_value=None):
+        return iter(list(self.processes.values()))
+
+    def pids(self):
+        return list(self.processes)
+
+    def process(self, pid):
+        try:
+            return self.processes[pid]
+        except KeyError:
+            raise psutil.NoSuchProcess(pid) from None
+
+    def net_connections(self, kind='inet'):
+        families, types = _connection_filter(kind)
+        return [conn for conn in self.connections if conn.family in families and conn.type in types]
+
+    def disk_partitions(self, all=False):
+        return list(self.partitions)
+
+    def disk_usage(self, path):
+        total = 500 * 1024 ** 3
+        used = (zlib.crc32(path.encode()) % 90 + 5) * total // 100
+        return DiskUsage(total, used, total - used, round(used / total * 100, 1))
+
+    def disk_io_counters(self, perdisk=False, nowrap=True):
+        ticks = int((time.monotonic() - self._io_started) * 1000)
+        counters = {
+            f'fake{index}': DiskIO(ticks + index, ticks * 2 + index, ticks * 4096, ticks * 8192, ticks, ticks * 2, ticks)
+            for index in range(len(self.partitions))
+        }
+        if perdisk:
+            return counters
+        return DiskIO(*(sum(values) for values in zip(*counters.values())))
+
+    def net_io_counters(self, pernic=False, nowrap=True):
+        ticks = int((time.monotonic() - self._io_started) * 1000)
+        counters = {f'eth{index}': NetIO(ticks * 1500, ticks * 3000, ticks, ticks * 2, 0, 0, 0, 0) for index in range(4)}
+        if pernic:
+            return counters
+        return NetIO(*(sum(values) for values in zip(*counters.values())))
+
+    def sensors_battery(self):
+        return Battery(80, 3600, True)
+
+    def __enter__(self):
+        replacements = {
+            'process_iter': self.process_iter,
+            'pids': self.pids,
+            'Process': self.process,
+            'net_connections': self.net_connections,
+            'disk_partitions': self.disk_partitions,
+            'disk_usage': self.disk_usage,
+            'disk_io_counters': self.disk_io_counters,
+            'net_io_counters': self.net_io_counters,
+            'sensors_battery': self.sensors_battery,
+        }
+        for name, replacement in replacements.items():
+            patch = mock.patch.object(psutil, name, replacement)
+            patch.start()
+            self._patches.append(patch)
+        return self
+
+    def __exit__(self, *exc_info):
+        while self._patches:
+            self._patches.pop().stop()
+
+
+def _connection_filter(kind):
+    """(families, types) that psutil.net_connections(kind) would return."""
+    inet = (socket.AF_INET, socket.AF_INET6)
+    both = (socket.SOCK_STREAM, socket.SOCK_DGRAM)
+    filters = {
+        'inet': (inet, both), 'all': (inet, both),
+        'inet4': ((socket.AF_INET,), both), 'inet6': ((socket.AF_INET6,), both),
+        'tcp': (inet, (socket.SOCK_STREAM,)), 'udp': (inet, (socket.SOCK_DGRAM,)),
+        'tcp4': ((socket.AF_INET,), (socket.SOCK_STREAM,)), 'tcp6': ((socket.AF_INET6,), (socket.SOCK_STREAM,)),
+        'udp4': ((socket.AF_INET,), (socket.SOCK_DGRAM,)), 'udp6': ((socket.AF_INET6,), (socket.SOCK_DGRAM,)),
+    }
+    if kind not in filters:
+        raise ValueError(f"invalid kind argument {kind!r}")
+    return filters[kind]
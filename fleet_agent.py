@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""
+Agent side of the multi-host mode.
+
+AgentWatchScheduler samples the numeric metric series on the watch-mode
+schedule and hands each snapshot to a FleetAgent. The agent keeps the
+snapshots in a bounded buffer and a sender thread pushes them in batches
+over one persistent TCP connection to the aggregator. A batch leaves the
+buffer only once the aggregator has acknowledged it, so snapshots taken
+while the aggregator is unreachable are resent after reconnecting. When the
+buffer is full the oldest snapshots are dropped and counted.
+
+    python3 main.py --push 10.0.0.5:9466 --interval 10
+"""
+
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from fleet_transport import HELLO, BATCH, ACK, ERROR, FRAME_KINDS, read_frame, send_frame
+from watch_mode import WatchScheduler
+from alert_rules import get_alert_engine
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class FleetAgent:
+    """
+    Batches snapshots and pushes them to an aggregator, reconnecting with backoff.
+
+    Args:
+    - address (tuple): (host, port) of the aggregator.
+    - host_name (str): Name this host reports under; the hostname by default.
+    - batch_size (int): Snapshots per batch; a full batch is sent immediately.
+    - flush_interval (float): Seconds after which a partial batch is sent anyway.
+    - buffer_size (int): Snapshots kept while the aggregator is unreachable.
+    - backoff_base (float): First reconnect delay in seconds; doubles per failure.
+    - backoff_max (float): Upper bound of the reconnect delay.
+    - timeout (float): Seconds to wait for a connection or an acknowledgement.
+    """
+
+    def __init__(self, address, host_name=None, batch_size=100, flush_interval=30.0, buffer_size=10000,
+                 backoff_base=1.0, backoff_max=60.0, timeout=10.0):
+        if batch_size < 1 or buffer_size < batch_size:
+            raise ValueError("Batch size must be at least 1 and no larger than the buffer size.")
+        if flush_interval <= 0 or backoff_base <= 0 or backoff_max < backoff_base:
+            raise ValueError("Flush interval and backoff delays must be positive, with max >= base.")
+        self.address = address
+        self.host_name = host_name or socket.gethostname()
+        self.session = uuid.uuid4().hex  # Lets the aggregator tell a restarted agent from a resend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.sent = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self._buffer = deque(maxlen=buffer_size)  # (record id, snapshot), oldest first
+        self._next_id = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._socket = None
+        self._stream = None
+        self._sender = None
+
+    @property
+    def pending(self):
+        return len(self._buffer)
+
+    def open(self):
+        """Starts the sender thread; called on the first write."""
+        if self._sender is None:
+            self._sender = threading.Thread(target=self._run, name='fleet-agent', daemon=True)
+            self._sender.start()
+        return self
+
+    def write(self, snapshot):
+        """Queues one snapshot without blocking on the network."""
+        self.open()
+        with self._condition:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    logger.warning("Fleet buffer full; dropped %s oldest snapshot(s) so far.", self.dropped)
+            self._buffer.append((self._next_id, snapshot))
+            self._next_id += 1
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def close(self, timeout=None):
+        """
+        Flushes what is buffered, then stops the sender.
+
+        Args:
+        - timeout (float): Seconds to keep trying to deliver; `self.timeout` by default.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._sender is not None:
+            self._sender.join(self.timeout if timeout is None else timeout)
+            self._sender = None
+        self._disconnect()
+        if self._buffer:
+            logger.warning("Fleet agent stopped with %s undelivered snapshot(s).", len(self._buffer))
+        logger.info("Fleet agent stopped: %s sent, %s dropped, %s reconnect(s).",
+                    self.sent, self.dropped, self.reconnects)
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._socket, self._stream = sock, sock.makefile('rb')
+        send_frame(sock, HELLO, {'host': self.host_name, 'session': self.session})
+        logger.info("Connected to fleet aggregator %s:%s.", *self.address)
+
+    def _disconnect(self):
+        for resource in (self._stream, self._socket):
+            if resource is not None:
+                try:
+                    resource.close()
+                except OSError:
+                    pass
+        self._socket = self._stream = None
+
+    def _next_batch(self):
+        """Waits for a full batch, the flush interval or a stop; returns the batch to send."""
+        with self._condition:
+            deadline = time.monotonic() + self.flush_interval
+            while not self._stopping and len(self._buffer) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return [self._buffer[index] for index in range(min(self.batch_size, len(self._buffer)))]
+
+    def _send(self, batch):
+        send_frame(self._socket, BATCH, {
+            'host': self.host_name,
+            'session': self.session,
+            'snapshots': [dict(snapshot, id=record_id) for record_id, snapshot in batch],
+        })
+        kind, message = read_frame(self._stream)
+        if kind == ERROR:
+            raise ValueError(f"Aggregator rejected the batch: {message.get('error')}")
+        if kind != ACK:
+            raise ValueError(f"Expected an ack, got a {FRAME_KINDS[kind]} frame.")
+
+        last_id = message['last_id']
+        with self._condition:
+            # Ids, not positions: the buffer may have dropped old entries while the batch was in flight
+            while self._buffer and self._buffer[0][0] <= last_id:
+                self._buffer.popleft()
+        self.sent += len(batch)
+
+    def _run(self):
+        backoff = self.backoff_base
+        while True:
+            with self._condition:
+                if self._stopping and not self._buffer:
+                    return
+            try:
+                if self._socket is None:
+                    self._connect()
+                    backoff = self.backoff_base
+                batch = self._next_batch()
+                if batch:
+                    self._send(batch)
+            except (OSError, ConnectionError, ValueError, KeyError) as e:
+                self._disconnect()
+                self.reconnects += 1
+                delay = backoff * random.uniform(0.5, 1.0)  # Jitter keeps a fleet from reconnecting in lockstep
+                backoff = min(backoff * 2, self.backoff_max)
+                logger.warning("Fleet aggregator %s:%s unavailable (%s); retrying in %.1fs with %s buffered.",
+                               *self.address, e, delay, len(self._buffer))
+                with self._condition:
+                    if self._stopping:
+                        return
+                    self._condition.wait(delay)
+
+
+class AgentWatchScheduler(WatchScheduler):
+    """
+    Samples the numeric metric series on the watch-mode schedule and pushes
+    them through a FleetAgent instead of writing rendered reports.
+
+    Each snapshot carries the tick timestamp, the MetricsHistory series
+    (CPU, memory, swap, disks and network) and any alert state changes.
+    """
+
+    def __init__(self, agent, interval=5.0, history=None, alerts=None):
+        # The report collectors are not used, so the base initializer (which builds a
+        # CollectionEngine and resolves collectors) is skipped
+        if interval <= 0:
+            raise ValueError("Interval must be a positive number of seconds.")
+        if history is None:
+            from metrics_history import MetricsHistory
+            history = MetricsHistory(capacity=720)
+        self.interval = interval
+        self.engine = None
+        self.collectors = ['metrics']
+        self.writer = agent
+        self.history = history
+        self.alerts = alerts or get_alert_engine()
+        self.analyzer = None
+        self.ticks = 0
+        self.skipped_ticks = 0
+
+    def tick(self):
+        """Collects one numeric snapshot and queues it for the aggregator."""
+        started = time.time()
+        record = {
+            'timestamp': started,
+            'tick': self.ticks,
+            'metrics': self.history.sample(started),
+        }
+        events = self.alerts.drain_events()
+        if events:
+            record['alerts'] = events
+        self.writer.write(record)
+        self.ticks += 1
+        return record
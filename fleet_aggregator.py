@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+
+"""
+Aggregator side of the multi-host mode.
+
+Agents started with `main.py --push HOST:PORT` stream batches of numeric
+snapshots here. Every host gets its own ring buffers in one FleetStore, so
+fleet-wide questions are answered from memory, and snapshots can also be
+written to a ReportArchive. Queries use the same framed protocol:
+
+    python3 fleet_aggregator.py --port 9466
+    python3 fleet_aggregator.py --connect 127.0.0.1:9466 --query top --field memory.percent --limit 10
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from metrics_history import RingBuffer
+from fleet_transport import (HELLO, BATCH, ACK, QUERY, RESULT, ERROR, FRAME_KINDS, DEFAULT_PORT,
+                             read_frame, send_frame, parse_address)
+from log_pipeline import configure_logging, LOG_LEVELS
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+QUERIES = ('top', 'hosts', 'rollup', 'alerts')
+AGGREGATES = ('latest', 'avg', 'min', 'max', 'p95')
+
+
+class HostState:
+    """Everything the aggregator knows about one host."""
+
+    __slots__ = ('name', 'address', 'session', 'last_id', 'last_seen', 'snapshots', 'latest', 'series', 'alerts')
+
+    def __init__(self, name):
+        self.name = name
+        self.address = None
+        self.session = None
+        self.last_id = -1      # Highest snapshot id stored for the current session
+        self.last_seen = None  # Timestamp of the newest snapshot
+        self.snapshots = 0
+        self.latest = {}
+        self.series = {}       # Series name -> RingBuffer
+        self.alerts = deque(maxlen=100)
+
+
+class FleetStore:
+    """
+    Thread-safe, in-memory store of the snapshots pushed by every agent.
+
+    Args:
+    - capacity (int): Samples kept per host and series.
+    """
+
+    def __init__(self, capacity=1440):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.hosts = {}
+
+    def ingest(self, host, session, snapshots, address=None):
+        """
+        Stores a batch from one agent, skipping snapshots it already has.
+
+        Returns:
+        - tuple: (highest snapshot id now stored for this session, for the ack;
+          list of the snapshots that were new and stored).
+        """
+        with self._lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = HostState(host)
+            if state.session != session:
+                # A restarted agent numbers its snapshots from zero again
+                state.session, state.last_id = session, -1
+            state.address = address or state.address
+            accepted = []
+            for snapshot in snapshots:
+                if snapshot['id'] <= state.last_id:
+                    continue  # Resent after a lost ack
+                accepted.append(snapshot)
+                state.last_id = snapshot['id']
+                timestamp = snapshot['timestamp']
+                for name, value in snapshot.get('metrics', {}).items():
+                    buffer = state.series.get(name)
+                    if buffer is None:
+                        buffer = state.series[name] = RingBuffer(self.capacity)
+                    buffer.append(value, timestamp)
+                    state.latest[name] = value
+                state.alerts.extend(snapshot.get('alerts', ()))
+                state.snapshots += 1
+                state.last_seen = max(state.last_seen or timestamp, timestamp)
+            return state.last_id, accepted
+
+    def _value(self, state, field, aggregate, window):
+        buffer = state.series.get(field)
+        if buffer is None or not len(buffer):
+            return None
+        if aggregate == 'latest':
+            return buffer.latest()[1]
+        summary = buffer.rollup(window, percentiles=(95,))
+        return summary.get(aggregate) if summary['count'] else None
+
+    def top_hosts(self, field='memory.percent', limit=10, aggregate='latest', window=None):
+        """
+        Ranks hosts by one series, highest first.
+
+        Args:
+        - field (str): Series to rank by, e.g. 'memory.percent' for memory pressure.
+        - limit (int): Number of hosts to return.
+        - aggregate (str): 'latest' value, or 'avg', 'min', 'max' or 'p95' over `window` seconds.
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{aggregate}'. Choose from: {', '.join(AGGREGATES)}.")
+        ranked = []
+        with self._lock:
+            for state in self.hosts.values():
+                value = self._value(state, field, aggregate, window)
+                if value is not None:
+                    ranked.append((value, state.name, state.last_seen))
+        ranked.sort(key=lambda entry: entry[0], reverse=True)
+        return [{'host': name, 'value': value, 'last_seen': last_seen} for value, name, last_seen in ranked[:limit]]
+
+    def host_summaries(self):
+        with self._lock:
+            return [{
+                'host': state.name,
+                'address': state.address,
+                'last_seen': state.last_seen,
+                'snapshots': state.snapshots,
+                'series': len(state.series),
+                'cpu.usage': state.latest.get('cpu.usage'),
+                'memory.percent': state.latest.get('memory.percent'),
+            } for state in sorted(self.hosts.values(), key=lambda state: state.name)]
+
+    def fleet_rollup(self, field='memory.percent', percentiles=(50, 95, 99)):
+        """Count, min, max, avg and percentiles of the latest `field` value across hosts."""
+        with self._lock:
+            values = sorted(state.latest[field] for state in self.hosts.values() if field in state.latest)
+        if not values:
+            return {'count': 0}
+        summary = {'count': len(values), 'min': values[0], 'max': values[-1], 'avg': sum(values) / len(values)}
+        for percentile in percentiles:
+            summary[f'p{percentile}'] = RingBuffer.percentile(values, percentile)
+        return summary
+
+    def recent_alerts(self, limit=50):
+        with self._lock:
+            events = [dict(event, host=state.name) for state in self.hosts.values() for event in state.alerts]
+        events.sort(key=lambda event: event.get('timestamp') or 0, reverse=True)
+        return events[:limit]
+
+    def query(self, name, **params):
+        """Runs one of QUERIES with its keyword parameters."""
+        if name == 'top':
+            return self.top_hosts(**params)
+        if name == 'hosts':
+            return self.host_summaries()
+        if name == 'rollup':
+            return self.fleet_rollup(**params)
+        if name == 'alerts':
+            return self.recent_alerts(**params)
+        raise ValueError(f"Unknown query '{name}'. Choose from: {', '.join(QUERIES)}.")
+
+
+class FleetRequestHandler(socketserver.StreamRequestHandler):
+    """Serves one connection: an agent's HELLO and BATCH frames, or QUERY frames."""
+
+    def setup(self):
+        super().setup()
+        with self.server.connections_lock:
+            self.server.connections.add(self.connection)
+
+    def finish(self):
+        with self.server.connections_lock:
+            self.server.connections.discard(self.connection)
+        super().finish()
+
+    def handle(self):
+        aggregator = self.server.aggregator
+        peer = f'{self.client_address[0]}:{self.client_address[1]}'
+        host = session = None
+        while True:
+            try:
+                kind, message = read_frame(self.rfile)
+            except ConnectionError:
+                break
+            except (ValueError, OSError) as e:
+                logger.warning("Dropping connection from %s: %s", peer, e)
+                break
+            try:
+                if kind == HELLO:
+                    host, session = message['host'], message['session']
+                    logger.info("Agent %s connected from %s.", host, peer)
+                elif kind == BATCH:
+                    if host is None:
+                        raise ValueError("BATCH before HELLO.")
+                    last_id = aggregator.ingest(host, session, message['snapshots'], address=peer)
+                    send_frame(self.connection, ACK, {'last_id': last_id})
+                elif kind == QUERY:
+                    params = message.get('params', {})
+                    send_frame(self.connection, RESULT, {'result': aggregator.store.query(message['query'], **params)})
+                else:
+                    raise ValueError(f"Unexpected {FRAME_KINDS[kind]} frame.")
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("Bad request from %s: %s", peer, e)
+                try:
+                    send_frame(self.connection, ERROR, {'error': str(e)})
+                except OSError:
+                    break
+        if host is not None:
+            logger.info("Agent %s disconnected.", host)
+
+
+class FleetServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, handler):
+        self.connections = set()  # Open agent and query connections, closed on stop
+        self.connections_lock = threading.Lock()
+        super().__init__(address, handler)
+
+    def close_connections(self):
+        with self.connections_lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class FleetAggregator:
+    """
+    Accepts agent streams and queries on a loopback address by default.
+
+    Args:
+    - host (str): Address to bind; use 0.0.0.0 to accept remote agents.
+    - port (int): Port to listen on; 0 picks a free one (see `address`).
+    - capacity (int): Samples kept per host and series.
+    - archive (ReportArchive): Optional archive every stored snapshot is also written to.
+    """
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, capacity=1440, archive=None):
+        self.host = host
+        self.port = port
+        self.store = FleetStore(capacity)
+        self.archive = archive
+        self._archive_lock = threading.Lock()
+        self._server = None
+        self._server_thread = None
+
+    @property
+    def address(self):
+        """(host, port) actually bound, once started."""
+        return self._server.server_address[:2] if self._server is not None else (self.host, self.port)
+
+    def ingest(self, host, session, snapshots, address=None):
+        last_id, accepted = self.store.ingest(host, session, snapshots, address)
+        if self.archive is not None:
+            with self._archive_lock:
+                # Only new snapshots: resends after a lost ack are already archived
+                for snapshot in accepted:
+                    self.archive.write(dict(snapshot, host=host), snapshot['timestamp'])
+        return last_id
+
+    def start(self):
+        self._server = FleetServer((self.host, self.port), FleetRequestHandler)
+        self._server.aggregator = self
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name='fleet-aggregator', daemon=True)
+        self._server_thread.start()
+        logger.info("Fleet aggregator listening on %s:%s.", *self.address)
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            # Persistent agent connections would otherwise outlive the listener
+            self._server.close_connections()
+            self._server = None
+        if self.archive is not None:
+            self.archive.close()
+        logger.info("Fleet aggregator stopped.")
+
+    def serve_forever(self):
+        """Starts the aggregator and blocks until interrupted."""
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            logger.info("Fleet aggregator interrupted by the user.")
+        finally:
+            self.stop()
+
+
+def query_aggregator(address, query, timeout=10.0, **params):
+    """
+    Runs one fleet query against a running aggregator.
+
+    Args:
+    - address (tuple): (host, port) of the aggregator.
+    - query (str): One of QUERIES.
+    - params: Query parameters, e.g. field='memory.percent', limit=10.
+    """
+    with socket.create_connection(address, timeout=timeout) as sock, sock.makefile('rb') as stream:
+        send_frame(sock, QUERY, {'query': query, 'params': params})
+        kind, message = read_frame(stream)
+    if kind == ERROR:
+        raise ValueError(message.get('error'))
+    if kind != RESULT:
+        raise ValueError(f"Expected a result, got a {FRAME_KINDS[kind]} frame.")
+    return message['result']
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description='Collect snapshots from fleet agents, or query a running aggregator.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to bind (default: 127.0.0.1; use 0.0.0.0 for remote agents).')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on (default: %(default)s).')
+    parser.add_argument('--capacity', type=int, default=1440, help='Samples kept per host and series (default: 1440).')
+    parser.add_argument('--archive', default=None, metavar='DIRECTORY',
+                        help='Also write every snapshot to a compressed archive in this directory.')
+    parser.add_argument('--connect', default=None, metavar='HOST:PORT',
+                        help='Query the aggregator at this address instead of starting one.')
+    parser.add_argument('--query', default='top', choices=QUERIES, help='Query to run with --connect (default: top).')
+    parser.add_argument('--field', default='memory.percent',
+                        help='Series for top and rollup (default: memory.percent, i.e. memory pressure).')
+    parser.add_argument('--limit', type=int, default=10, help='Rows for top and alerts (default: 10).')
+    parser.add_argument('--aggregate', default='latest', choices=AGGREGATES,
+                        help='How top ranks each host (default: latest).')
+    parser.add_argument('--window', type=float, default=None, metavar='SECONDS',
+                        help='Seconds of history for non-latest aggregates (default: all kept).')
+    parser.add_argument('--log-level', default='INFO', choices=LOG_LEVELS,
+                        help='Minimum level written to system_analysis.log (default: INFO).')
+    return parser.parse_args(argv)
+
+
+def query_parameters(arguments):
+    """The parameters each query takes from the command line."""
+    if arguments.query == 'top':
+        return {'field': arguments.field, 'limit': arguments.limit,
+                'aggregate': arguments.aggregate, 'window': arguments.window}
+    if arguments.query == 'rollup':
+        return {'field': arguments.field}
+    if arguments.query == 'alerts':
+        return {'limit': arguments.limit}
+    return {}
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    configure_logging(arguments.log_level)
+    try:
+        if arguments.connect:
+            result = query_aggregator(parse_address(arguments.connect), arguments.query, **query_parameters(arguments))
+            print(json.dumps(result, indent=4, ensure_ascii=False))
+        else:
+            archive = None
+            if arguments.archive:
+                from report_archive import ReportArchive
+                archive = ReportArchive(arguments.archive)
+            FleetAggregator(arguments.host, arguments.port, arguments.capacity, archive).serve_forever()
+    except (ValueError, OSError) as e:
+        logger.error("Fleet aggregator failed: %s", e)
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Wire format shared by the fleet agent and the aggregator.
+
+Every message is one frame: a fixed header followed by a zlib-compressed
+JSON payload.
+
+    header  '<4sBBI'  magic, protocol version, frame kind, payload length
+    payload zlib(JSON)
+
+Agents open with HELLO, then send BATCH frames that the aggregator answers
+with ACK. Query clients send QUERY and get RESULT or ERROR back.
+"""
+
+import json
+import struct
+import zlib
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SHCF'
+PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct('<4sBBI')
+
+HELLO, BATCH, ACK, QUERY, RESULT, ERROR = range(1, 7)
+FRAME_KINDS = {HELLO: 'hello', BATCH: 'batch', ACK: 'ack', QUERY: 'query', RESULT: 'result', ERROR: 'error'}
+
+# Limits that keep a bad or hostile peer from exhausting the receiver's memory
+MAX_PAYLOAD_BYTES = 16 * 1024 * 1024
+MAX_DECOMPRESSED_BYTES = 128 * 1024 * 1024
+
+DEFAULT_PORT = 9466
+
+
+def encode_frame(kind, message, level=6):
+    """Serializes and compresses one message into a frame."""
+    payload = zlib.compress(json.dumps(message, separators=(',', ':'), ensure_ascii=False).encode('utf-8'), level)
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Frame payload of {len(payload)} bytes exceeds the {MAX_PAYLOAD_BYTES} byte limit.")
+    return FRAME_HEADER.pack(MAGIC, PROTOCOL_VERSION, kind, len(payload)) + payload
+
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        raise ConnectionError("Connection closed in the middle of a frame." if data else "Connection closed.")
+    return data
+
+
+def read_frame(stream):
+    """
+    Reads one frame from a binary file-like stream (e.g. socket.makefile('rb')).
+
+    Returns:
+    - tuple: (frame kind, decoded message).
+    """
+    magic, version, kind, length = FRAME_HEADER.unpack(_read_exactly(stream, FRAME_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a fleet transport frame.")
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported fleet protocol version {version}.")
+    if kind not in FRAME_KINDS:
+        raise ValueError(f"Unknown frame kind {kind}.")
+    if length > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Frame payload of {length} bytes exceeds the {MAX_PAYLOAD_BYTES} byte limit.")
+
+    decompressor = zlib.decompressobj()
+    try:
+        data = decompressor.decompress(_read_exactly(stream, length), MAX_DECOMPRESSED_BYTES)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt frame payload: {e}") from None
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Frame payload expands beyond {MAX_DECOMPRESSED_BYTES} bytes.")
+    return kind, json.loads(data)
+
+
+def send_frame(sock, kind, message):
+    sock.sendall(encode_frame(kind, message))
+
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    """'host:port', '[::1]:port' or 'host' -> (host, port)."""
+    host, separator, port = address.rpartition(':')
+    if not separator or ']' in port:
+        host, port = address, default_port
+    host = host.strip('[]') or '127.0.0.1'
+    try:
+        return host, int(port)
+    except ValueError:
+        raise ValueError(f"Invalid address '{address}', expected HOST:PORT.") from None
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+"""
+Central logging pipeline.
+
+Modules only create `logging.getLogger(__name__)`. configure_logging() is
+called once by the entry point: it attaches a QueueHandler to the root
+logger, so a log call on the collection path only enqueues the record, and
+a QueueListener thread owns the single FileHandler that formats and writes
+it to disk.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+
+LOG_FILE = 'system_analysis.log'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+_listener = None
+_queue_handler = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level='INFO', path=LOG_FILE):
+    """
+    Routes every logger through one queue to one file handler.
+
+    Calling it again only changes the level.
+
+    Args:
+    - level (str | int): Minimum level to record, e.g. 'INFO' or logging.DEBUG.
+    - path (str): Log file to append to.
+
+    Returns:
+    - logging.handlers.QueueListener: The running listener.
+    """
+    global _listener, _queue_handler
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level. Choose one of: {', '.join(LOG_LEVELS)}.")
+
+    root = logging.getLogger()
+    with _configure_lock:
+        root.setLevel(level)
+        if _listener is not None:
+            return _listener
+
+        file_handler = logging.FileHandler(path)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        root.addHandler(_queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Flushes queued records to disk and stops the listener thread."""
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
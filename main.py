@@ -1,126 +1,117 @@
 #!/usr/bin/env python3
 
 import sys
+import json
+import argparse
 import logging
-from battery_management import BatteryManager
-from cpu_management import CPUManager
-from disk_management import DiskManager
-from memory_management import MemoryManager
-from network_management import NetworkManager
-from process_management import ProcessManager
-from system_infoAnalyzer import SystemInformation
 from terminal_clearance import ScreenManager
 from methods import control_result_to_json
+from collection_engine import CollectionEngine
+from watch_mode import WatchScheduler, BinaryWatchScheduler, NDJSONWriter, JSONWriter
+from log_pipeline import configure_logging, LOG_LEVELS
+from self_metrics import get_self_metrics
+
+# Managers are imported inside the functions that use them, so a run only
+# pays for the collectors it actually requests.
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
-
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-# Add the file handler to the logger
-logger.addHandler(file_handler)
-
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
-
 class systemAnalyzer:
     @staticmethod
     def all_in_one():
         try:
             logger.info("Generating all-in-one report...")
-            cpu_status = CPUManager().monitor_cpu()
-            process_status = ProcessManager().manage_processes()
-            memory_status = MemoryManager().memory_statistics()
-            disk_status = DiskManager().manage_disk()
-            network_status = NetworkManager().network_report()
-            system_status = SystemInformation().system_info()
-            battery_status = BatteryManager().batteryManagement()
-
-            status_list = [cpu_status, process_status, memory_status, disk_status, network_status, system_status,
-                           battery_status]
+            # Collectors run concurrently; a failed or late one leaves an error marker in its place
+            status_list = CollectionEngine().collect()
             logger.info("All-in-one report generated successfully.")
             return status_list
 
         except Exception as e:
-            logger.error(f"Error generating all-in-one report: {e}")
+            logger.error("Error generating all-in-one report: %s", e)
             return None  # Return None or handle the error as appropriate in this application
 
     @staticmethod
-    def once_status_one_report(token):
+    def once_status_one_report(token, stream=False):
+        # stream=True returns the process and network reports with generator sections for streaming output
         try:
-            logger.info(f"Generating report for token: {token}")
+            logger.info("Generating report for token: %s", token)
             match token:
                 case 0:
                     ScreenManager().clear_screen()
-                    systemAnalyzer().reportWizarder()  # Recursively call the method to prompt again
+                    return None
                 case 1:
+                    from cpu_management import CPUManager
                     return CPUManager().monitor_cpu()
                 case 2:
-                    return ProcessManager().manage_processes()
+                    from process_management import ProcessManager
+                    return ProcessManager().stream_processes() if stream else ProcessManager().manage_processes()
                 case 3:
+                    from memory_management import MemoryManager
                     return MemoryManager().memory_statistics()
                 case 4:
+                    from disk_management import DiskManager
                     return DiskManager().manage_disk()
                 case 5:
-                    return NetworkManager().network_report()
+                    from network_management import NetworkManager
+                    return NetworkManager().network_report(stream=stream)
                 case 6:
+                    from system_infoAnalyzer import SystemInformation
                     return SystemInformation().system_info()
                 case 7:
+                    from battery_management import BatteryManager
                     return BatteryManager().batteryManagement()
                 case _:
                     logger.warning('Invalid selection. Please enter a number between 0 and 7.')
                     print('Invalid selection. Please enter a number between 0 and 7.')
-                    systemAnalyzer().reportWizarder()  # Recursively call the method to prompt again
+                    return None
         except Exception as e:
-            logger.error(f"Error executing report: {e}")
+            logger.error("Error executing report: %s", e)
             return f'Error executing report: {e}'
 
     @staticmethod
     def reportWizarder():
+        # Interactive front end: prompts until one report has been saved; bad input loops instead of recursing
         try:
-            favor = input('What kind of report do you need today? ').lower()
-            logger.info(f"User selected: {favor}")
-            if favor.replace(' ', '_') == 'single_report':
-                while True:
-                    try:
-                        report_id = int(input('Enter Report ID (1-7, 0 to clear screen): '))
-                        if report_id < 0 or report_id > 7:
-                            logger.warning('Invalid report ID entered.')
-                            print('Please enter a number between 1 and 7, or 0 to clear the screen.')
-                        else:
-                            break  # Exit the loop if a valid report ID is entered
-                    except ValueError:
-                        logger.warning('Non-numeric input detected for report ID.')
-                        print('Invalid input. Please enter a valid number.')
-
-                if report_id == 0:
-                    # Clearing the screen and recursively call the method to prompt again
-                    ScreenManager().clear_screen()
-                    systemAnalyzer().reportWizarder()
-                else:
-                    statistics = systemAnalyzer().once_status_one_report(report_id)
+            while True:
+                favor = input('What kind of report do you need today? ').lower()
+                logger.info("User selected: %s", favor)
+                if favor.replace(' ', '_') == 'single_report':
+                    while True:
+                        try:
+                            report_id = int(input('Enter Report ID (1-7, 0 to clear screen): '))
+                            if report_id < 0 or report_id > 7:
+                                logger.warning('Invalid report ID entered.')
+                                print('Please enter a number between 1 and 7, or 0 to clear the screen.')
+                            else:
+                                break  # Exit the loop if a valid report ID is entered
+                        except ValueError:
+                            logger.warning('Non-numeric input detected for report ID.')
+                            print('Invalid input. Please enter a valid number.')
+
+                    if report_id == 0:
+                        # Clear the screen and prompt again
+                        ScreenManager().clear_screen()
+                        continue
+
+                    statistics = systemAnalyzer().once_status_one_report(report_id, stream=True)
                     if statistics is None:
-                        logger.error(f"Failed to generate report with Report ID {report_id}.")
+                        logger.error("Failed to generate report with Report ID %s.", report_id)
                         print(f"Failed to generate report with Report ID {report_id}.")
                     else:
                         control_result_to_json(statistics)
-                        logger.info(f"Single report with Report ID {report_id} generated and saved.")
+                        logger.info("Single report with Report ID %s generated and saved.", report_id)
+                    return
 
-            elif favor.replace(' ', '_') == 'all_in_one':
-                statistics = systemAnalyzer.all_in_one()
-                control_result_to_json(statistics)
-                logger.info("All-in-one report generated and saved.")
+                elif favor.replace(' ', '_') == 'all_in_one':
+                    statistics = systemAnalyzer.all_in_one()
+                    control_result_to_json(statistics)
+                    logger.info("All-in-one report generated and saved.")
+                    return
 
-            else:
-                logger.warning('Invalid choice for report type.')
-                print('Invalid choice. Please choose "single_report" or "all_in_one".')
-                systemAnalyzer().reportWizarder()  # Recursively call the method to prompt again
+                else:
+                    logger.warning('Invalid choice for report type.')
+                    print('Invalid choice. Please choose "single_report" or "all_in_one".')
 
         except KeyboardInterrupt:
             logger.error("Process interrupted by the user.")
@@ -128,17 +119,179 @@ class systemAnalyzer:
             sys.exit(1)  # Exit with error status
 
         except ValueError as ve:
-            logger.error(f"ValueError: {ve}")
+            logger.error("ValueError: %s", ve)
             print(f"ValueError: {ve}")
             sys.exit(1)  # Exit with error status
 
         except Exception as e:
-            logger.error(f"Unexpected error: {e}")
+            logger.error("Unexpected error: %s", e)
             print(f"Error: {e}")
             sys.exit(1)  # Exit with error status
 
 
+OUTPUT_FORMATS = ('pretty', 'compact', 'ndjson', 'binary')
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description='System hardware components statistics analyzer.',
+        epilog='Without collection options the interactive report wizard starts.')
+    parser.add_argument('--collect', default=None,
+                        help='Comma-separated collectors to sample, e.g. cpu,mem,disk (default: the all-in-one set).')
+    parser.add_argument('--format', default=None, choices=OUTPUT_FORMATS,
+                        help='Output format (default: pretty, or ndjson with --watch).')
+    parser.add_argument('--output', default=None,
+                        help='File to write to, or - for stdout (default: -). Binary output needs a file.')
+    parser.add_argument('--count', type=int, default=None,
+                        help='Number of snapshots to take (default: 1, or until interrupted with --watch).')
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help='Seconds between snapshots (default: 5).')
+    parser.add_argument('--watch', action='store_true',
+                        help='Sample collectors continuously until interrupted or --count is reached.')
+    parser.add_argument('--archive', default=None, metavar='DIRECTORY',
+                        help='Write snapshots to a rotating compressed archive in this directory.')
+    parser.add_argument('--top', type=int, default=None, metavar='N',
+                        help='Print the top N processes by CPU, memory and I/O, then exit.')
+    parser.add_argument('--serve-metrics', type=int, default=None, metavar='PORT',
+                        help='Serve Prometheus metrics on this port, refreshed every --interval seconds.')
+    parser.add_argument('--metrics-host', default='127.0.0.1',
+                        help='Address for --serve-metrics to bind (default: 127.0.0.1).')
+    parser.add_argument('--self-metrics', action='store_true',
+                        help="Time the analyzer's own collectors and add a Collector Self-Metrics section.")
+    parser.add_argument('--profile', default=None, metavar='PATH',
+                        help='Profile the collectors with cProfile and write the merged pstats file here.')
+    parser.add_argument('--push', default=None, metavar='HOST:PORT',
+                        help='Agent mode: push numeric snapshots every --interval seconds to a fleet aggregator.')
+    parser.add_argument('--push-flush', type=float, default=30.0, metavar='SECONDS',
+                        help='Longest time a snapshot waits before a partial batch is pushed (default: 30).')
+    parser.add_argument('--analyze', action='store_true',
+                        help='Keep a metrics history and add an Analysis section (trends, spikes). Needs NumPy.')
+    parser.add_argument('--analysis-window', type=float, default=3600.0, metavar='SECONDS',
+                        help='Seconds of history the Analysis section covers (default: 3600).')
+    parser.add_argument('--skip-fstypes', default=None, metavar='TYPES',
+                        help="Comma-separated file system types to leave out of disk reports; "
+                             "'virtual' stands for tmpfs, devtmpfs, overlay, squashfs, proc, sysfs and cgroup.")
+    parser.add_argument('--dedupe-connections', action='store_true',
+                        help='List every socket once, tagged with the connection kinds it belongs to, '
+                             'instead of once per kind.')
+    parser.add_argument('--probe-targets', default=None, metavar='TARGETS',
+                        help="Comma-separated connectivity probes, 'host:port' (TCP) or 'dns:name' "
+                             "(default: dns:www.google.com).")
+    parser.add_argument('--alert-rules', default=None, metavar='PATH',
+                        help='JSON file of alert rules replacing the built-in CPU, memory and disk thresholds.')
+    parser.add_argument('--log-level', default='INFO', choices=LOG_LEVELS,
+                        help='Minimum level written to system_analysis.log (default: INFO).')
+    return parser.parse_args(argv)
+
+
+def is_batch_run(arguments):
+    """True when any collection option is given, so the wizard is not started."""
+    options = (arguments.collect, arguments.format, arguments.output, arguments.count, arguments.archive,
+               arguments.push, arguments.profile)
+    # Self-metrics and profiles only cover the engine's collectors, which the wizard does not use
+    flags = (arguments.watch, arguments.analyze, arguments.self_metrics)
+    return any(flags) or any(option is not None for option in options)
+
+
+def build_scheduler(arguments):
+    """
+    Builds the scheduler for a non-interactive run from parsed arguments.
+
+    Returns:
+    - tuple: (scheduler, count), where count is None to run until interrupted.
+    """
+    output_format = arguments.format or ('ndjson' if arguments.watch else 'pretty')
+    count = arguments.count if arguments.count is not None else (None if arguments.watch else 1)
+    if count is not None and count < 1:
+        raise ValueError("Count must be at least 1.")
+
+    if arguments.push is not None:
+        if arguments.collect or arguments.format or arguments.output or arguments.archive or arguments.analyze:
+            raise ValueError("--push sends the numeric metric series only; "
+                             "drop --collect, --format, --output, --archive and --analyze.")
+        from fleet_transport import parse_address
+        from fleet_agent import FleetAgent, AgentWatchScheduler
+        agent = FleetAgent(parse_address(arguments.push), flush_interval=arguments.push_flush)
+        # Agents run until interrupted unless --count (validated above) limits them
+        return AgentWatchScheduler(agent, interval=arguments.interval), arguments.count
+
+    if output_format == 'binary':
+        if arguments.archive or arguments.analyze:
+            raise ValueError("--archive and --analyze cannot be combined with --format binary.")
+        scheduler = BinaryWatchScheduler(arguments.output, collectors=arguments.collect,
+                                         interval=arguments.interval)
+        return scheduler, count
+
+    engine = CollectionEngine(self_metrics=arguments.self_metrics)
+    history = analyzer = None
+    if arguments.analyze:
+        from metrics_history import MetricsHistory
+        from anomaly_analysis import AnomalyAnalyzer
+        history = MetricsHistory()
+        analyzer = AnomalyAnalyzer(history, window=arguments.analysis_window)
+
+    if arguments.archive:
+        from report_archive import ReportArchive
+        writer = ReportArchive(arguments.archive)
+    elif output_format == 'ndjson':
+        writer = NDJSONWriter(arguments.output)
+    else:
+        writer = JSONWriter(arguments.output, indent=4 if output_format == 'pretty' else None, many=count != 1)
+    scheduler = WatchScheduler(collectors=arguments.collect, interval=arguments.interval, writer=writer,
+                               engine=engine, history=history, analyzer=analyzer)
+    return scheduler, count
+
+
 if __name__ == "__main__":
+    arguments = parse_arguments()
+    configure_logging(arguments.log_level)
     logger.info("Starting system analyzer.")
-    systemAnalyzer().reportWizarder()
+    if arguments.self_metrics or arguments.profile:
+        get_self_metrics().enable(profile_path=arguments.profile)
+    if arguments.skip_fstypes:
+        from disk_management import configure_skip_fstypes, parse_fstypes
+        configure_skip_fstypes(parse_fstypes(arguments.skip_fstypes))
+    if arguments.dedupe_connections:
+        from network_management import configure_dedupe_connections
+        configure_dedupe_connections(True)
+    if arguments.probe_targets:
+        from connectivity_probes import configure_connectivity_prober
+        try:
+            configure_connectivity_prober(arguments.probe_targets)
+        except ValueError as e:
+            logger.error("Invalid probe targets: %s", e)
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    if arguments.alert_rules:
+        from alert_rules import get_alert_engine
+        try:
+            get_alert_engine().load_file(arguments.alert_rules)
+        except (ValueError, OSError) as e:
+            logger.error("Failed to load alert rules: %s", e)
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    if arguments.top is not None:
+        from process_management import ProcessManager
+        print(json.dumps(ProcessManager().top_processes(arguments.top), indent=4, ensure_ascii=False))
+    elif arguments.serve_metrics is not None:
+        from metrics_exporter import MetricsExporter
+        try:
+            exporter = MetricsExporter(host=arguments.metrics_host, port=arguments.serve_metrics,
+                                       refresh_interval=arguments.interval)
+            exporter.serve_forever()
+        except (ValueError, OSError) as e:
+            logger.error("Metrics endpoint failed: %s", e)
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif is_batch_run(arguments):
+        try:
+            scheduler, count = build_scheduler(arguments)
+            scheduler.run(count=count)
+            get_self_metrics().dump_profile()
+        except (ValueError, OSError, ImportError) as e:
+            logger.error("Batch run failed: %s", e)
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        systemAnalyzer().reportWizarder()
     sys.exit(0)
@@ -1,70 +1,64 @@
 #!/usr/bin/env python3
 
-import json
+import time
 import psutil
 import sys
-from report_signatures import TimeStampGenerator
+from snapshots import MemorySnapshot
+from report_renderer import render_memory
+from self_metrics import instrumented
+from sample_bus import publish
 import logging  # Import logging module
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
+class MemoryManager:
+    @staticmethod
+    # Function to collect memory statistics as raw numbers
+    @instrumented()
+    def collect():
+        logger.info("Started retrieving memory statistics.")
+        timestamp = time.time()
 
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
+        # System memory usage statistics
+        v_memory = psutil.virtual_memory()
+        logger.debug("Virtual memory: %s", v_memory)
 
-# Add the file handler to the logger
-logger.addHandler(file_handler)
+        # System swap memory statistics
+        s_memory = psutil.swap_memory()
+        logger.debug("Swap memory: %s", s_memory)
 
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
+        # Feed the alert rules and the metrics history before the report reads their state
+        publish({
+            'memory.available': v_memory.available,
+            'memory.percent': v_memory.percent,
+            'swap.used': s_memory.used,
+            'swap.percent': s_memory.percent,
+        }, timestamp)
+
+        return MemorySnapshot(
+            timestamp=timestamp,
+            total=v_memory.total,
+            available=v_memory.available,
+            percent=v_memory.percent,
+            used=v_memory.used,
+            free=v_memory.free,
+            swap_total=s_memory.total,
+            swap_used=s_memory.used,
+            swap_free=s_memory.free,
+            swap_percent=s_memory.percent,
+            swap_sin=s_memory.sin,
+            swap_sout=s_memory.sout,
+        )
 
-class MemoryManager:
     @staticmethod
     # Function to retrieve and print memory statistics
+    @instrumented()
     def memory_statistics():
         try:
-            logger.info("Started retrieving memory statistics.")
-            
-            # System memory usage statistics
-            v_memory = psutil.virtual_memory()
-            logger.debug(f"Virtual memory: {v_memory}")
-            
-            # System swap memory statistics
-            s_memory = psutil.swap_memory()
-            logger.debug(f"Swap memory: {s_memory}")
-            
-            statistics = {
-                'Memory Usage Statistics': {
-                    'System Memory': {
-                        'Total': f'{v_memory.total / (1024 ** 3):.2f} GB',
-                        'Available': f'{v_memory.available / (1024 ** 3):.2f} GB',
-                        'Percentage': f'{v_memory.percent} %',
-                        'Used': f'{v_memory.used / (1024 ** 3):.2f} GB',
-                        'Free': f'{v_memory.free / (1024 ** 3):.2f} GB'
-                    },
-                    'THRESHOLD': f'{"Warning: Available memory is below the threshold of 100MB." if v_memory.available <= (100 * 1024 * 1024) else "Available memory is sufficient."}',
-                    'Swap Memory': {
-                        'Total': f'{s_memory.total / (1024 ** 3):.2f} GB',
-                        'Used': f'{s_memory.used / (1024 ** 3):.2f} GB',
-                        'Free': f'{s_memory.free / (1024 ** 3):.2f} GB',
-                        'Percentage': f'{s_memory.percent} %',
-                        'System IN': f'{s_memory.sin / (1024 ** 3):.2f} GB',
-                        'System OUT': f'{s_memory.sout / (1024 ** 3):.2f} GB'
-                    },
-                    'Generated Time & Date': f'{TimeStampGenerator().generate_report()}'
-                }
-            }
-
-            result = json.dumps(statistics, indent=4)
-            json_output = json.loads(result)
-            
-            logger.info("Memory statistics retrieved and converted to JSON successfully.")
-            return json_output  # Return the JSON output as a string
+            statistics = render_memory(MemoryManager.collect())
+            logger.info("Memory statistics report generated successfully.")
+            return statistics
         except Exception as e:
-            logger.error(f"Error retrieving memory statistics: {e}")
+            logger.error("Error retrieving memory statistics: %s", e)
             sys.exit(1)
@@ -1,28 +1,14 @@
 #!/usr/bin/env python3
 
-import json
 import os
 import sys
 from pathlib import Path
+from stream_writer import StreamingJSONWriter
 import logging
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
-
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-# Add the file handler to the logger
-logger.addHandler(file_handler)
-
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
-
 def create_directory_and_generate_file_path(base_directory, file_name):
     """
     Creates a directory if it doesn't already exist and generates a file path.
@@ -38,37 +24,43 @@ def create_directory_and_generate_file_path(base_directory, file_name):
         # Create directory if it doesn't exist
         directory_path = Path(base_directory)
         directory_path.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Directory created or already exists: {directory_path}")
+        logger.info("Directory created or already exists: %s", directory_path)
 
         # Generate file path
         file_path = directory_path / file_name
-        logger.info(f"Generated file path: {file_path}")
+        logger.info("Generated file path: %s", file_path)
         
         return str(file_path)
     except Exception as e:
-        logger.error(f"Error creating directory or generating file path: {e}")
+        logger.error("Error creating directory or generating file path: %s", e)
         raise
 
-def control_result_to_json(statistics):
+def control_result_to_json(statistics, compact=False):
+    """
+    Prompts for a destination and writes the report there as JSON.
+
+    The report is streamed, so generator-valued sections are written as they
+    are produced. compact=True writes it without indentation.
+    """
     try:
         # User input for base directory and file name
         base_directory = input("Enter base directory path: ").strip()
         file_name = input("Enter file name (including extension): ").strip()
 
-        logger.info(f"User provided base directory: {base_directory}, file name: {file_name}")
+        logger.info("User provided base directory: %s, file name: %s", base_directory, file_name)
 
         # Generate file path and create directory if necessary
         file_path = create_directory_and_generate_file_path(base_directory, file_name)
-        logger.info(f"Generated file path: {file_path}")
+        logger.info("Generated file path: %s", file_path)
 
         # Write the dictionary to JSON file
         with open(file_path, 'w', encoding='utf-8') as json_file:
-            json.dump(statistics, json_file, indent=4, ensure_ascii=False)
-        logger.info(f"JSON data has been saved to {file_path}")
+            StreamingJSONWriter(json_file, indent=None if compact else 4).write(statistics)
+        logger.info("JSON data has been saved to %s", file_path)
         print("JSON data has been saved to", file_path)
 
     except ValueError as ve:
-        logger.error(f"ValueError: {ve}")
+        logger.error("ValueError: %s", ve)
         print(ve)
         sys.exit(1)
     except PermissionError:
@@ -80,7 +72,7 @@ def control_result_to_json(statistics):
         print("Process interrupted by the user.")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Error uploading data: {e}")
+        logger.error("Error uploading data: %s", e)
         print("Error uploading data:", e)
         sys.exit(1)
 
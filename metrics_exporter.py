@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+"""
+Prometheus text-format endpoint.
+
+A background thread collects CPU, memory, swap, disk, network and process
+metrics every refresh interval and renders them once into an exposition
+payload. Scrapes are answered from that cached payload, so a scrape costs a
+memory read and any number of scrapers add no collection load.
+
+    python3 main.py --serve-metrics 9465
+    curl http://127.0.0.1:9465/metrics
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import psutil
+from cpu_management import CPUManager
+from memory_management import MemoryManager
+from disk_management import DiskManager
+from alert_rules import get_alert_engine, FIRING
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_PORT = 9465
+
+NETWORK_COUNTERS = (
+    ('bytes_sent', 'system_network_transmit_bytes_total', 'Bytes sent per interface.'),
+    ('bytes_recv', 'system_network_receive_bytes_total', 'Bytes received per interface.'),
+    ('packets_sent', 'system_network_transmit_packets_total', 'Packets sent per interface.'),
+    ('packets_recv', 'system_network_receive_packets_total', 'Packets received per interface.'),
+    ('errout', 'system_network_transmit_errors_total', 'Transmit errors per interface.'),
+    ('errin', 'system_network_receive_errors_total', 'Receive errors per interface.'),
+    ('dropout', 'system_network_transmit_drops_total', 'Outgoing packets dropped per interface.'),
+    ('dropin', 'system_network_receive_drops_total', 'Incoming packets dropped per interface.'),
+)
+
+
+class MetricFamily:
+    """One metric name with its type, help text and labelled samples."""
+
+    __slots__ = ('name', 'kind', 'help', 'samples')
+
+    def __init__(self, name, kind, help_text):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.samples = []
+
+    def add(self, value, **labels):
+        self.samples.append((labels, value))
+        return self
+
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if value != value:
+            return 'NaN'
+        if value in (float('inf'), float('-inf')):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def render_exposition(families):
+    """Renders metric families in the Prometheus text exposition format."""
+    lines = []
+    for family in families:
+        if not family.samples:
+            continue
+        lines.append(f'# HELP {family.name} {family.help}')
+        lines.append(f'# TYPE {family.name} {family.kind}')
+        for labels, value in family.samples:
+            if labels:
+                label_text = ','.join(f'{key}="{escape_label_value(item)}"' for key, item in labels.items())
+                lines.append(f'{family.name}{{{label_text}}} {format_value(value)}')
+            else:
+                lines.append(f'{family.name} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """
+    Serves the cached metrics payload over HTTP on a loopback address by default.
+
+    Args:
+    - host (str): Address to bind; keep the default unless scrapers are remote.
+    - port (int): Port to listen on; 0 picks a free one (see `address`).
+    - refresh_interval (float): Seconds between background collections.
+    """
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, refresh_interval=15.0):
+        if refresh_interval <= 0:
+            raise ValueError("Refresh interval must be a positive number of seconds.")
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.scrapes = 0
+        self.refresh_errors = 0
+        self._scrape_lock = threading.Lock()
+        self._cpu_manager = CPUManager()
+        self._disk_manager = DiskManager()
+        self._payload = b''
+        self._stop_event = threading.Event()
+        self._refresher = None
+        self._server = None
+        self._server_thread = None
+
+    @property
+    def address(self):
+        """(host, port) actually bound, once started."""
+        return self._server.server_address[:2] if self._server is not None else (self.host, self.port)
+
+    def _collect_cpu(self):
+        snapshot = self._cpu_manager.collect()
+        cpu_seconds = MetricFamily('system_cpu_seconds_total', 'counter', 'CPU time spent in each mode.')
+        for mode, seconds in zip(snapshot.time_fields, snapshot.times):
+            cpu_seconds.add(seconds, mode=mode)
+        return [
+            MetricFamily('system_cpu_usage_percent', 'gauge', 'CPU busy percentage over the last sampling window.')
+            .add(snapshot.usage),
+            MetricFamily('system_cpu_count', 'gauge', 'Logical CPU count.').add(snapshot.logical_count),
+            cpu_seconds,
+        ]
+
+    @staticmethod
+    def _collect_memory():
+        snapshot = MemoryManager.collect()
+        return [
+            MetricFamily('system_memory_total_bytes', 'gauge', 'Total physical memory.').add(snapshot.total),
+            MetricFamily('system_memory_available_bytes', 'gauge', 'Memory available without swapping.').add(snapshot.available),
+            MetricFamily('system_memory_used_bytes', 'gauge', 'Memory in use.').add(snapshot.used),
+            MetricFamily('system_memory_usage_percent', 'gauge', 'Memory usage percentage.').add(snapshot.percent),
+            MetricFamily('system_swap_total_bytes', 'gauge', 'Total swap space.').add(snapshot.swap_total),
+            MetricFamily('system_swap_used_bytes', 'gauge', 'Swap space in use.').add(snapshot.swap_used),
+            MetricFamily('system_swap_usage_percent', 'gauge', 'Swap usage percentage.').add(snapshot.swap_percent),
+        ]
+
+    def _collect_disk(self):
+        self._disk_manager.generate_overall_report()
+        total = MetricFamily('system_disk_total_bytes', 'gauge', 'Partition size.')
+        free = MetricFamily('system_disk_free_bytes', 'gauge', 'Free space on the partition.')
+        used = MetricFamily('system_disk_used_bytes', 'gauge', 'Used space on the partition.')
+        responsive = MetricFamily('system_disk_responsive', 'gauge',
+                                  '1 if the partition answered its usage query in time, else 0.')
+        for usage in self._disk_manager.partition_usages():
+            labels = {'device': usage.device, 'mountpoint': usage.mountpoint}
+            responsive.add(usage.responsive, **labels)
+            if usage.responsive:
+                total.add(usage.total, **labels)
+                free.add(usage.free, **labels)
+                used.add(usage.used, **labels)
+        return [total, free, used, responsive]
+
+    @staticmethod
+    def _collect_network():
+        counters = psutil.net_io_counters(pernic=True)
+        families = []
+        for field, name, help_text in NETWORK_COUNTERS:
+            family = MetricFamily(name, 'counter', help_text)
+            for interface, values in sorted(counters.items()):
+                family.add(getattr(values, field), interface=interface)
+            families.append(family)
+        return families
+
+    @staticmethod
+    def _collect_processes():
+        return [MetricFamily('system_processes', 'gauge', 'Number of processes.').add(len(psutil.pids()))]
+
+    @staticmethod
+    def _collect_alerts():
+        # Runs after the other groups, so the rules have seen this refresh's samples
+        firing = MetricFamily('analyzer_alert_firing', 'gauge', '1 while an alert rule fires for a series, 0 while pending.')
+        for alert in get_alert_engine().active():
+            firing.add(alert['state'] == FIRING, rule=alert['rule'], series=alert['series'])
+        return [firing]
+
+    def collect(self):
+        """Collects every metric family; a failing group is skipped and counted."""
+        families = []
+        for collector in (self._collect_cpu, self._collect_memory, self._collect_disk,
+                          self._collect_network, self._collect_processes, self._collect_alerts):
+            try:
+                families.extend(collector())
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.error("Error collecting metrics in %s: %s", collector.__name__, e)
+        return families
+
+    def refresh(self):
+        """Collects once and replaces the cached payload."""
+        started = time.perf_counter()
+        families = self.collect()
+        families.extend([
+            MetricFamily('analyzer_refresh_duration_seconds', 'gauge', 'Time taken by the last metrics refresh.')
+            .add(round(time.perf_counter() - started, 6)),
+            MetricFamily('analyzer_last_refresh_timestamp_seconds', 'gauge', 'Unix time of the last metrics refresh.')
+            .add(time.time()),
+            MetricFamily('analyzer_refresh_errors_total', 'counter', 'Metric groups that failed to collect.')
+            .add(self.refresh_errors),
+        ])
+        # A single reference swap: handlers never see a half-written payload
+        self._payload = render_exposition(families).encode('utf-8')
+        return self._payload
+
+    def payload(self):
+        """Returns the cached exposition payload plus the scrape counter."""
+        with self._scrape_lock:
+            self.scrapes += 1
+            scrapes = self.scrapes
+        counter = (f'# HELP analyzer_scrapes_total Scrapes served by this endpoint.\n'
+                   f'# TYPE analyzer_scrapes_total counter\n'
+                   f'analyzer_scrapes_total {scrapes}\n').encode('utf-8')
+        return self._payload + counter
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Error refreshing metrics: %s", e)
+
+    def start(self):
+        """Takes the first snapshot, then starts the refresher and the HTTP server threads."""
+        self.refresh()
+        self._stop_event.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name='metrics-refresher', daemon=True)
+        self._refresher.start()
+
+        self._server = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+        self._server.daemon_threads = True
+        self._server.exporter = self
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._server_thread.start()
+        logger.info("Serving metrics on http://%s:%s/metrics every %ss.", *self.address, self.refresh_interval)
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        logger.info("Metrics endpoint stopped.")
+
+    def serve_forever(self):
+        """Starts the endpoint and blocks until interrupted."""
+        self.start()
+        try:
+            while not self._stop_event.wait(3600):
+                pass
+        except KeyboardInterrupt:
+            logger.info("Metrics endpoint interrupted by the user.")
+        finally:
+            self.stop()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics from the exporter's cached payload."""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404, 'Only /metrics is served.')
+            return
+        body = self.server.exporter.payload()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
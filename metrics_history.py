@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import math
+import time
+import threading
+from array import array
+import sample_bus
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """
+    Fixed-capacity series of (timestamp, value) pairs stored in two typed arrays.
+
+    The arrays grow with the samples until they reach the capacity; from then
+    on appends overwrite the oldest sample. Each sample costs 16 bytes, so a
+    full day of 1-second samples is about 1.4 MB per series.
+    """
+
+    __slots__ = ('capacity', '_timestamps', '_values', '_head', '_size')
+
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError("Capacity must be a positive integer.")
+        self.capacity = capacity
+        self._timestamps = array('d')
+        self._values = array('d')
+        self._head = 0  # Index the next sample is written to once the arrays are full
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value, timestamp=None):
+        """Stores one sample in amortized O(1), replacing the oldest one when full."""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self._size < self.capacity:
+            # Still filling: the arrays hold exactly the samples, oldest first
+            self._timestamps.append(timestamp)
+            self._values.append(value)
+            self._size += 1
+            self._head = self._size % self.capacity
+            return
+        self._timestamps[self._head] = timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+
+    def latest(self):
+        """Returns the newest (timestamp, value) pair, or None when empty."""
+        if not self._size:
+            return None
+        index = (self._head - 1) % self.capacity
+        return self._timestamps[index], self._values[index]
+
+    def window(self, seconds=None, now=None):
+        """
+        Returns the samples of the last `seconds` seconds, oldest first.
+
+        Returns:
+        - tuple: (timestamps array, values array).
+        """
+        size = self._size
+        start = (self._head - size) % self.capacity
+        end = start + size
+        if end <= self.capacity:
+            timestamps = self._timestamps[start:end]
+            values = self._values[start:end]
+        else:
+            timestamps = self._timestamps[start:] + self._timestamps[:end - self.capacity]
+            values = self._values[start:] + self._values[:end - self.capacity]
+
+        if seconds is not None and size:
+            cutoff = (time.time() if now is None else now) - seconds
+            # Timestamps are appended in order, so bisect for the first sample in range
+            low, high = 0, len(timestamps)
+            while low < high:
+                middle = (low + high) // 2
+                if timestamps[middle] < cutoff:
+                    low = middle + 1
+                else:
+                    high = middle
+            timestamps, values = timestamps[low:], values[low:]
+        return timestamps, values
+
+    def rollup(self, seconds=None, percentiles=(50, 95, 99), now=None):
+        """Returns count, min, max, avg and the requested percentiles over a window."""
+        values = self.window(seconds, now=now)[1]
+        if not values:
+            return {'count': 0}
+        ordered = sorted(values)
+        summary = {
+            'count': len(ordered),
+            'min': ordered[0],
+            'max': ordered[-1],
+            'avg': math.fsum(ordered) / len(ordered),
+        }
+        for percentile in percentiles:
+            summary[f'p{percentile}'] = self.percentile(ordered, percentile)
+        return summary
+
+    @staticmethod
+    def percentile(ordered, percentile):
+        """Linear-interpolated percentile of an already sorted sequence."""
+        if not ordered:
+            return None
+        rank = (len(ordered) - 1) * percentile / 100
+        lower = math.floor(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class MetricsHistory:
+    """
+    In-memory history of numeric metrics, one RingBuffer per series.
+
+    Series are created on first use and named with dotted paths such as
+    'memory.available' or 'disk./home.free'. The history subscribes to the
+    sample bus, so every sample a collector publishes is recorded as it is
+    read; sample() only runs the producers that have not published since the
+    tick started.
+    """
+
+    # Series prefix -> (collector module, class, producer method); see sample_bus
+    PRODUCERS = {
+        'cpu.': ('cpu_management', 'CPUManager', 'collect'),
+        'memory.': ('memory_management', 'MemoryManager', 'collect'),
+        'disk.': ('disk_management', 'DiskManager', 'collect_usage'),
+        'net.': ('network_management', 'NetworkManager', 'collect_traffic'),
+    }
+
+    def __init__(self, capacity=86400):
+        self.capacity = capacity
+        self.series = {}
+        self._lock = threading.Lock()
+        self._published = {}  # Series prefix -> (timestamp, samples) last published
+        self._managers = {}
+        sample_bus.subscribe(self._on_samples)
+
+    def close(self):
+        """Stops recording published samples."""
+        sample_bus.unsubscribe(self._on_samples)
+
+    def _on_samples(self, samples, timestamp):
+        self.record_many(samples, timestamp)
+        groups = {}
+        for name, value in samples.items():
+            prefix = name[:name.index('.') + 1]
+            groups.setdefault(prefix, {})[name] = value
+        with self._lock:
+            for prefix, group in groups.items():
+                self._published[prefix] = (timestamp, group)
+
+    def record(self, name, value, timestamp=None):
+        """Appends one sample to the named series."""
+        with self._lock:
+            buffer = self.series.get(name)
+            if buffer is None:
+                buffer = self.series[name] = RingBuffer(self.capacity)
+            buffer.append(value, timestamp)
+
+    def record_many(self, samples, timestamp=None):
+        """Appends a mapping of series name -> value sharing one timestamp."""
+        timestamp = time.time() if timestamp is None else timestamp
+        for name, value in samples.items():
+            self.record(name, value, timestamp)
+
+    def names(self):
+        """Sorted series names, copied under the lock: collector threads may add series meanwhile."""
+        with self._lock:
+            return sorted(self.series)
+
+    def window(self, name, seconds=None):
+        with self._lock:
+            buffer = self.series.get(name)
+            return buffer.window(seconds) if buffer is not None else (array('d'), array('d'))
+
+    def rollup(self, name, seconds=None, percentiles=(50, 95, 99)):
+        with self._lock:
+            buffer = self.series.get(name)
+            return buffer.rollup(seconds, percentiles) if buffer is not None else {'count': 0}
+
+    def rollups(self, seconds=None, percentiles=(50, 95, 99)):
+        """Returns a rollup for every series."""
+        return {name: self.rollup(name, seconds, percentiles) for name in self.names()}
+
+    def _produce(self, prefix):
+        """Runs the collector method that publishes the series under `prefix`."""
+        module_name, class_name, method_name = self.PRODUCERS[prefix]
+        manager = self._managers.get(prefix)
+        if manager is None:
+            manager = self._managers[prefix] = getattr(__import__(module_name), class_name)()
+        if prefix == 'disk.':
+            # Refreshes the mount list; usage still goes through DiskManager so dead
+            # network mounts time out instead of hanging the sample
+            manager.generate_overall_report()
+        getattr(manager, method_name)()
+
+    def sample(self, timestamp=None):
+        """
+        Makes sure every default series has one sample for the tick started at `timestamp`.
+
+        Series a collector already published since then are not read again;
+        the others are read through their producer, which also feeds the
+        alert rules.
+
+        Returns:
+        - dict: Series name -> value for this tick.
+        """
+        started = time.time() if timestamp is None else timestamp
+        samples = {}
+        for prefix in self.PRODUCERS:
+            published = self._published.get(prefix)
+            if published is None or published[0] < started:
+                try:
+                    self._produce(prefix)
+                except Exception as e:
+                    logger.error("Error sampling %s* metrics history series: %s", prefix, e)
+                    continue
+                published = self._published.get(prefix)
+            if published is not None and published[0] >= started:
+                samples.update(published[1])
+        return samples
+
+    def memory_usage(self):
+        """Approximate bytes held by the sample arrays."""
+        with self._lock:
+            return sum(2 * len(buffer) * 8 for buffer in self.series.values())
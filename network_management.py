@@ -3,30 +3,58 @@
 import json
 import psutil
 import socket
+import time
 import netifaces
 import sys
 from report_signatures import TimeStampGenerator
+from network_rates import get_traffic_monitor
+from connectivity_probes import get_connectivity_prober
+from snapshots import TrafficSnapshot
+from report_renderer import render_traffic
+from self_metrics import instrumented
+from sample_bus import publish
 import logging  # Import logging module
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
 
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
+def count_connections(connections):
+    """Number of sockets in a gathered connection list, or in the 'inet' list of a per-kind mapping."""
+    if isinstance(connections, dict):
+        return len(connections.get("inet", ()))
+    return len(connections)
 
-# Add the file handler to the logger
-logger.addHandler(file_handler)
 
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
+def configure_dedupe_connections(enabled):
+    """
+    Makes every NetworkManager list each socket once with a "kinds" tag unless told otherwise.
+
+    This reaches the network report of the collector registry and the wizard alike.
+    """
+    NetworkManager.default_dedupe_connections = bool(enabled)
+    logger.info("Connection de-duplication %s.", 'enabled' if enabled else 'disabled')
+
 
 class NetworkManager:
-    def __init__(self):
+    # Connection kinds reported, with the (family, type) pairs each one covers
+    CONNECTION_KINDS = {
+        "inet": ((socket.AF_INET, socket.AF_INET6), (socket.SOCK_STREAM, socket.SOCK_DGRAM)),  # IPv4 and IPv6
+        "inet4": ((socket.AF_INET,), (socket.SOCK_STREAM, socket.SOCK_DGRAM)),                 # IPv4
+        "inet6": ((socket.AF_INET6,), (socket.SOCK_STREAM, socket.SOCK_DGRAM)),                # IPv6
+        "tcp": ((socket.AF_INET, socket.AF_INET6), (socket.SOCK_STREAM,)),                     # TCP
+        "tcp4": ((socket.AF_INET,), (socket.SOCK_STREAM,)),                                    # TCP over IPv4
+        "tcp6": ((socket.AF_INET6,), (socket.SOCK_STREAM,)),                                   # TCP over IPv6
+        "udp": ((socket.AF_INET, socket.AF_INET6), (socket.SOCK_DGRAM,)),                      # UDP
+        "udp4": ((socket.AF_INET,), (socket.SOCK_DGRAM,)),                                     # UDP over IPv4
+        "udp6": ((socket.AF_INET6,), (socket.SOCK_DGRAM,)),                                    # UDP over IPv6
+    }
+
+    # Used by managers created without dedupe_connections (set by configure_dedupe_connections)
+    default_dedupe_connections = False
+
+    def __init__(self, dedupe_connections=None):
+        self.dedupe_connections = self.default_dedupe_connections if dedupe_connections is None else dedupe_connections
         self.data = {
             "interface_stats": {},
             "interface_addrs": {},
@@ -44,52 +72,67 @@ class NetworkManager:
         except socket.gaierror:
             status = "PC isn't connected to localhost."
             logger.warning("PC isn't connected to localhost.")
-        finally:
-            socket.socket(socket.AF_INET, socket.SOCK_STREAM).close()
 
         return status
 
     @staticmethod
     # Function to check network connectivity
+    @instrumented()
     def check_network_connectivity():
-        try:
-            logger.info("Checking network connectivity.")
-            socket.gethostbyname('www.google.com')
+        logger.info("Checking network connectivity.")
+        # Probes run concurrently under a hard timeout, and results are cached for a short TTL
+        results = get_connectivity_prober().probe()
+        if any(result['reachable'] for result in results):
             status = "PC is connected to the internet."
             logger.info("PC is connected to the internet.")
-        except socket.gaierror:
+        else:
             status = "PC isn't connected to the internet."
-            logger.warning("PC isn't connected to the internet.")
-        finally:
-            socket.socket(socket.AF_INET, socket.SOCK_STREAM).close()
+            logger.warning("PC isn't connected to the internet: %s", results)
 
         return status
 
+    @staticmethod
+    # Function to collect network traffic counters and per-interface rates as raw numbers
+    @instrumented()
+    def collect_traffic():
+        timestamp = time.time()
+        network = psutil.net_io_counters()
+        logger.debug("Network Traffic: %s", network)
+        monitor = get_traffic_monitor()
+        interface_rates = monitor.rates()
+
+        # Per-interface cumulative counters from the read the rates were computed from
+        samples = {}
+        for interface, counters in monitor.latest_counters().items():
+            for field in ('bytes_sent', 'bytes_recv', 'errin', 'errout', 'dropin', 'dropout'):
+                samples[f'net.{interface}.{field}'] = getattr(counters, field)
+        publish(samples, timestamp)
+
+        return TrafficSnapshot(
+            timestamp=timestamp,
+            bytes_sent=network.bytes_sent,
+            bytes_recv=network.bytes_recv,
+            packets_sent=network.packets_sent,
+            packets_recv=network.packets_recv,
+            errin=network.errin,
+            errout=network.errout,
+            dropin=network.dropin,
+            dropout=network.dropout,
+            interface_rates=interface_rates,
+        )
+
     @staticmethod
     # Function to monitor network traffic
+    @instrumented()
     def monitor_network_traffic():
         try:
             logger.info("Monitoring network traffic.")
-            network = psutil.net_io_counters()
-            logger.debug(f"Network Traffic: {network}")
-            return {
-                'Network Traffic Information': {
-                    'Send': f'{network.bytes_sent / (1024 ** 2):.2f} Mbps',
-                    'Received': f'{network.bytes_recv / (1024 ** 2):.2f} Mbps',
-                },
-                'Extra Information': {
-                    'Packets Sent': f'{network.packets_sent}',
-                    'Packet Received': f'{network.packets_recv}',
-                    'ErrorIn': f'{network.errin}',
-                    'ErrorOut': f'{network.errout}',
-                    'DropIn': f'{network.dropin}',
-                    'DropOut': f'{network.dropout}'
-                }
-            }
+            return render_traffic(NetworkManager.collect_traffic())
         except Exception as e:
-            logger.error(f"Error monitoring network traffic: {e}")
+            logger.error("Error monitoring network traffic: %s", e)
             sys.exit(1)
 
+    @instrumented()
     def gather_interface_stats(self):
         """Gathers network interface statistics."""
         try:
@@ -105,8 +148,9 @@ class NetworkManager:
                 }
             logger.info("Network interface statistics gathered successfully.")
         except Exception as e:
-            logger.error(f"Error gathering interface stats: {e}")
+            logger.error("Error gathering interface stats: %s", e)
 
+    @instrumented()
     def gather_interface_addrs(self):
         """Gathers network interface addresses."""
         try:
@@ -124,46 +168,98 @@ class NetworkManager:
                     })
             logger.info("Network interface addresses gathered successfully.")
         except Exception as e:
-            logger.error(f"Error gathering interface addresses: {e}")
+            logger.error("Error gathering interface addresses: %s", e)
+
+    def _format_connection(self, conn):
+        return {
+            "fd": conn.fd,
+            "family": self._get_family_name(conn.family),
+            "type": self._get_socket_type_name(conn.type),
+            "local_address": f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else "None",
+            "remote_address": f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else "None",
+            "status": conn.status,
+            "pid": conn.pid if conn.pid is not None else 'None'
+        }
+
+    def _connection_kinds(self, conn):
+        """Returns every reported kind a connection belongs to."""
+        return [kind for kind, (families, types) in self.CONNECTION_KINDS.items()
+                if conn.family in families and conn.type in types]
 
+    @instrumented(items=len, detail='kind')
     def gather_connections(self, kind: str):
         """Gathers network connections of a specific kind."""
         try:
-            logger.info(f"Gathering network connections for kind: {kind}")
+            logger.info("Gathering network connections for kind: %s", kind)
             connections = psutil.net_connections(kind=kind)
-            self.data["connections"][kind] = []
-            for conn in connections:
-                self.data["connections"][kind].append({
-                    "fd": conn.fd,
-                    "family": self._get_family_name(conn.family),
-                    "type": self._get_socket_type_name(conn.type),
-                    "local_address": f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else "None",
-                    "remote_address": f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else "None",
-                    "status": conn.status,
-                    "pid": conn.pid if conn.pid is not None else 'None'
-                })
-            logger.info(f"Network connections for kind '{kind}' gathered successfully.")
+            self.data["connections"][kind] = [self._format_connection(conn) for conn in connections]
+            logger.info("Network connections for kind '%s' gathered successfully.", kind)
+            return self.data["connections"][kind]
+        except Exception as e:
+            logger.error("Error gathering connections for kind='%s': %s", kind, e)
+
+    def iter_connections(self):
+        """Yields each inet socket once, formatted and tagged with its kinds, from one enumeration."""
+        for conn in psutil.net_connections(kind="inet"):
+            entry = self._format_connection(conn)
+            entry["kinds"] = self._connection_kinds(conn)
+            yield entry
+
+    def stream_connections(self):
+        """
+        Returns the connections section with generators in place of lists, for StreamingJSONWriter.
+
+        The layout follows dedupe_connections: one generator of tagged sockets,
+        or one generator per kind. The per-kind generators share a single
+        enumeration, taken when the first of them is written, and format each
+        socket only as it is written.
+        """
+        if self.dedupe_connections:
+            return self.iter_connections()
+        enumeration = {}
+
+        def of_kind(kind):
+            if 'inet' not in enumeration:
+                enumeration['inet'] = psutil.net_connections(kind="inet")
+            families, types = self.CONNECTION_KINDS[kind]
+            for conn in enumeration['inet']:
+                if conn.family in families and conn.type in types:
+                    yield self._format_connection(conn)
+
+        return {kind: of_kind(kind) for kind in self.CONNECTION_KINDS}
+
+    @instrumented(items=count_connections)
+    def gather_all_connections(self):
+        """
+        Enumerates inet sockets once and partitions them by family and type in memory.
+
+        By default each kind gets its own list, as gather_connections() would give.
+        With dedupe_connections, the result is one list in which every socket
+        appears once with a "kinds" tag listing the kinds it belongs to.
+        """
+        try:
+            logger.info("Gathering network connections in a single pass.")
+            if self.dedupe_connections:
+                self.data["connections"] = list(self.iter_connections())
+            else:
+                connections = psutil.net_connections(kind="inet")
+                partitioned = {kind: [] for kind in self.CONNECTION_KINDS}
+                for conn in connections:
+                    entry = self._format_connection(conn)
+                    for kind in self._connection_kinds(conn):
+                        partitioned[kind].append(entry)
+                self.data["connections"] = partitioned
+            logger.info("Network connections gathered in a single pass.")
+            return self.data["connections"]
         except Exception as e:
-            logger.error(f"Error gathering connections for kind='{kind}': {e}")
+            logger.error("Error gathering network connections: %s", e)
 
     def gather_all_info(self):
         """Gathers all network-related information."""
         logger.info("Gathering all network-related information.")
         self.gather_interface_stats()
         self.gather_interface_addrs()
-        kinds = [
-            "inet",  # IPv4 and IPv6
-            "inet4", # IPv4
-            "inet6", # IPv6
-            "tcp",   # TCP
-            "tcp4",  # TCP over IPv4
-            "tcp6",  # TCP over IPv6
-            "udp",   # UDP
-            "udp4",  # UDP over IPv4
-            "udp6",  # UDP over IPv6
-        ]
-        for kind in kinds:
-            self.gather_connections(kind)
+        self.gather_all_connections()
         logger.info("All network-related information gathered successfully.")
 
     def _get_duplex_name(self, duplex):
@@ -192,6 +288,7 @@ class NetworkManager:
         return json.dumps(self.data, indent=4)
 
     @staticmethod
+    @instrumented(items=len)
     def get_network_info():
         """Gathers detailed network interface information."""
         logger.info("Gathering detailed network interface information.")
@@ -247,11 +344,13 @@ class NetworkManager:
             return network_info
 
         except Exception as e:
-            logger.error(f"Error getting network information: {str(e)}")
+            logger.error("Error getting network information: %s", str(e))
 
     @staticmethod
     # Function to manage network statistics
-    def network_report():
+    @instrumented()
+    def network_report(dedupe_connections=None, stream=False):
+        # stream=True leaves the connections as generators for StreamingJSONWriter (see stream_connections)
         try:
             logger.info("Generating network report.")
             localhost_connectivity = NetworkManager().check_localhost_connectivity()
@@ -267,19 +366,24 @@ class NetworkManager:
                 }
             }
 
-            statistics_report = json.dumps(statistics, indent=4)
-            deep_analyzer = NetworkManager()
-            deep_analyzer.gather_all_info()
-            deep_analyzed_report = deep_analyzer.to_json()
+            deep_analyzer = NetworkManager(dedupe_connections=dedupe_connections)
+            if stream:
+                deep_analyzer.gather_interface_stats()
+                deep_analyzer.gather_interface_addrs()
+                deep_analyzer.data["connections"] = deep_analyzer.stream_connections()
+            else:
+                deep_analyzer.gather_all_info()
 
-            network_interface_report = json.dumps(NetworkManager().get_network_info(), indent=4)
+            network_interface_report = NetworkManager().get_network_info() or {}
 
-            combined_report = dict(json.loads(statistics_report), **json.loads(deep_analyzed_report), **json.loads(network_interface_report))
-
-            result = json.dumps(combined_report, indent=4)
-            json_output = json.loads(result)
+            combined_report = dict(statistics, **deep_analyzer.data, **network_interface_report)
             logger.info("Network report generated successfully.")
-            return json_output
+            return combined_report
         except Exception as e:
-            logger.error(f"Error generating network report: {e}")
+            logger.error("Error generating network report: %s", e)
             sys.exit(1)
+
+    @staticmethod
+    def stream_network_report():
+        """network_report() with its connections as generators; the engine's streaming variant."""
+        return NetworkManager.network_report(stream=True)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import threading
+import time
+import psutil
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class TrafficRateMonitor:
+    """
+    Computes per-interface throughput from psutil.net_io_counters(pernic=True) deltas.
+
+    The previous counters are kept with their timestamp, so a rate is
+    available on every call after the first without sleeping. Interfaces that
+    appear are baselined on their first sample; interfaces that disappear are
+    forgotten.
+    """
+
+    COUNTER_FIELDS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                      'errin', 'errout', 'dropin', 'dropout')
+
+    # Fastest a counter is assumed to advance (100 Gbit/s in bytes); a decrease that would
+    # need more than this since the previous sample to be a wrap is taken as a reset
+    MAX_COUNTER_RATE = 12.5e9
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous = None
+        self._previous_time = None
+
+    @staticmethod
+    def counter_delta(previous, current, limit=2 ** 31):
+        """
+        Difference between two counter readings, allowing for a 32-bit wrap or a reset.
+
+        Args:
+        - limit (float): Largest delta a wrap may imply; larger ones mean the counter was reset.
+        """
+        if current >= previous:
+            return current - previous
+        wrapped = current + 2 ** 32 - previous
+        if previous < 2 ** 32 and wrapped <= limit:
+            # 32-bit kernel counter wrapped around
+            return wrapped
+        # Counter was reset (driver reload, interface re-created); count from zero
+        return current
+
+    def _read(self):
+        # Raw counters: wraparound is handled here rather than by psutil's cache
+        return psutil.net_io_counters(pernic=True, nowrap=False), time.monotonic()
+
+    def rates(self, window=1.0):
+        """
+        Returns {interface: {field: per-second rate}} since the previous call.
+
+        Args:
+        - window (float): Seconds to wait for a second sample when no previous sample exists.
+        """
+        with self._lock:
+            if self._previous is None:
+                self._previous, self._previous_time = self._read()
+                time.sleep(window)
+            current, now = self._read()
+            previous, previous_time = self._previous, self._previous_time
+            self._previous, self._previous_time = current, now
+
+        elapsed = now - previous_time
+        rates = {}
+        if elapsed <= 0:
+            return rates
+        limit = min(2 ** 31, self.MAX_COUNTER_RATE * elapsed)
+        for interface, counters in current.items():
+            before = previous.get(interface)
+            if before is None:
+                logger.info("Interface %s appeared; its rates start on the next sample.", interface)
+                continue
+            rates[interface] = {
+                field: self.counter_delta(getattr(before, field), getattr(counters, field), limit) / elapsed
+                for field in self.COUNTER_FIELDS
+            }
+        for interface in previous.keys() - current.keys():
+            logger.info("Interface %s disappeared.", interface)
+        return rates
+
+    def latest_counters(self):
+        """Returns the per-interface counters read by the last rates() call, or an empty dict."""
+        with self._lock:
+            return dict(self._previous or {})
+
+
+_shared_monitor = None
+_shared_monitor_lock = threading.Lock()
+
+
+def get_traffic_monitor():
+    """Returns the process-wide traffic rate monitor, creating it on first use."""
+    global _shared_monitor
+    with _shared_monitor_lock:
+        if _shared_monitor is None:
+            _shared_monitor = TrafficRateMonitor()
+        return _shared_monitor
@@ -1,64 +1,125 @@
 #!/usr/bin/env python3
 
-import json
+import time
 import psutil
 import sys
 from report_signatures import TimeStampGenerator
+from process_tracker import ProcessTracker
+from self_metrics import instrumented
 import logging  # Import logging module
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
+class ProcessManager:
+    # Attributes read for every process in the single scan pass
+    SCAN_ATTRS = ['pid', 'name']
 
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
+    def __init__(self):
+        self.process_list = None
+        self.process_info = None
+        self.vanished_count = 0
+        self.access_denied_count = 0
+        self.tracker = None
 
-# Add the file handler to the logger
-logger.addHandler(file_handler)
+    def iter_process_info(self):
+        """
+        Walks the process table once with psutil.process_iter, yielding one dict per process.
 
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
+        Processes that exit mid-scan are skipped and counted as vanished;
+        fields the caller may not read are reported as None and counted as
+        access denied. The counts are complete once the generator is exhausted.
+        """
+        self.vanished_count = 0
+        self.access_denied_count = 0
+        denied = object()  # Sentinel so unreadable fields can be counted
 
-class ProcessManager:
-    def __init__(self):
-        self.process_list = None
+        logger.info("Scanning process table.")
+        for proc in psutil.process_iter():
+            try:
+                process_info = proc.as_dict(attrs=self.SCAN_ATTRS, ad_value=denied)
+            except psutil.NoSuchProcess:
+                self.vanished_count += 1
+                continue
+            except psutil.AccessDenied:
+                self.access_denied_count += 1
+                continue
+
+            if any(value is denied for value in process_info.values()):
+                self.access_denied_count += 1
+                process_info = {key: (None if value is denied else value) for key, value in process_info.items()}
+            yield process_info
 
+    @instrumented(items=len)
+    def scan_processes(self):
+        """Runs one full scan and keeps both the process list and the process info."""
+        process_info_list = list(self.iter_process_info())
+        self.process_info = process_info_list
+        self.process_list = [{'pid': process_info['pid']} for process_info in process_info_list]
+        logger.info("Scanned %s processes (%s vanished, %s access denied).",
+                    len(process_info_list), self.vanished_count, self.access_denied_count)
+        return process_info_list
+
+    @instrumented(items=len)
     def get_process_list(self):
         try:
             logger.info("Retrieving process list.")
-            self.process_list = [{'pid': pid} for pid in psutil.pids()]
-            logger.info(f"Retrieved process list: {self.process_list}")
+            if self.process_list is None:
+                self.scan_processes()
+            logger.debug("Retrieved process list of %s entries.", len(self.process_list))
             return self.process_list
         except Exception as e:
-            logger.error(f"Error retrieving process list: {e}")
+            logger.error("Error retrieving process list: %s", e)
             sys.exit(1)
 
+    @instrumented(items=len)
     def get_process_info(self):
-        process_info_list = []
         try:
             logger.info("Gathering process information.")
-            for process in self.process_list:
-                process_id = process['pid']
-                proc = psutil.Process(process_id)
-                process_info = proc.as_dict(attrs=['pid', 'name'])
-                process_info_list.append(process_info)
-
-            logger.info(f"Retrieved process information: {process_info_list}")
-            return process_info_list
-        except psutil.NoSuchProcess as e:
-            logger.error(f"Error retrieving process info: {e}")
-            sys.exit(1)
+            if self.process_info is None:
+                self.scan_processes()
+            logger.debug("Retrieved information for %s processes.", len(self.process_info))
+            return self.process_info
         except Exception as e:
-            logger.error(f"Error: {e}")
+            logger.error("Error: %s", e)
             sys.exit(1)
 
+    def _scan_summary(self, scanned):
+        return {
+            'Processes Scanned': f'{scanned}',
+            'Vanished During Scan': f'{self.vanished_count}',
+            'Access Denied': f'{self.access_denied_count}'
+        }
+
+    def stream_processes(self):
+        """
+        Builds the process report with the process info as a generator.
+
+        Meant for StreamingJSONWriter: processes are written as they are read,
+        and the scan summary is produced after the generator has run.
+        """
+        logger.info("Streaming system processes.")
+        scanned = [0]
+
+        def process_info():
+            for info in self.iter_process_info():
+                scanned[0] += 1
+                yield info
+
+        return {
+            'System Processes Statistics': {
+                'Process Info': process_info(),
+                'Scan Summary': lambda: self._scan_summary(scanned[0]),
+                'Generated Time & Date': f'{TimeStampGenerator().generate_report()}'
+            }
+        }
+
+    @instrumented()
     def manage_processes(self):
         try:
             logger.info("Managing system processes.")
+            # One scan per report; both views below are built from it
+            self.scan_processes()
             process_list = self.get_process_list()
             process_info = self.get_process_info()
 
@@ -70,15 +131,78 @@ class ProcessManager:
                 'System Processes Statistics': {
                     'Process List': process_list,
                     'Process Info': process_info,
+                    'Scan Summary': self._scan_summary(len(process_info)),
                     'Generated Time & Date': f'{TimeStampGenerator().generate_report()}'
                 }
             }
 
-            result = json.dumps(statistics, indent=4)
-            json_output = json.loads(result)
-
             logger.info("System processes managed successfully.")
-            return json_output  # Return the JSON output as a string
+            return statistics
+        except Exception as e:
+            logger.error("Error managing processes: %s", e)
+            sys.exit(1)
+
+    @instrumented()
+    def track_processes(self):
+        """Reports processes spawned, exited or changed since the previous call on this manager."""
+        try:
+            logger.info("Tracking process changes.")
+            if self.tracker is None:
+                self.tracker = ProcessTracker()
+            changes = self.tracker.refresh()
+
+            if changes['baseline']:
+                # The first snapshot only records what is running; changes start with the next one
+                report = {'Baseline': 'Changes are reported from the next snapshot on.'}
+            else:
+                report = {'Spawned': changes['spawned'], 'Exited': changes['exited'], 'Changed': changes['changed']}
+            report['Tracked Processes'] = f'{len(self.tracker.states)}'
+            report['Generated Time & Date'] = f'{TimeStampGenerator().generate_report()}'
+            statistics = {'System Process Changes': report}
+
+            logger.info("Process changes tracked successfully.")
+            return statistics
+        except Exception as e:
+            logger.error("Error tracking process changes: %s", e)
+            sys.exit(1)
+
+    @staticmethod
+    def _format_ranked(state):
+        return {
+            'pid': state['pid'],
+            'name': state['name'],
+            'CPU Usage': f"{state['cpu_percent'] if state['cpu_percent'] is not None else 0.0} %",
+            'Resident Memory': f"{state['rss'] / (1024 ** 2):.2f} MB",
+            'I/O Rate': f"{(state['io_rate'] or 0.0) / 1024:.2f} KB/s"
+        }
+
+    @instrumented()
+    def top_processes(self, count=10, window=0.5):
+        """
+        Ranks the top `count` processes by CPU percent, resident memory and I/O bytes per second.
+
+        Rates come from the tracker's cached counters; only a tracker without a
+        previous sample waits once for `window` seconds to establish one.
+        """
+        try:
+            logger.info("Ranking top %s processes.", count)
+            if self.tracker is None:
+                self.tracker = ProcessTracker()
+                self.tracker.refresh()
+                time.sleep(window)
+            self.tracker.refresh()
+
+            statistics = {
+                'Top Processes': {
+                    'By CPU': [self._format_ranked(state) for state in self.tracker.top(count, by='cpu')],
+                    'By Memory': [self._format_ranked(state) for state in self.tracker.top(count, by='memory')],
+                    'By I/O': [self._format_ranked(state) for state in self.tracker.top(count, by='io')],
+                    'Generated Time & Date': f'{TimeStampGenerator().generate_report()}'
+                }
+            }
+
+            logger.info("Top processes ranked successfully.")
+            return statistics
         except Exception as e:
-            logger.error(f"Error managing processes: {e}")
+            logger.error("Error ranking top processes: %s", e)
             sys.exit(1)
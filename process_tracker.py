@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+import time
+import heapq
+import psutil
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class ProcessTracker:
+    """
+    Keeps psutil.Process handles across snapshots and reports what changed.
+
+    Processes are keyed by (pid, create_time), so a PID reused by a new
+    process shows up as one exit plus one spawn. Static fields are read once
+    when a process is first seen; each refresh only re-reads the dynamic ones.
+    CPU percent and I/O rates are derived from the cached counters of the
+    previous refresh, so no per-process sleep is needed.
+
+    The first refresh only establishes the baseline: the processes already
+    running are tracked but not reported as spawned.
+    """
+
+    # Dynamic fields compared between refreshes to detect a "changed" process
+    CHANGE_FIELDS = ('status', 'num_threads')
+    # Resident memory moves on almost every refresh, so it only counts as a change once it
+    # differs by this fraction from the value last reported (or first seen)
+    RSS_CHANGE_RATIO = 0.2
+
+    # Rankable fields -> key function used for top-N selection
+    RANK_KEYS = {
+        'cpu': lambda state: state['cpu_percent'] or 0.0,
+        'memory': lambda state: state['rss'],
+        'io': lambda state: state['io_rate'] or 0.0,
+    }
+
+    def __init__(self):
+        self.handles = {}  # (pid, create_time) -> psutil.Process
+        self.states = {}   # (pid, create_time) -> latest field values
+        self._keys_by_pid = {}
+        self.last_refresh = None
+
+    @staticmethod
+    def _read_dynamic(proc):
+        with proc.oneshot():
+            cpu_times = proc.cpu_times()
+            try:
+                io_counters = proc.io_counters()
+                io_bytes = io_counters.read_bytes + io_counters.write_bytes
+            except (psutil.AccessDenied, AttributeError):
+                io_bytes = None  # Not readable for this process or not supported on this platform
+            return {
+                'status': proc.status(),
+                'num_threads': proc.num_threads(),
+                'rss': proc.memory_info().rss,
+                'cpu_time': cpu_times.user + cpu_times.system,
+                'io_bytes': io_bytes,
+                'sampled_at': time.monotonic(),
+            }
+
+    @staticmethod
+    def _update_rates(state, fresh):
+        elapsed = fresh['sampled_at'] - state['sampled_at']
+        if elapsed <= 0:
+            return
+        state['cpu_percent'] = round(max(fresh['cpu_time'] - state['cpu_time'], 0.0) / elapsed * 100, 1)
+        if fresh['io_bytes'] is not None and state['io_bytes'] is not None:
+            state['io_rate'] = max(fresh['io_bytes'] - state['io_bytes'], 0) / elapsed
+        else:
+            state['io_rate'] = None
+
+    def _add(self, pid):
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            key = (pid, proc.create_time())
+            try:
+                name = proc.name()
+            except psutil.AccessDenied:
+                name = None
+            state = self._read_dynamic(proc)
+        state['pid'] = pid
+        state['name'] = name
+        state['cpu_percent'] = None  # Known after the next refresh
+        state['io_rate'] = None
+        state['reported_rss'] = state['rss']
+        self.handles[key] = proc
+        self.states[key] = state
+        self._keys_by_pid[pid] = key
+        return key
+
+    def _remove(self, key):
+        self.handles.pop(key, None)
+        state = self.states.pop(key, None)
+        if self._keys_by_pid.get(key[0]) == key:
+            del self._keys_by_pid[key[0]]
+        return state
+
+    @staticmethod
+    def _summary(state):
+        return {'pid': state['pid'], 'name': state['name']}
+
+    def refresh(self):
+        """
+        Refreshes every tracked process and discovers new ones.
+
+        Returns:
+        - dict: 'spawned', 'exited' and 'changed' lists for this cycle, and
+          'baseline', which is True on the first refresh (nothing is reported then).
+        """
+        baseline = self.last_refresh is None
+        spawned, exited, changed = [], [], []
+        current_pids = set(psutil.pids())
+
+        # Processes that disappeared from the table since the last refresh
+        for pid in [pid for pid in self._keys_by_pid if pid not in current_pids]:
+            state = self._remove(self._keys_by_pid[pid])
+            if state is not None:
+                exited.append(self._summary(state))
+
+        for pid in current_pids:
+            key = self._keys_by_pid.get(pid)
+            try:
+                if key is None:
+                    key = self._add(pid)
+                    spawned.append(self._summary(self.states[key]))
+                    continue
+
+                proc = self.handles[key]
+                if not proc.is_running():
+                    # The PID now belongs to a different process
+                    exited.append(self._summary(self._remove(key)))
+                    key = self._add(pid)
+                    spawned.append(self._summary(self.states[key]))
+                    continue
+
+                state = self.states[key]
+                fresh = self._read_dynamic(proc)
+                differences = {field: fresh[field] for field in self.CHANGE_FIELDS if fresh[field] != state[field]}
+                if abs(fresh['rss'] - state['reported_rss']) > state['reported_rss'] * self.RSS_CHANGE_RATIO:
+                    differences['rss'] = state['reported_rss'] = fresh['rss']
+                self._update_rates(state, fresh)
+                state.update(fresh)
+                if differences:
+                    changed.append(dict(self._summary(state), **differences))
+            except psutil.NoSuchProcess:
+                if key is not None and key in self.states:
+                    exited.append(self._summary(self._remove(key)))
+            except psutil.AccessDenied:
+                logger.debug("Access denied while tracking process %s.", pid)
+
+        self.last_refresh = time.time()
+        if baseline:
+            logger.info("Process tracker baseline: %s tracked.", len(self.states))
+            return {'spawned': [], 'exited': [], 'changed': [], 'baseline': True}
+        logger.info("Process tracker refreshed: %s spawned, %s exited, %s changed, %s tracked.",
+                    len(spawned), len(exited), len(changed), len(self.states))
+        return {'spawned': spawned, 'exited': exited, 'changed': changed, 'baseline': False}
+
+    def top(self, count=10, by='cpu'):
+        """
+        Returns the `count` tracked processes ranked highest by `by` ('cpu', 'memory' or 'io').
+
+        Selection uses heapq.nlargest, so it costs O(n log count) rather than a full sort.
+        """
+        if by not in self.RANK_KEYS:
+            raise ValueError(f"Unknown ranking '{by}'. Choose one of: {', '.join(self.RANK_KEYS)}.")
+        return heapq.nlargest(count, self.states.values(), key=self.RANK_KEYS[by])
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+import gzip
+import json
+import lzma
+import os
+import re
+import struct
+import time
+from pathlib import Path
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Index entry: snapshot timestamp, byte offset of its compressed member in the segment
+INDEX_ENTRY = struct.Struct('<dQ')
+
+COMPRESSORS = {
+    'gzip': ('.jsonl.gz', gzip.compress, gzip.decompress),
+    'lzma': ('.jsonl.xz', lzma.compress, lzma.decompress),
+}
+
+SEGMENT_PATTERN = re.compile(r'^segment-(\d+)(-downsampled)?(\.jsonl\.(?:gz|xz))$')
+
+
+class Segment:
+    """One archive segment: a file of compressed snapshots plus its .idx sidecar."""
+
+    __slots__ = ('path', 'start', 'downsampled')
+
+    def __init__(self, path, start, downsampled):
+        self.path = path
+        self.start = start
+        self.downsampled = downsampled
+
+    @property
+    def index_path(self):
+        return self.path.with_name(self.path.name.split('.')[0] + '.idx')
+
+    def read_index(self):
+        """Returns the list of (timestamp, offset) entries."""
+        try:
+            data = self.index_path.read_bytes()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+
+class ReportArchive:
+    """
+    Time-partitioned, compressed archive of report snapshots.
+
+    Every snapshot is written as its own compressed member (gzip or xz) at
+    the end of the active segment, and its timestamp and byte offset are
+    appended to the segment's .idx sidecar. A time-range query reads only the
+    indexes, then seeks to and decompresses only the matching members of the
+    overlapping segments. Segments rotate by size or age; retention deletes
+    old segments and downsamples ones past `downsample_after`.
+    """
+
+    def __init__(self, directory, compression='gzip', max_segment_bytes=64 * 1024 * 1024,
+                 max_segment_age=3600.0, retention=7 * 86400.0, downsample_after=86400.0, downsample_step=10):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression '{compression}'. Choose one of: {', '.join(COMPRESSORS)}.")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self.extension, self._compress, _ = COMPRESSORS[compression]
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.retention = retention
+        self.downsample_after = downsample_after
+        self.downsample_step = downsample_step
+        self._active = None
+        self._active_size = 0
+
+    def segments(self):
+        """Returns every segment in the archive directory, oldest first."""
+        found = []
+        for path in self.directory.iterdir():
+            match = SEGMENT_PATTERN.match(path.name)
+            if match:
+                found.append(Segment(path, int(match.group(1)) / 1000, bool(match.group(2))))
+        return sorted(found, key=lambda segment: segment.start)
+
+    def _open_segment(self, timestamp):
+        path = self.directory / f'segment-{int(timestamp * 1000)}{self.extension}'
+        self._active = Segment(path, timestamp, False)
+        self._active_size = path.stat().st_size if path.exists() else 0
+        logger.info("Opened archive segment %s.", path)
+
+    def _needs_rotation(self, timestamp):
+        return (self._active is None
+                or self._active_size >= self.max_segment_bytes
+                or timestamp - self._active.start >= self.max_segment_age)
+
+    def write(self, snapshot, timestamp=None):
+        """
+        Archives one snapshot.
+
+        Args:
+        - snapshot (dict): The report; its 'timestamp' key is used when no timestamp is given.
+        - timestamp (float): Epoch seconds to index the snapshot under.
+        """
+        if timestamp is None:
+            timestamp = snapshot.get('timestamp', time.time()) if isinstance(snapshot, dict) else time.time()
+
+        if self._needs_rotation(timestamp):
+            rotated = self._active is not None
+            self._open_segment(timestamp)
+            if rotated:
+                self.enforce_retention(now=timestamp)
+
+        member = self._compress(json.dumps(snapshot, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+        with open(self._active.path, 'ab') as handle:
+            offset = handle.tell()
+            handle.write(member)
+        with open(self._active.index_path, 'ab') as handle:
+            handle.write(INDEX_ENTRY.pack(timestamp, offset))
+        self._active_size = offset + len(member)
+
+    def close(self):
+        self._active = None
+
+    @staticmethod
+    def _read_members(segment, entries):
+        """Yields (timestamp, snapshot) for the given index entries of one segment."""
+        decompress = COMPRESSORS['lzma' if segment.path.name.endswith('.xz') else 'gzip'][2]
+        file_size = segment.path.stat().st_size
+        all_entries = segment.read_index()
+        next_offsets = {offset: (all_entries[position + 1][1] if position + 1 < len(all_entries) else file_size)
+                        for position, (_, offset) in enumerate(all_entries)}
+        with open(segment.path, 'rb') as handle:
+            for timestamp, offset in entries:
+                handle.seek(offset)
+                member = handle.read(next_offsets[offset] - offset)
+                yield timestamp, json.loads(decompress(member))
+
+    def query(self, start=None, end=None):
+        """
+        Yields (timestamp, snapshot) for snapshots with start <= timestamp < end, oldest first.
+
+        Only segments whose time span overlaps the range are opened.
+        """
+        segments = self.segments()
+        for position, segment in enumerate(segments):
+            segment_end = segments[position + 1].start if position + 1 < len(segments) else float('inf')
+            if (end is not None and segment.start >= end) or (start is not None and segment_end <= start):
+                continue
+            entries = [(timestamp, offset) for timestamp, offset in segment.read_index()
+                       if (start is None or timestamp >= start) and (end is None or timestamp < end)]
+            if entries:
+                yield from self._read_members(segment, entries)
+
+    def _downsample(self, segment):
+        entries = segment.read_index()
+        kept = entries[::self.downsample_step]
+        snapshots = list(self._read_members(segment, kept))
+        compress = COMPRESSORS['lzma' if segment.path.name.endswith('.xz') else 'gzip'][1]
+
+        stem, extension = segment.path.name.split('.', 1)
+        new_path = segment.path.with_name(f'{stem}-downsampled.{extension}')
+        new_segment = Segment(new_path, segment.start, True)
+        index = bytearray()
+        with open(new_path, 'wb') as handle:
+            for timestamp, snapshot in snapshots:
+                index += INDEX_ENTRY.pack(timestamp, handle.tell())
+                handle.write(compress(json.dumps(snapshot, separators=(',', ':'), ensure_ascii=False).encode('utf-8')))
+        new_segment.index_path.write_bytes(bytes(index))
+        os.remove(segment.path)
+        segment.index_path.unlink(missing_ok=True)
+        logger.info("Downsampled %s: kept %s of %s snapshots.", segment.path.name, len(kept), len(entries))
+
+    def enforce_retention(self, now=None):
+        """Deletes segments past the retention period and downsamples older, inactive ones."""
+        now = time.time() if now is None else now
+        segments = self.segments()
+        for position, segment in enumerate(segments):
+            if self._active is not None and segment.path == self._active.path:
+                continue
+            segment_end = segments[position + 1].start if position + 1 < len(segments) else now
+            try:
+                if self.retention is not None and segment_end < now - self.retention:
+                    os.remove(segment.path)
+                    segment.index_path.unlink(missing_ok=True)
+                    logger.info("Deleted expired archive segment %s.", segment.path.name)
+                elif (self.downsample_after is not None and self.downsample_step > 1
+                      and not segment.downsampled and segment_end < now - self.downsample_after):
+                    self._downsample(segment)
+            except OSError as e:
+                logger.error("Error applying retention to %s: %s", segment.path.name, e)
+
+    def disk_usage(self):
+        """Total bytes used by segments and indexes."""
+        return sum(path.stat().st_size for path in self.directory.iterdir() if path.is_file())
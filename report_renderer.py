@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+"""
+Rendering stage for typed snapshots.
+
+Turns the raw numbers held by snapshots.py into the human-readable report
+sections the managers have always returned. Nothing here touches psutil.
+"""
+
+from report_signatures import TimeStampGenerator
+from alert_rules import get_alert_engine, OK, FIRING
+
+GIGABYTE = 1024 ** 3
+MEGABYTE = 1024 ** 2
+
+
+def render_alert_status(rule_names, series, normal, prefix=''):
+    """
+    Describes the state of the first of `rule_names` that is not ok for `series`.
+
+    Args:
+    - rule_names (tuple): Rules to check, in order of precedence.
+    - series (tuple): Series names, one per rule.
+    - normal (str): Text when every rule is ok (or not configured).
+    - prefix (str): Prepended to the firing rule's message, e.g. 'Warning: '.
+    """
+    engine = get_alert_engine()
+    for rule_name, name in zip(rule_names, series):
+        state = engine.state(rule_name, name)
+        if state == OK:
+            continue
+        # States only exist for loaded rules, so the rule is always found here
+        rule = engine.get_rule(rule_name)
+        if state == FIRING:
+            return f'{prefix}{rule.message}'
+        return f'{prefix}{rule.message} (pending, must hold for {rule.for_seconds:g}s)'
+    return normal
+
+
+def render_cpu(snapshot):
+    times = snapshot.times
+    percentages = snapshot.times_percent
+    return {
+        'CPU Usage Statistics': {
+            'Total CPU Usage': f'{snapshot.usage} %',
+            'Total Processor Cores Count (Logical)': f'{snapshot.logical_count}',
+            'Total Processor Cores Count (Physical)': f'{snapshot.physical_count}',
+            'CPU Load Status': render_alert_status(('cpu_load_high',), ('cpu.usage',), "CPU load is normal."),
+            'System CPU Time Statistics (Time)': {
+                'User': f'{TimeStampGenerator.convertTime(times[0])}',
+                'System': f'{TimeStampGenerator.convertTime(times[1])}',
+                'IDLE': f'{TimeStampGenerator.convertTime(times[2])}',
+                'Interrupt': f'{TimeStampGenerator.convertTime(times[3])}',
+                'DPC': f'{TimeStampGenerator.convertTime(times[4])}'
+            },
+            'System CPU Time Statistics (Percentages)': {
+                'User': f'{percentages[0]} %',
+                'System': f'{percentages[1]} %',
+                'IDLE': f'{percentages[2]} %',
+                'Interrupt': f'{percentages[3]} %',
+                'DPC': f'{percentages[4]} %'
+            },
+            'CPU Frequency Statistics': {
+                'Current': f'{snapshot.freq_current} Mhz',
+                'Min': f'{snapshot.freq_min} Mhz',
+                'Max': f'{snapshot.freq_max} Mhz',
+            },
+            'CPU Stats Statistics': {
+                'Context Switches': f'{snapshot.ctx_switches}',
+                'Interrupts': f'{snapshot.interrupts}',
+                'Software Interrupts': f'{snapshot.soft_interrupts}',
+                'System Calls': f'{snapshot.syscalls}'
+            },
+            'Generated Time & Date': f'{TimeStampGenerator.generate_report(snapshot.timestamp)}'
+        }
+    }
+
+
+def render_memory(snapshot):
+    return {
+        'Memory Usage Statistics': {
+            'System Memory': {
+                'Total': f'{snapshot.total / GIGABYTE:.2f} GB',
+                'Available': f'{snapshot.available / GIGABYTE:.2f} GB',
+                'Percentage': f'{snapshot.percent} %',
+                'Used': f'{snapshot.used / GIGABYTE:.2f} GB',
+                'Free': f'{snapshot.free / GIGABYTE:.2f} GB'
+            },
+            'THRESHOLD': render_alert_status(('memory_available_low',), ('memory.available',),
+                                             "Available memory is sufficient.", prefix='Warning: '),
+            'Swap Memory': {
+                'Total': f'{snapshot.swap_total / GIGABYTE:.2f} GB',
+                'Used': f'{snapshot.swap_used / GIGABYTE:.2f} GB',
+                'Free': f'{snapshot.swap_free / GIGABYTE:.2f} GB',
+                'Percentage': f'{snapshot.swap_percent} %',
+                'System IN': f'{snapshot.swap_sin / GIGABYTE:.2f} GB',
+                'System OUT': f'{snapshot.swap_sout / GIGABYTE:.2f} GB'
+            },
+            'Generated Time & Date': f'{TimeStampGenerator.generate_report(snapshot.timestamp)}'
+        }
+    }
+
+
+def render_partition_usage(usage):
+    if not usage.responsive:
+        return {"Local Disk": usage.device, "Status": "Unresponsive"}
+    return {
+        "Local Disk": usage.device,
+        "Total": f"{usage.total / GIGABYTE:.2f} GB",
+        "Used": f"{usage.used / GIGABYTE:.2f} GB",
+        "Free": f"{usage.free / GIGABYTE:.2f} GB",
+        "Percentage Used": f"{usage.percent} %",
+        "Percentage Free": f"{usage.free_percent:.1f} %"
+    }
+
+
+def render_storage_level(usage):
+    if not usage.responsive:
+        return {"Partition": usage.device, "Status": "Unresponsive"}
+    status = render_alert_status(('disk_free_percent_low', 'disk_free_bytes_low'),
+                                 (f'disk.{usage.mountpoint}.free_percent', f'disk.{usage.mountpoint}.free'),
+                                 "Storage is sufficient.")
+    return {"Partition": usage.device, "Status": status}
+
+
+def render_traffic(snapshot):
+    return {
+        'Network Traffic Information': {
+            'Send': f'{snapshot.bytes_sent / MEGABYTE:.2f} MB',
+            'Received': f'{snapshot.bytes_recv / MEGABYTE:.2f} MB',
+        },
+        'Per Interface Throughput': {
+            interface: {
+                'Bytes Sent/s': f"{rate['bytes_sent']:.2f}",
+                'Bytes Received/s': f"{rate['bytes_recv']:.2f}",
+                'Packets Sent/s': f"{rate['packets_sent']:.2f}",
+                'Packets Received/s': f"{rate['packets_recv']:.2f}",
+                'Errors In/s': f"{rate['errin']:.2f}",
+                'Errors Out/s': f"{rate['errout']:.2f}",
+                'Drops In/s': f"{rate['dropin']:.2f}",
+                'Drops Out/s': f"{rate['dropout']:.2f}"
+            }
+            for interface, rate in snapshot.interface_rates.items()
+        },
+        'Extra Information': {
+            'Packets Sent': f'{snapshot.packets_sent}',
+            'Packet Received': f'{snapshot.packets_recv}',
+            'ErrorIn': f'{snapshot.errin}',
+            'ErrorOut': f'{snapshot.errout}',
+            'DropIn': f'{snapshot.dropin}',
+            'DropOut': f'{snapshot.dropout}'
+        }
+    }
+
+
+def render_battery(snapshot):
+    if snapshot.percent == 100:
+        remaining = 'Fully Charged'
+    elif snapshot.secsleft < 0:
+        # psutil reports POWER_TIME_UNLIMITED (-2) while charging and POWER_TIME_UNKNOWN (-1) otherwise
+        remaining = 'Charging' if snapshot.power_plugged else 'Unknown'
+    else:
+        remaining = f'{TimeStampGenerator.convertTime(snapshot.secsleft)}'
+    return {
+        'Battery Usage Statistics': {
+            'Battery Percentage': f'{snapshot.percent} %',
+            'Power Connectivity': 'Power Connected' if snapshot.power_plugged else 'Power Disconnected',
+            'Battery Remaining Time': remaining,
+            'Generated Time & Date': f'{TimeStampGenerator.generate_report(snapshot.timestamp)}'
+        }
+    }
+
+
+def render_self_metrics(stats, usage=None):
+    section = {
+        name: {
+            'Calls': f"{entry['calls']}",
+            'Errors': f"{entry['errors']}",
+            'Total Time': f"{entry['total'] * 1000:.3f} ms",
+            'Mean Time': f"{entry['total'] / entry['calls'] * 1000:.3f} ms" if entry['calls'] else '0.000 ms',
+            'Max Time': f"{entry['max'] * 1000:.3f} ms",
+            'Last Time': f"{entry['last'] * 1000:.3f} ms",
+            'Items': f"{entry['items']}" if entry['items'] is not None else 'None'
+        }
+        for name, entry in sorted(stats.items())
+    }
+    if usage is not None:
+        wall_time = usage['wall_time']
+        section['Analyzer Process'] = {
+            'CPU Time': f"{usage['cpu_time']:.3f} s",
+            'Wall Time': f"{wall_time:.3f} s",
+            'CPU Usage': f"{usage['cpu_time'] / wall_time * 100 if wall_time > 0 else 0.0:.1f} %"
+        }
+    return {'Collector Self-Metrics': section}
+
+
+def format_duration(seconds):
+    """Coarse human duration for projections, e.g. '3.2 days' or '45 minutes'."""
+    if seconds >= 86400:
+        return f'{seconds / 86400:.1f} days'
+    if seconds >= 3600:
+        return f'{seconds / 3600:.1f} hours'
+    return f'{max(seconds / 60, 1):.0f} minutes'
+
+
+def render_finding(finding):
+    if finding['kind'] == 'exhaustion':
+        return f"{finding['description']} in {format_duration(finding['seconds'])}"
+    if finding['kind'] == 'spike':
+        unit = '/s' if finding['rate'] else ''
+        return (f"{finding['series']}{' rate' if finding['rate'] else ''} {finding['value']:.2f}{unit} is "
+                f"{finding['zscore']:+.1f} standard deviations from its rolling mean of "
+                f"{finding['mean']:.2f}{unit} (EWMA {finding['ewma']:.2f}{unit})")
+    return (f"{finding['series']} rate rising by {finding['slope'] * 3600:.2f}/s per hour "
+            f"(now {finding['value']:.2f}/s)")
+
+
+def render_analysis(findings, series_count, samples, window, timestamp=None):
+    return {
+        'Analysis': {
+            'Series Analysed': f'{series_count}',
+            'Samples (Widest Series)': f'{samples}',
+            'Window': format_duration(window),
+            'Findings': [render_finding(finding) for finding in findings] or 'No anomalies detected.',
+            'Generated Time & Date': f'{TimeStampGenerator.generate_report(timestamp)}'
+        }
+    }
+
+
+def render_no_battery(timestamp=None):
+    return {
+        'Battery Usage Statistics': {
+            'Status': 'No battery detected.',
+            'Generated Time & Date': f'{TimeStampGenerator.generate_report(timestamp)}'
+        }
+    }
@@ -4,64 +4,44 @@ import logging  # Import logging module
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
-
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-# Add the file handler to the logger
-logger.addHandler(file_handler)
-
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
-
 class TimeStampGenerator:
     def __init__(self):
         pass
 
     @staticmethod
-    def current_time():
+    def current_time(moment=None):
         try:
-            logger.info("Generating current time.")
-            current_time = datetime.now().strftime('%H:%M:%S')
-            logger.info(f"Current time generated: {current_time}")
+            current_time = (moment or datetime.now()).strftime('%H:%M:%S')
             return current_time
         except Exception as e:
-            logger.error(f"Error generating current time: {e}")
+            logger.error("Error generating current time: %s", e)
 
     @staticmethod
-    def current_date():
+    def current_date(moment=None):
         try:
-            logger.info("Generating current date.")
-            current_date = datetime.now().strftime('%d/%m/%Y')
-            logger.info(f"Current date generated: {current_date}")
+            current_date = (moment or datetime.now()).strftime('%d/%m/%Y')
             return current_date
         except Exception as e:
-            logger.error(f"Error generating current date: {e}")
+            logger.error("Error generating current date: %s", e)
 
     @staticmethod
-    def generate_report():
+    def generate_report(timestamp=None):
+        # Formats the given epoch timestamp, or the current time when omitted
         try:
-            logger.info("Generating report with current time and date.")
-            current_time = TimeStampGenerator.current_time()
-            current_date = TimeStampGenerator.current_date()
+            moment = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+            current_time = TimeStampGenerator.current_time(moment)
+            current_date = TimeStampGenerator.current_date(moment)
             report = f'{current_time} | {current_date}'
-            logger.info(f"Report generated: {report}")
             return report
         except Exception as e:
-            logger.error(f"Error generating report: {e}")
+            logger.error("Error generating report: %s", e)
 
     @staticmethod
     def convertTime(seconds):
         try:
-            logger.info(f"Converting {seconds} seconds to standard time format.")
             minutes, seconds = divmod(seconds, 60)
             hours, minutes = divmod(minutes, 60)
             formatted_time = '%d:%02d:%02d' % (hours, minutes, seconds)
-            logger.info(f"Converted time: {formatted_time}")
             return formatted_time
         except Exception as e:
-            logger.error(f"Error converting time: {e}")
+            logger.error("Error converting time: %s", e)
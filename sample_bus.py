@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+"""
+Single path for the numeric samples the collectors read.
+
+Each series has exactly one producer, which publishes it once per read:
+
+    CPUManager.collect          cpu.usage, cpu.ctx_switches, cpu.interrupts, cpu.soft_interrupts
+    MemoryManager.collect       memory.available, memory.percent, swap.used, swap.percent
+    DiskManager.collect_usage   disk.<mount>.free, disk.<mount>.free_percent
+    NetworkManager.collect_traffic  net.<interface>.bytes_sent/bytes_recv/errin/errout/dropin/dropout
+
+Published samples go to the alert engine and to every subscriber (e.g. a
+MetricsHistory), so no series is observed twice and nothing re-reads psutil
+for data a collector has just read.
+"""
+
+import threading
+from alert_rules import get_alert_engine
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_subscribers = ()
+_subscribers_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """Registers callback(samples, timestamp) for every published sample set."""
+    global _subscribers
+    with _subscribers_lock:
+        _subscribers = _subscribers + (callback,)
+
+
+def unsubscribe(callback):
+    global _subscribers
+    with _subscribers_lock:
+        _subscribers = tuple(subscriber for subscriber in _subscribers if subscriber != callback)
+
+
+def publish(samples, timestamp):
+    """Hands one {series: value} mapping read at `timestamp` to the alert rules and the subscribers."""
+    if not samples:
+        return
+    get_alert_engine().observe_many(samples, timestamp)
+    for callback in _subscribers:  # Copy-on-write tuple, safe to iterate without the lock
+        try:
+            callback(samples, timestamp)
+        except Exception as e:
+            logger.error("Error delivering samples to %r: %s", callback, e)
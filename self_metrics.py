@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+
+"""
+Self-metrics for the analyzer's own collectors.
+
+Collector entry points and their sub-steps are wrapped with @instrumented.
+While instrumentation is disabled (the default) the wrapper only checks one
+attribute and calls straight through. Once enabled, every call records its
+duration, the number of items it produced and whether it failed, and the
+totals are rendered as the "Collector Self-Metrics" report section.
+Collectors run by CollectionEngine can additionally be profiled with
+cProfile and dumped to one pstats file.
+
+main.py imports this module on every start, so cProfile, pstats, inspect
+and the renderer are imported only once they are actually needed.
+"""
+
+import functools
+import os
+import threading
+import time
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SpanStats:
+    """Running totals for one instrumented name."""
+
+    __slots__ = ('calls', 'errors', 'total', 'max', 'last', 'items')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.items = None  # Item count of the most recent call that reported one
+
+
+class SelfMetrics:
+    """Thread-safe store of per-collector and per-step timings, counts and errors."""
+
+    def __init__(self):
+        self.enabled = False
+        self.profile_path = None
+        self._lock = threading.Lock()
+        # Only one cProfile profiler may be active per process from Python 3.12 (sys.monitoring)
+        self._profile_lock = threading.Lock()
+        self._stats = {}
+        self._profiles = []
+        self._started_wall = None
+        self._started_cpu = None
+
+    def enable(self, profile_path=None):
+        """
+        Starts recording.
+
+        Args:
+        - profile_path (str): When given, collectors run by the engine are profiled and dumped here.
+        """
+        with self._lock:
+            self._started_wall = time.monotonic()
+            self._started_cpu = self._process_cpu_time()
+            self.profile_path = profile_path
+            self.enabled = True
+        logger.info("Self-metrics enabled%s.", f' with profiling to {profile_path}' if profile_path else '')
+
+    def disable(self):
+        self.enabled = False
+        self.profile_path = None
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self._profiles = []
+
+    @staticmethod
+    def _process_cpu_time():
+        times = os.times()
+        return times.user + times.system
+
+    def record(self, name, duration, error=False, items=None):
+        """Adds one call of `name` that took `duration` seconds."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = SpanStats()
+            stats.calls += 1
+            stats.total += duration
+            stats.last = duration
+            if duration > stats.max:
+                stats.max = duration
+            if error:
+                stats.errors += 1
+            if items is not None:
+                stats.items = items
+
+    def snapshot(self):
+        """Returns {name: {calls, errors, total, max, last, items}} with times in seconds."""
+        with self._lock:
+            return {name: {field: getattr(stats, field) for field in SpanStats.__slots__}
+                    for name, stats in self._stats.items()}
+
+    def process_usage(self):
+        """CPU seconds and wall seconds the analyzer process has spent since recording started."""
+        if self._started_wall is None:
+            return None
+        return {
+            'cpu_time': self._process_cpu_time() - self._started_cpu,
+            'wall_time': time.monotonic() - self._started_wall,
+        }
+
+    def run_profiled(self, function, *args, **kwargs):
+        """
+        Calls `function`, under its own cProfile profiler when profiling is on.
+
+        Profiled calls are serialized, so while profiling the engine's
+        collectors run one at a time and time spent waiting for another
+        collector's profile counts against their deadlines.
+        """
+        if self.profile_path is None:
+            return function(*args, **kwargs)
+        import cProfile
+        with self._profile_lock:
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(function, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._profiles.append(profiler)
+
+    def dump_profile(self):
+        """Merges every collected profile into one pstats file; returns its path, or None."""
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        if self.profile_path is None or not profiles:
+            return None
+        import pstats
+        pstats.Stats(*profiles).dump_stats(self.profile_path)
+        logger.info("Profile of %s collector run(s) written to %s.", len(profiles), self.profile_path)
+        return self.profile_path
+
+    def report(self):
+        """Renders the current totals as the "Collector Self-Metrics" report section."""
+        from report_renderer import render_self_metrics
+        return render_self_metrics(self.snapshot(), self.process_usage())
+
+
+_self_metrics = SelfMetrics()
+
+
+def get_self_metrics():
+    """Returns the process-wide self-metrics store."""
+    return _self_metrics
+
+
+def instrumented(name=None, items=None, detail=None):
+    """
+    Decorator that records a function's calls in the self-metrics store.
+
+    Args:
+    - name (str): Metric name; the function's qualified name (e.g. 'DiskManager.manage_disk') by default.
+    - items (callable): Maps a non-None return value to its item count, e.g. len.
+    - detail (str): Argument whose value is appended to the name, e.g. 'kind' gives
+      'NetworkManager.gather_connections[tcp]'.
+    """
+    def decorate(function):
+        label = name or function.__qualname__
+        signature = None
+        if detail:
+            import inspect
+            signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _self_metrics.enabled:
+                return function(*args, **kwargs)
+
+            span = label
+            if signature is not None:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                span = f'{label}[{bound.arguments.get(detail)}]'
+            started = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except (Exception, SystemExit):
+                _self_metrics.record(span, time.perf_counter() - started, error=True)
+                raise
+            duration = time.perf_counter() - started
+            _self_metrics.record(span, duration, items=items(result) if items is not None and result is not None else None)
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+Typed snapshot model.
+
+Collectors fill these slotted dataclasses with raw numbers (bytes, seconds,
+percent as float). Human-readable strings are only produced by
+report_renderer when a report is output, so downstream code can compute
+with the values directly.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class CPUSnapshot:
+    timestamp: float
+    usage: float
+    logical_count: int
+    physical_count: int
+    times: tuple           # Raw psutil.cpu_times() values, in seconds
+    times_percent: tuple   # Same fields as percentages of the sampling window
+    time_fields: tuple     # Field names of `times` / `times_percent`
+    freq_current: float
+    freq_min: float
+    freq_max: float
+    ctx_switches: int
+    interrupts: int
+    soft_interrupts: int
+    syscalls: int
+
+
+@dataclass(slots=True)
+class MemorySnapshot:
+    timestamp: float
+    total: int
+    available: int
+    percent: float
+    used: int
+    free: int
+    swap_total: int
+    swap_used: int
+    swap_free: int
+    swap_percent: float
+    swap_sin: int
+    swap_sout: int
+
+
+@dataclass(slots=True)
+class PartitionUsage:
+    device: str
+    mountpoint: str
+    total: int = 0
+    used: int = 0
+    free: int = 0
+    percent: float = 0.0
+    responsive: bool = True
+
+    @property
+    def free_percent(self):
+        return self.free / self.total * 100 if self.total else 0.0
+
+
+@dataclass(slots=True)
+class TrafficSnapshot:
+    timestamp: float
+    bytes_sent: int
+    bytes_recv: int
+    packets_sent: int
+    packets_recv: int
+    errin: int
+    errout: int
+    dropin: int
+    dropout: int
+    interface_rates: dict = field(default_factory=dict)  # Interface -> {counter field: per-second rate}
+
+
+@dataclass(slots=True)
+class BatterySnapshot:
+    timestamp: float
+    percent: float
+    secsleft: int
+    power_plugged: bool
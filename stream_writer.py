@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import json
+import types
+from collections.abc import Iterator
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class StreamingJSONWriter:
+    """
+    Writes a report to a text stream incrementally.
+
+    Dicts and lists are written element by element. Generators and other
+    iterators are consumed one item at a time and written as JSON arrays, so
+    a collector can yield records and peak memory stays flat regardless of
+    how many there are. Zero-argument functions are called at the moment
+    their value is written, which lets a summary computed while a generator
+    ran appear after it. indent=None gives compact output.
+    """
+
+    def __init__(self, stream, indent=4, ensure_ascii=False):
+        self.stream = stream
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.key_separator = ':' if indent is None else ': '
+
+    def _newline(self, depth):
+        if self.indent is not None:
+            self.stream.write('\n' + ' ' * (self.indent * depth))
+
+    def _scalar(self, value):
+        return json.dumps(value, ensure_ascii=self.ensure_ascii)
+
+    def write(self, value, depth=0):
+        if isinstance(value, (types.FunctionType, types.MethodType)):
+            value = value()
+
+        if isinstance(value, dict):
+            self._write_items(((self._scalar(str(key)), item) for key, item in value.items()), depth, '{', '}')
+        elif isinstance(value, (list, tuple, Iterator)):
+            self._write_items(((None, item) for item in value), depth, '[', ']')
+        else:
+            self.stream.write(self._scalar(value))
+
+    def _write_items(self, items, depth, opening, closing):
+        self.stream.write(opening)
+        empty = True
+        for key, item in items:
+            if not empty:
+                self.stream.write(',')
+            self._newline(depth + 1)
+            if key is not None:
+                self.stream.write(key + self.key_separator)
+            self.write(item, depth + 1)
+            empty = False
+        if not empty:
+            self._newline(depth)
+        self.stream.write(closing)
+
+    def dump(self, value):
+        """Writes one complete document followed by a newline."""
+        self.write(value)
+        self.stream.write('\n')
@@ -1,31 +1,17 @@
 #!/usr/bin/env python3
 
-import datetime  # importing datetime, os, json, platform, sys and psutil libraries
+import datetime  # importing datetime, os, platform, sys and psutil libraries
 import os
-import json
 import platform
 import sys
 import psutil
 import logging
 from report_signatures import TimeStampGenerator  # importing date-time stamp generator library
+from self_metrics import instrumented
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Create file handler for logging to a file
-file_handler = logging.FileHandler('system_analysis.log')
-file_handler.setLevel(logging.DEBUG)  # Write all logs (DEBUG and higher) to the file
-
-# Create a formatter and attach it to the file handler
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-# Add the file handler to the logger
-logger.addHandler(file_handler)
-
-# Set the logger's level to DEBUG to capture all log levels
-logger.setLevel(logging.DEBUG)
-
 class SystemInformation:
     @staticmethod
     def check_reboot():
@@ -33,10 +19,10 @@ class SystemInformation:
             logger.info("Checking for pending reboot.")
             location = os.path.exists('run/reboot-required')
             reboot_status = "Pending Reboot." if location else "No pending Reboot."
-            logger.info(f"Reboot status: {reboot_status}")
+            logger.info("Reboot status: %s", reboot_status)
             return reboot_status
         except Exception as e:
-            logger.error(f"Error checking reboot status: {e}")
+            logger.error("Error checking reboot status: %s", e)
             raise RuntimeError("Error checking reboot status:", e)
 
     @staticmethod
@@ -44,10 +30,10 @@ class SystemInformation:
         try:
             logger.info("Fetching system boot time.")
             boot_time = psutil.boot_time()
-            logger.info(f"System boot time fetched: {boot_time}")
+            logger.info("System boot time fetched: %s", boot_time)
             return boot_time
         except Exception as e:
-            logger.error(f"Error fetching boot time: {e}")
+            logger.error("Error fetching boot time: %s", e)
             raise RuntimeError("Error fetching boot time:", e)
 
     @staticmethod
@@ -56,13 +42,14 @@ class SystemInformation:
             logger.info("Fetching system users.")
             users = psutil.users()
             user_list = [value[0] for value in users]
-            logger.info(f"Users fetched: {user_list}")
+            logger.info("Users fetched: %s", user_list)
             return user_list
         except Exception as e:
-            logger.error(f"Error fetching user profiles: {e}")
+            logger.error("Error fetching user profiles: %s", e)
             raise RuntimeError("Error fetching user profiles:", e)
 
     @staticmethod
+    @instrumented()
     def system_info():
         try:
             logger.info("Retrieving system information.")
@@ -106,12 +93,10 @@ class SystemInformation:
             }
 
             logger.info("System information retrieved successfully.")
-            result = json.dumps(statistics, indent=4)
-            json_output = json.loads(result)
-            return json_output  # Return the JSON output as a string
+            return statistics
         
         except RuntimeError as re:
-            logger.error(f"Error fetching system information: {re}")
+            logger.error("Error fetching system information: %s", re)
         except Exception as e:
-            logger.error(f"An error occurred: {e}")
+            logger.error("An error occurred: %s", e)
             raise RuntimeError("An error occurred:", e)
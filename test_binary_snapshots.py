@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""Round-trip tests for the binary snapshot writer and the memory-mapped reader."""
+
+import math
+import os
+import tempfile
+import unittest
+from binary_snapshots import HEADER, MAGIC, SCHEMA_VERSION, SnapshotReader, SnapshotWriter
+
+
+class BinarySnapshotTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.bin')
+        os.close(handle)
+        os.unlink(self.path)
+        self.writer = SnapshotWriter(self.path, fields=('cpu.usage', 'memory.percent'))
+        self.writer.append_many([(100.0 + index, {'cpu.usage': index * 10.0}) for index in range(5)])
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_iterate_inside_with_block(self):
+        with SnapshotReader(self.path) as reader:
+            records = [(timestamp, values) for timestamp, values in reader]
+        self.assertEqual([timestamp for timestamp, _ in records], [100.0, 101.0, 102.0, 103.0, 104.0])
+        self.assertEqual(records[2][1][0], 20.0)
+        self.assertTrue(math.isnan(records[2][1][1]))
+
+    def test_close_with_live_column_view(self):
+        with SnapshotReader(self.path) as reader:
+            column = reader.column('cpu.usage')
+            self.assertEqual(list(column), [0.0, 10.0, 20.0, 30.0, 40.0])
+            self.assertEqual(reader.time_range(101.0, 103.0), (1, 3))
+        self.assertEqual(column[4], 40.0)
+
+    def test_rejects_inconsistent_record_size(self):
+        with open(self.path, 'r+b') as handle:
+            header = HEADER.unpack(handle.read(HEADER.size))
+            handle.seek(0)
+            handle.write(HEADER.pack(MAGIC, SCHEMA_VERSION, header[2], header[3] + 8, header[4]))
+        with self.assertRaises(ValueError):
+            SnapshotReader(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
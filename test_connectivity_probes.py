@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+"""Loopback tests for the connectivity prober."""
+
+import socket
+import unittest
+import connectivity_probes
+from connectivity_probes import ConnectivityProber, configure_connectivity_prober, get_connectivity_prober
+
+
+class ConnectivityProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.listener = socket.create_server(('127.0.0.1', 0))
+        self.target = f'127.0.0.1:{self.listener.getsockname()[1]}'
+        # A port that was just free and is now closed, so connecting is refused
+        closed = socket.create_server(('127.0.0.1', 0))
+        self.closed_target = f'127.0.0.1:{closed.getsockname()[1]}'
+        closed.close()
+
+    def tearDown(self):
+        self.listener.close()
+        connectivity_probes._shared_prober = None
+
+    def test_local_listener_is_reachable(self):
+        result, = ConnectivityProber([self.target], timeout=2.0).probe()
+        self.assertTrue(result['reachable'], result)
+        self.assertIsNone(result['error'])
+
+    def test_closed_port_is_unreachable(self):
+        result, = ConnectivityProber([self.closed_target], timeout=2.0).probe()
+        self.assertFalse(result['reachable'])
+        self.assertTrue(result['error'])
+
+    def test_results_are_cached_until_the_ttl(self):
+        prober = ConnectivityProber([self.target], timeout=2.0, ttl=60.0)
+        prober.probe()
+        self.listener.close()
+        self.assertTrue(prober.probe()[0]['reachable'])
+        self.assertFalse(prober.probe(use_cache=False)[0]['reachable'])
+
+    def test_configured_targets_reach_the_shared_prober(self):
+        configure_connectivity_prober(f'{self.closed_target}, {self.target}')
+        prober = get_connectivity_prober()
+        self.assertEqual(prober.targets, [self.closed_target, self.target])
+        self.assertEqual([result['reachable'] for result in prober.probe()], [False, True])
+
+    def test_malformed_targets_are_rejected(self):
+        with self.assertRaises(ValueError):
+            configure_connectivity_prober('example.com')
+        with self.assertRaises(ValueError):
+            configure_connectivity_prober(' , ')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""Loopback tests for the fleet agent and aggregator."""
+
+import time
+import unittest
+from fleet_agent import FleetAgent, AgentWatchScheduler
+from fleet_aggregator import FleetAggregator, query_aggregator
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class FleetLoopbackTest(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = FleetAggregator(port=0).start()
+        self.address = self.aggregator.address
+        self.agents = []
+
+    def tearDown(self):
+        for agent in self.agents:
+            agent.close(timeout=1.0)
+        self.aggregator.stop()
+
+    def make_agent(self, host_name):
+        agent = FleetAgent(self.address, host_name=host_name, batch_size=2, flush_interval=0.1,
+                           backoff_base=0.05, backoff_max=0.2, timeout=2.0)
+        self.agents.append(agent)
+        return agent
+
+    def test_pushed_ticks_answer_top_query(self):
+        agent = self.make_agent('loopback')
+        scheduler = AgentWatchScheduler(agent, interval=0.05)
+        for _ in range(3):
+            scheduler.tick()
+        self.assertTrue(wait_for(lambda: agent.pending == 0))
+
+        top = query_aggregator(self.address, 'top', field='memory.percent', limit=10)
+        self.assertEqual([entry['host'] for entry in top], ['loopback'])
+        hosts = query_aggregator(self.address, 'hosts')
+        self.assertEqual(hosts[0]['snapshots'], 3)
+
+    def test_top_orders_hosts(self):
+        for index, pressure in enumerate((40.0, 90.0, 65.0)):
+            self.make_agent(f'host{index}').write({'timestamp': time.time(), 'metrics': {'memory.percent': pressure}})
+        self.assertTrue(wait_for(lambda: all(agent.pending == 0 for agent in self.agents)))
+
+        top = query_aggregator(self.address, 'top', field='memory.percent', limit=2)
+        self.assertEqual([(entry['host'], entry['value']) for entry in top], [('host1', 90.0), ('host2', 65.0)])
+
+    def test_agent_resends_after_aggregator_restart(self):
+        agent = self.make_agent('restarted')
+        agent.write({'timestamp': time.time(), 'metrics': {'memory.percent': 10.0}})
+        self.assertTrue(wait_for(lambda: agent.pending == 0))
+
+        port = self.address[1]
+        self.aggregator.stop()
+        for value in (20.0, 30.0):
+            agent.write({'timestamp': time.time(), 'metrics': {'memory.percent': value}})
+        self.assertTrue(wait_for(lambda: agent.reconnects > 0))
+        self.assertEqual(agent.pending, 2)
+
+        self.aggregator = FleetAggregator(port=port).start()
+        self.assertTrue(wait_for(lambda: agent.pending == 0))
+        hosts = query_aggregator(self.address, 'hosts')
+        self.assertEqual((hosts[0]['host'], hosts[0]['snapshots'], hosts[0]['memory.percent']), ('restarted', 2, 30.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
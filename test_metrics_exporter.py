@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""Loopback tests for the Prometheus metrics endpoint."""
+
+import re
+import unittest
+import urllib.error
+import urllib.request
+from metrics_exporter import CONTENT_TYPE, MetricsExporter
+
+SAMPLE_LINE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{.*\})? \S+$')
+# Loopback only: ignore any proxy configured in the environment
+opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+class MetricsExporterLoopbackTest(unittest.TestCase):
+    def setUp(self):
+        self.exporter = MetricsExporter(port=0, refresh_interval=60.0).start()
+        self.url = 'http://%s:%s' % self.exporter.address
+
+    def tearDown(self):
+        self.exporter.stop()
+
+    def scrape(self):
+        with opener.open(self.url + '/metrics', timeout=10) as response:
+            return response.headers['Content-Type'], response.read().decode('utf-8')
+
+    def test_exposition_format(self):
+        content_type, body = self.scrape()
+        self.assertEqual(content_type, CONTENT_TYPE)
+        self.assertTrue(body.endswith('\n'))
+
+        lines = body.splitlines()
+        self.assertIn('# HELP system_memory_total_bytes Total physical memory.', lines)
+        self.assertIn('# TYPE system_memory_total_bytes gauge', lines)
+        self.assertIn('# TYPE system_network_receive_bytes_total counter', lines)
+        for line in lines:
+            if not line.startswith('#'):
+                self.assertRegex(line, SAMPLE_LINE)
+
+        total = [line for line in lines if line.startswith('system_memory_total_bytes ')]
+        self.assertEqual(len(total), 1)
+        self.assertGreater(float(total[0].split()[1]), 0)
+
+    def test_scrapes_are_counted(self):
+        self.scrape()
+        body = self.scrape()[1]
+        self.assertIn('analyzer_scrapes_total 2', body.splitlines())
+
+    def test_other_paths_are_not_found(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            opener.open(self.url + '/', timeout=10)
+        self.assertEqual(raised.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+"""Startup checks: importing the entry point must not load the collectors' heavy dependencies."""
+
+import os
+import subprocess
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ('psutil', 'netifaces', 'numpy')
+
+
+class StartupImportTest(unittest.TestCase):
+    def loaded_after(self, statement):
+        # A fresh interpreter: this test process has imported psutil already
+        script = f"import sys\n{statement}\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        result = subprocess.run([sys.executable, '-c', script], cwd=HERE, capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return [name for name in result.stdout.strip().split(',') if name]
+
+    def test_import_main_is_lightweight(self):
+        self.assertEqual(self.loaded_after('import main'), [])
+
+    def test_parsing_arguments_is_lightweight(self):
+        self.assertEqual(self.loaded_after("import main; main.parse_arguments(['--collect', 'cpu'])"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
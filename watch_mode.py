@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import json
+import sys
+import time
+from collection_engine import CollectionEngine
+from stream_writer import StreamingJSONWriter
+from binary_snapshots import SnapshotWriter, snapshot_values
+from alert_rules import get_alert_engine
+import logging  # Import logging module
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class NDJSONWriter:
+    """Appends one compact JSON document per line to a file or stdout."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._stream = None
+
+    def open(self):
+        if self._stream is None:
+            self._stream = sys.stdout if self.path in (None, '-') else open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def write(self, record):
+        self.open()
+        self._stream.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False))
+        self._stream.write('\n')
+        self._stream.flush()
+
+    def close(self):
+        if self._stream is not None and self._stream is not sys.stdout:
+            self._stream.close()
+        self._stream = None
+
+
+class JSONWriter:
+    """
+    Writes snapshots as one JSON document, pretty-printed or compact.
+
+    A single snapshot is written as an object; when more than one is
+    expected they are streamed into a JSON array that is closed on close().
+    """
+
+    streams = True  # Generator-valued report sections are written as they are produced
+
+    def __init__(self, path=None, indent=4, many=False):
+        self.path = path
+        self.indent = indent
+        self.many = many
+        self._stream = None
+        self._json = None
+        self._written = 0
+
+    def open(self):
+        if self._stream is None:
+            self._stream = sys.stdout if self.path in (None, '-') else open(self.path, 'w', encoding='utf-8')
+            self._json = StreamingJSONWriter(self._stream, indent=self.indent)
+            if self.many:
+                self._stream.write('[')
+        return self
+
+    def write(self, record):
+        self.open()
+        if self.many:
+            self._stream.write(',' if self._written else '')
+            if self.indent is not None:
+                self._stream.write('\n' + ' ' * self.indent)
+            self._json.write(record, depth=1)
+        else:
+            self._json.dump(record)
+        self._written += 1
+        self._stream.flush()
+
+    def close(self):
+        if self._stream is None:
+            return
+        if self.many:
+            self._stream.write('\n]\n' if self._written and self.indent is not None else ']\n')
+        if self._stream is sys.stdout:
+            self._stream.flush()
+        else:
+            self._stream.close()
+        self._stream = None
+
+
+class WatchScheduler:
+    """
+    Samples the selected collectors on a fixed period.
+
+    Tick deadlines are computed from the start time (start + n * interval), so
+    the time spent collecting is not added to the period. If a tick overruns
+    by more than a whole interval, the missed ticks are skipped rather than
+    fired back to back.
+
+    When the writer streams (JSONWriter), collectors with a streaming
+    variant return generator sections instead, so e.g. the process list is
+    written while it is read rather than held in memory; the same goes for the
+    network report's connections. Their deadline then
+    covers building the report, not consuming the generator.
+    """
+
+    # Collector name -> report method returning generator-valued sections
+    STREAM_METHODS = {'process': 'stream_processes', 'network': 'stream_network_report'}
+
+    def __init__(self, collectors=None, interval=5.0, writer=None, engine=None, history=None, alerts=None,
+                 analyzer=None):
+        if interval <= 0:
+            raise ValueError("Interval must be a positive number of seconds.")
+        self.interval = interval
+        self.engine = engine or CollectionEngine()
+        self.collectors = list(self.engine.default_names) if collectors is None else self.engine.resolve(collectors)
+        self.engine.prepare(self.collectors)
+        self.writer = writer or NDJSONWriter()
+        self.history = history  # Optional MetricsHistory fed once per tick
+        self.alerts = alerts or get_alert_engine()
+        self.analyzer = analyzer  # Optional AnomalyAnalyzer over `history`, adds an Analysis section per tick
+        self.ticks = 0
+        self.skipped_ticks = 0
+
+    def tick(self):
+        """Collects one snapshot and appends it to the stream."""
+        started = time.time()
+        methods = self.STREAM_METHODS if getattr(self.writer, 'streams', False) else None
+        reports = self.engine.collect(self.collectors, methods=methods)
+        if self.history is not None:
+            self.history.sample(started)
+        if self.analyzer is not None:
+            reports.append(self.analyzer.report())
+        record = {
+            'timestamp': started,
+            'tick': self.ticks,
+            'duration': round(time.time() - started, 6),
+            'reports': reports,
+        }
+        # Only state changes since the previous tick, so consumers need no threshold logic of their own
+        events = self.alerts.drain_events()
+        if events:
+            record['alerts'] = events
+        self.writer.write(record)
+        self.ticks += 1
+        return record
+
+    def run(self, count=None):
+        """
+        Runs until interrupted, or for the given number of ticks.
+
+        Args:
+        - count (int): Number of snapshots to take; runs forever when omitted.
+        """
+        logger.info("Watch mode started: collectors=%s, interval=%ss.", self.collectors, self.interval)
+        next_deadline = time.monotonic()
+        try:
+            while count is None or self.ticks < count:
+                self.tick()
+                if count is not None and self.ticks >= count:
+                    break
+
+                next_deadline += self.interval
+                now = time.monotonic()
+                if now > next_deadline:
+                    missed = int((now - next_deadline) // self.interval) + 1
+                    self.skipped_ticks += missed
+                    next_deadline += missed * self.interval
+                    logger.warning("Collection overran the interval; skipped %s tick(s).", missed)
+                time.sleep(max(next_deadline - time.monotonic(), 0))
+        except KeyboardInterrupt:
+            logger.info("Watch mode interrupted by the user.")
+        finally:
+            self.writer.close()
+            logger.info("Watch mode stopped after %s tick(s).", self.ticks)
+        return self.ticks
+
+
+class BinaryWatchScheduler(WatchScheduler):
+    """
+    Samples the numeric collectors on the same schedule and appends each
+    snapshot as one fixed-width record to a binary snapshot file.
+
+    Only the collectors that have binary fields (cpu, memory, network) can
+    be selected; their typed snapshots are written without rendering.
+    """
+
+    BINARY_COLLECTORS = ('cpu', 'memory', 'network')
+    # Collector -> method returning its typed snapshot
+    SNAPSHOT_METHODS = {'cpu': 'collect', 'memory': 'collect', 'network': 'collect_traffic'}
+
+    def __init__(self, path, collectors=None, interval=5.0, engine=None, history=None, alerts=None):
+        if path in (None, '-'):
+            raise ValueError("Binary output needs a file path.")
+        engine = engine or CollectionEngine()
+        selected = list(self.BINARY_COLLECTORS) if collectors is None else engine.resolve(collectors)
+        unsupported = [name for name in selected if name not in self.BINARY_COLLECTORS]
+        if unsupported:
+            raise ValueError(f"Collectors without a binary format: {', '.join(unsupported)}. "
+                             f"Choose from: {', '.join(self.BINARY_COLLECTORS)}.")
+        super().__init__(collectors=selected, interval=interval, writer=SnapshotWriter(path),
+                         engine=engine, history=history, alerts=alerts)
+
+    def tick(self):
+        """Collects one typed snapshot and appends it as a binary record."""
+        started = time.time()
+        # Through the engine, so a failing or hung collector only leaves its fields as NaN
+        snapshots = self.engine.collect_snapshots({name: self.SNAPSHOT_METHODS[name] for name in self.collectors})
+        cpu, memory, traffic = snapshots.get('cpu'), snapshots.get('memory'), snapshots.get('network')
+        if self.history is not None:
+            self.history.sample(started)
+        values = snapshot_values(cpu=cpu, memory=memory, traffic=traffic)
+        # Binary records have no room for events; they are still written to the log
+        self.alerts.drain_events()
+        self.writer.append(started, values)
+        self.ticks += 1
+        return values